@@ -3,6 +3,8 @@ pragma solidity ^0.8.15;
 
 // These are the core Yearn libraries
 import "@openzeppelin/contracts/utils/math/Math.sol";
+import "@openzeppelin/contracts/utils/math/SafeCast.sol";
+import "@openzeppelin/contracts/utils/structs/EnumerableSet.sol";
 import "@yearnvaults/contracts/BaseStrategy.sol";
 
 interface ITradeFactory {
@@ -39,18 +41,29 @@ interface ILiquityStaking {
 
 contract StrategyLQTYStaker is BaseStrategy {
     using SafeERC20 for IERC20;
+    using EnumerableSet for EnumerableSet.AddressSet;
     /* ========== STATE VARIABLES ========== */
 
     /// @notice LQTY staking contract
-    ILiquityStaking public lqtyStaking =
+    ILiquityStaking public constant lqtyStaking =
         ILiquityStaking(0x4f9Fbb3f1E99B56e0Fe2892e623Ed36A76Fc605d);
 
-    /// @notice The percentage of LQTY from each harvest that we send to yearn's secondary staker to boost yields.
-    uint256 public keepLQTY;
+    // voter and keep are packed into a single slot, since we read both on every harvest
 
     /// @notice The address of our Liquity voter. This is where we send any keepLQTY.
     IVoter public liquityVoter;
 
+    /// @notice The percentage of LQTY from each harvest that we send to yearn's secondary staker to boost yields.
+    uint16 public keepLQTY;
+
+    /// @notice How many times our keeper's call cost our claimable profit must be to trigger, in basis points.
+    /// @dev Only used in harvestTrigger, and only when non-zero. 20,000 means profit must be twice the call cost.
+    uint32 public profitToCostMultiple;
+
+    /// @notice The percentage of our total assets we keep unstaked to serve withdrawals, in basis points.
+    /// @dev Topped up or trimmed on each harvest. Withdrawals smaller than our buffer skip unstaking entirely.
+    uint16 public liquidBufferBps;
+
     // this means all of our fee values are in basis points
     uint256 internal constant FEE_DENOMINATOR = 10000;
 
@@ -66,13 +79,70 @@ contract StrategyLQTYStaker is BaseStrategy {
     IERC20 public constant lqty =
         IERC20(0x6DEA81C8171D0bA574754EF6F8b412F2Ed88c54D);
 
+    // yearn lens oracle, all prices are in USDC (6 decimals)
+    IOracle internal constant yearnOracle =
+        IOracle(0x83d95e0D5f402511dB06817Aff3f9eA88224B030);
+
     /// @notice Minimum profit size in USDC that we want to harvest.
-    /// @dev Only used in harvestTrigger.
-    uint256 public harvestProfitMinInUsdc;
+    /// @dev Only used in harvestTrigger. Packed with our max, both are read together.
+    uint128 public harvestProfitMinInUsdc;
 
     /// @notice Maximum profit size in USDC that we want to harvest (ignore gas price once we get here).
     /// @dev Only used in harvestTrigger.
-    uint256 public harvestProfitMaxInUsdc;
+    uint128 public harvestProfitMaxInUsdc;
+
+    // our deferred voter forwarding, all in one slot
+
+    /// @notice LQTY we've set aside for our voter but haven't sent yet. Not counted in our assets.
+    uint96 public voterLqtyOwed;
+
+    /// @notice Send our voter its LQTY once we owe it at least this much.
+    uint96 public voterForwardThreshold;
+
+    /// @notice Send our voter its LQTY once it's been this long (in seconds) since we last did.
+    /// @dev With this and our threshold both zero, we send our voter its LQTY on every harvest.
+    uint32 public voterForwardInterval;
+
+    /// @notice Timestamp of the last time we sent our voter its LQTY.
+    uint32 public lastVoterForward;
+
+    /// @notice Idle want that will trigger a tend.
+    /// @dev Only used in tendTrigger. Packed with our profit threshold, both are read together.
+    uint128 public tendWantThreshold;
+
+    /// @notice Claimable profit in USDC (6 decimals) that will trigger a tend.
+    /// @dev Only used in tendTrigger.
+    uint128 public tendProfitThresholdInUsdc;
+
+    // our oracle price cache and our tends' kept profit, all in one slot. every harvest reads it for priceCacheMaxAge.
+
+    /// @notice LUSD price in USDC (6 decimals) as of our last price update.
+    uint48 public cachedLusdPrice;
+
+    /// @notice Ether price in USDC (6 decimals) as of our last price update.
+    uint48 public cachedEtherPrice;
+
+    /// @notice Timestamp of our last price update.
+    uint32 public pricesUpdatedAt;
+
+    /// @notice How long (in seconds) our cached prices are used before we go back to the oracle.
+    /// @dev Zero disables the cache, so we always use the oracle.
+    uint32 public priceCacheMaxAge;
+
+    /// @notice Profit we've made since our last report that tends have already set our voter's keep aside from.
+    /// @dev Net of that keep. Our next harvest only keeps from profit beyond this, then resets it.
+    uint96 public keptProfit;
+
+    // our dust thresholds, all in one slot. harvests skip any step that would move this much or less.
+
+    /// @notice Skip claiming if pending ether is at or below this, and skip wrapping ether at or below this.
+    uint80 public ethDust;
+
+    /// @notice Skip claiming if pending LUSD is at or below this.
+    uint80 public lusdDust;
+
+    /// @notice Skip sending LQTY to (and poking) our voter if our keep is at or below this.
+    uint80 public lqtyDust;
 
     // we use this to be able to adjust our strategy's name
     string internal stratName;
@@ -81,8 +151,57 @@ contract StrategyLQTYStaker is BaseStrategy {
     /// @notice The address of our ySwaps trade factory.
     address public tradeFactory;
 
-    /// @notice Array of any rewards tokens used for our tradehandler.
-    address[] public rewardsTokens;
+    // set of any rewards tokens used for our tradehandler, see rewardsTokens
+    EnumerableSet.AddressSet internal rewardsTokenSet;
+
+    /// @notice Everything we track, see snapshot.
+    struct Snapshot {
+        // accounting
+        uint256 balanceOfWant;
+        uint256 stakedBalance;
+        uint256 estimatedTotalAssets;
+        uint256 pendingETH;
+        uint256 pendingLUSD;
+        uint256 claimableProfitInUsdc;
+        uint256 voterLqtyOwed;
+        uint256 creditAvailable;
+        uint256 debtOutstanding;
+        StrategyParams params;
+        // config
+        address liquityVoter;
+        address tradeFactory;
+        bool emergencyExit;
+        uint256 keepLQTY;
+        uint256 liquidBufferBps;
+        uint256 harvestProfitMinInUsdc;
+        uint256 harvestProfitMaxInUsdc;
+        uint256 profitToCostMultiple;
+        uint256 maxReportDelay;
+        uint256 creditThreshold;
+        uint256 tendWantThreshold;
+        uint256 tendProfitThresholdInUsdc;
+        uint256 voterForwardThreshold;
+        uint256 voterForwardInterval;
+        uint256 lastVoterForward;
+        uint256 priceCacheMaxAge;
+        uint256 pricesUpdatedAt;
+        uint256 ethDust;
+        uint256 lusdDust;
+        uint256 lqtyDust;
+    }
+
+    /* ========== EVENTS ========== */
+
+    /// @notice Emitted when a harvest skips any of its steps because they fall under our dust thresholds.
+    event HarvestStepsSkipped(bool claim, bool wrap, bool voter);
+
+    /// @notice Emitted on every harvest and tend with what we claimed from liquity, wrapped, and sent to our voter.
+    event RewardsClaimed(
+        uint256 ethClaimed,
+        uint256 lusdClaimed,
+        uint256 ethWrapped,
+        uint256 lqtyToVoter
+    );
 
     /* ========== CONSTRUCTOR ========== */
 
@@ -92,6 +211,51 @@ contract StrategyLQTYStaker is BaseStrategy {
         uint256 _harvestProfitMinInUsdc,
         uint256 _harvestProfitMaxInUsdc
     ) BaseStrategy(_vault) {
+        _initializeStrat(
+            _tradeFactory,
+            _harvestProfitMinInUsdc,
+            _harvestProfitMaxInUsdc,
+            address(0)
+        );
+    }
+
+    /// @notice Set up a clone of this strategy, see yLQTYFactory.
+    /// @dev BaseStrategy's _initialize reverts if we've already been set up, so this only works once, and never on
+    ///  a strategy deployed with our constructor.
+    /// @param _vault Address of the vault this strategy is for.
+    /// @param _strategist Address of our strategist.
+    /// @param _rewards Address to send our strategist rewards to.
+    /// @param _keeper Address of our keeper.
+    /// @param _tradeFactory Address of our ySwaps trade factory.
+    /// @param _harvestProfitMinInUsdc See setHarvestTriggerParams.
+    /// @param _harvestProfitMaxInUsdc See setHarvestTriggerParams.
+    /// @param _voter Address of our liquity voter, zero for none.
+    function initialize(
+        address _vault,
+        address _strategist,
+        address _rewards,
+        address _keeper,
+        address _tradeFactory,
+        uint256 _harvestProfitMinInUsdc,
+        uint256 _harvestProfitMaxInUsdc,
+        address _voter
+    ) external {
+        _initialize(_vault, _strategist, _rewards, _keeper);
+        _initializeStrat(
+            _tradeFactory,
+            _harvestProfitMinInUsdc,
+            _harvestProfitMaxInUsdc,
+            _voter
+        );
+    }
+
+    // this is called by both our constructor and our initialize
+    function _initializeStrat(
+        address _tradeFactory,
+        uint256 _harvestProfitMinInUsdc,
+        uint256 _harvestProfitMaxInUsdc,
+        address _voter
+    ) internal {
         // make sure that we haven't initialized this before
         if (tradeFactory != address(0)) {
             revert(); // already initialized.
@@ -99,8 +263,9 @@ contract StrategyLQTYStaker is BaseStrategy {
 
         // 1:1 assignments
         tradeFactory = _tradeFactory;
-        harvestProfitMinInUsdc = _harvestProfitMinInUsdc;
-        harvestProfitMaxInUsdc = _harvestProfitMaxInUsdc;
+        harvestProfitMinInUsdc = SafeCast.toUint128(_harvestProfitMinInUsdc);
+        harvestProfitMaxInUsdc = SafeCast.toUint128(_harvestProfitMaxInUsdc);
+        liquityVoter = IVoter(_voter);
 
         // want = LQTY
         want.approve(address(lqtyStaking), type(uint256).max);
@@ -109,8 +274,8 @@ contract StrategyLQTYStaker is BaseStrategy {
         maxReportDelay = 365 days;
 
         // set up rewards and trade factory
-        rewardsTokens = [address(weth), address(lusd)];
-        _updateRewards(rewardsTokens);
+        rewardsTokenSet.add(address(weth));
+        rewardsTokenSet.add(address(lusd));
         _setUpTradeFactory();
 
         // set keep to 5%
@@ -134,7 +299,8 @@ contract StrategyLQTYStaker is BaseStrategy {
 
     /// @notice Balance of want sitting in our strategy.
     function balanceOfWant() public view returns (uint256) {
-        return want.balanceOf(address(this));
+        // LQTY we owe our voter isn't ours
+        return want.balanceOf(address(this)) - voterLqtyOwed;
     }
 
     /// @notice Total assets the strategy holds, sum of loose and staked want.
@@ -142,6 +308,43 @@ contract StrategyLQTYStaker is BaseStrategy {
         return balanceOfWant() + stakedBalance();
     }
 
+    /// @notice All of our accounting and config in a single call, for monitoring.
+    /// @dev Includes our vault's view of us. Prices our profit, so this costs a couple of oracle calls.
+    /// @return snap Our current state.
+    function snapshot() external view returns (Snapshot memory snap) {
+        snap.balanceOfWant = balanceOfWant();
+        snap.stakedBalance = stakedBalance();
+        snap.estimatedTotalAssets = snap.balanceOfWant + snap.stakedBalance;
+        snap.pendingETH = lqtyStaking.getPendingETHGain(address(this));
+        snap.pendingLUSD = lqtyStaking.getPendingLUSDGain(address(this));
+        snap.claimableProfitInUsdc = claimableProfitInUsdc();
+        snap.voterLqtyOwed = voterLqtyOwed;
+        snap.creditAvailable = vault.creditAvailable();
+        snap.debtOutstanding = vault.debtOutstanding();
+        snap.params = vault.strategies(address(this));
+
+        snap.liquityVoter = address(liquityVoter);
+        snap.tradeFactory = tradeFactory;
+        snap.emergencyExit = emergencyExit;
+        snap.keepLQTY = keepLQTY;
+        snap.liquidBufferBps = liquidBufferBps;
+        snap.harvestProfitMinInUsdc = harvestProfitMinInUsdc;
+        snap.harvestProfitMaxInUsdc = harvestProfitMaxInUsdc;
+        snap.profitToCostMultiple = profitToCostMultiple;
+        snap.maxReportDelay = maxReportDelay;
+        snap.creditThreshold = creditThreshold;
+        snap.tendWantThreshold = tendWantThreshold;
+        snap.tendProfitThresholdInUsdc = tendProfitThresholdInUsdc;
+        snap.voterForwardThreshold = voterForwardThreshold;
+        snap.voterForwardInterval = voterForwardInterval;
+        snap.lastVoterForward = lastVoterForward;
+        snap.priceCacheMaxAge = priceCacheMaxAge;
+        snap.pricesUpdatedAt = pricesUpdatedAt;
+        snap.ethDust = ethDust;
+        snap.lusdDust = lusdDust;
+        snap.lqtyDust = lqtyDust;
+    }
+
     /* ========== CORE STRATEGY FUNCTIONS ========== */
 
     function prepareReturn(
@@ -151,38 +354,20 @@ contract StrategyLQTYStaker is BaseStrategy {
         override
         returns (uint256 _profit, uint256 _loss, uint256 _debtPayment)
     {
-        // rewards will be converted later with mev protection by yswaps (tradeFactory)
-        // if we have anything staked, harvest our rewards. can't claim rewards without a stake.
-        uint256 _stakedBal = stakedBalance();
-        if (_stakedBal > 0) {
-            lqtyStaking.unstake(0);
-        }
+        // serious loss should never happen, but if it does, let's record it accurately
+        uint256 assets = estimatedTotalAssets();
+        uint256 debt = vault.strategies(address(this)).totalDebt;
 
-        // convert our ether to weth if we have any
-        uint256 ethBalance = address(this).balance;
-        if (ethBalance > 0) {
-            IWeth(address(weth)).deposit{value: ethBalance}();
+        // claim our rewards, wrap our ether, and set aside LQTY for our voter. our voter's keep isn't ours anymore.
+        unchecked {
+            assets -= _claimRewards(assets, debt);
         }
 
-        // send some LQTY to our voter and claim accrued yield from it
-        uint256 _keepLQTY = keepLQTY;
-        address _liquityVoter = address(liquityVoter);
-        if (_keepLQTY > 0 && _liquityVoter != address(0)) {
-            uint256 lqtyBalance = lqty.balanceOf(address(this));
-            uint256 _sendToVoter;
-            unchecked {
-                _sendToVoter = (lqtyBalance * _keepLQTY) / FEE_DENOMINATOR;
-            }
-            if (_sendToVoter > 0) {
-                lqty.safeTransfer(_liquityVoter, _sendToVoter);
-                liquityVoter.strategyHarvest();
-            }
+        // refresh our price cache while we're here, if we use it
+        if (priceCacheMaxAge > 0) {
+            _updatePrices();
         }
 
-        // serious loss should never happen, but if it does, let's record it accurately
-        uint256 assets = estimatedTotalAssets();
-        uint256 debt = vault.strategies(address(this)).totalDebt;
-
         // if assets are greater than debt, things are working great!
         if (assets >= debt) {
             unchecked {
@@ -214,16 +399,189 @@ contract StrategyLQTYStaker is BaseStrategy {
         }
     }
 
+    // claim from liquity, wrap any ether, and send our keep to our voter, skipping anything under our dust thresholds.
+    // returns the LQTY we just set aside for our voter.
+    function _claimRewards(
+        uint256 _assets,
+        uint256 _debt
+    ) internal returns (uint256 _keep) {
+        (
+            uint256 _ethClaimed,
+            uint256 _lusdClaimed,
+            uint256 _ethWrapped,
+            bool _skippedClaim,
+            bool _skippedWrap
+        ) = _claimAndWrap();
+        uint256 _lqtyToVoter;
+        bool _skippedVoter;
+
+        // set aside our voter's cut of our profit, and send it along with anything we owe it once it's due. profit
+        // our tends already kept from is reported now, so we start over.
+        uint256 _keptProfit = keptProfit;
+        if (_keptProfit > 0) {
+            keptProfit = 0;
+        }
+        address _liquityVoter = address(liquityVoter);
+        if (_liquityVoter != address(0)) {
+            _keep = _voterKeep(_assets, _debt + _keptProfit);
+            uint256 _owed = voterLqtyOwed + _keep;
+            if (_owed > lqtyDust && _voterForwardDue(_owed)) {
+                _forwardToVoter(_liquityVoter, _owed);
+                _lqtyToVoter = _owed;
+            } else if (_owed > 0) {
+                voterLqtyOwed = SafeCast.toUint96(_owed);
+                _skippedVoter = true;
+            }
+        }
+
+        if (_skippedClaim || _skippedWrap || _skippedVoter) {
+            emit HarvestStepsSkipped(
+                _skippedClaim,
+                _skippedWrap,
+                _skippedVoter
+            );
+        }
+        emit RewardsClaimed(
+            _ethClaimed,
+            _lusdClaimed,
+            _ethWrapped,
+            _lqtyToVoter
+        );
+    }
+
+    // our voter's cut of our profit, which is everything we hold beyond our debt. LQTY held back for our liquid buffer
+    // (or for anything else our vault lent us) is never kept.
+    function _voterKeep(
+        uint256 _assets,
+        uint256 _debt
+    ) internal view returns (uint256) {
+        uint256 _keepLQTY = keepLQTY;
+        if (_keepLQTY == 0 || _assets <= _debt) {
+            return 0;
+        }
+        unchecked {
+            return ((_assets - _debt) * _keepLQTY) / FEE_DENOMINATOR;
+        }
+    }
+
+    // with no threshold or interval we forward every time, otherwise whichever we hit first
+    function _voterForwardDue(uint256 _owed) internal view returns (bool) {
+        (uint256 _threshold, uint256 _interval) = (
+            voterForwardThreshold,
+            voterForwardInterval
+        );
+        if (_threshold == 0 && _interval == 0) {
+            return true;
+        }
+        return
+            (_threshold > 0 && _owed >= _threshold) ||
+            (_interval > 0 && block.timestamp - lastVoterForward >= _interval);
+    }
+
+    // send our voter its LQTY and claim accrued yield from it
+    function _forwardToVoter(address _liquityVoter, uint256 _owed) internal {
+        voterLqtyOwed = 0;
+        lastVoterForward = uint32(block.timestamp);
+        lqty.safeTransfer(_liquityVoter, _owed);
+        IVoter(_liquityVoter).strategyHarvest();
+    }
+
+    // claim our liquity gains and wrap our ether, unless either is only dust
+    function _claimAndWrap()
+        internal
+        returns (
+            uint256 _ethClaimed,
+            uint256 _lusdClaimed,
+            uint256 _ethWrapped,
+            bool _skippedClaim,
+            bool _skippedWrap
+        )
+    {
+        (uint256 _ethDust, uint256 _lusdDust) = (ethDust, lusdDust);
+
+        // rewards will be converted later with mev protection by yswaps (tradeFactory)
+        // if we have anything staked, harvest our rewards. can't claim rewards without a stake.
+        // don't bother claiming if there's nothing (or only dust) to claim.
+        if (stakedBalance() > 0) {
+            uint256 _pendingETH = lqtyStaking.getPendingETHGain(address(this));
+            uint256 _pendingLUSD = lqtyStaking.getPendingLUSDGain(
+                address(this)
+            );
+            if (_pendingETH > _ethDust || _pendingLUSD > _lusdDust) {
+                // unstaking zero pays out exactly what's pending
+                lqtyStaking.unstake(0);
+                (_ethClaimed, _lusdClaimed) = (_pendingETH, _pendingLUSD);
+            } else {
+                _skippedClaim = true;
+            }
+        }
+
+        // convert our ether to weth if we have more than dust
+        uint256 ethBalance = address(this).balance;
+        if (ethBalance > _ethDust) {
+            IWeth(address(weth)).deposit{value: ethBalance}();
+            _ethWrapped = ethBalance;
+        } else if (ethBalance > 0) {
+            _skippedWrap = true;
+        }
+    }
+
     function adjustPosition(uint256 _debtOutstanding) internal override {
         // if in emergency exit, we don't want to deploy any more funds
         if (emergencyExit) {
             return;
         }
 
-        // Send all of our LP tokens to the proxy and deposit to the gauge
-        uint256 _toInvest = balanceOfWant();
-        if (_toInvest > 0) {
-            lqtyStaking.stake(_toInvest);
+        // harvests claim in prepareReturn, but tends only call this, so claim here instead. BaseStrategy's tend and
+        // harvest aren't virtual, and a flag in storage would cost every harvest a write and a clear.
+        if (msg.sig == this.tend.selector) {
+            _tendClaim();
+        }
+
+        uint256 _wantBal = balanceOfWant();
+
+        // hold back our liquid buffer, unstaking to top it up if we need to
+        uint256 _buffer = liquidBufferBps;
+        if (_buffer > 0) {
+            uint256 _stakedBal = stakedBalance();
+            uint256 _target = ((_wantBal + _stakedBal) * _buffer) /
+                FEE_DENOMINATOR;
+            if (_wantBal > _target) {
+                lqtyStaking.stake(_wantBal - _target);
+            } else if (_wantBal < _target && _stakedBal > 0) {
+                lqtyStaking.unstake(Math.min(_target - _wantBal, _stakedBal));
+            }
+            return;
+        }
+
+        // stake all of our loose LQTY
+        if (_wantBal > 0) {
+            lqtyStaking.stake(_wantBal);
+        }
+    }
+
+    // claim and wrap like a harvest, and set aside our voter's keep from any new profit before we stake it. we send
+    // that along on our next harvest.
+    function _tendClaim() internal {
+        (
+            uint256 _ethClaimed,
+            uint256 _lusdClaimed,
+            uint256 _ethWrapped,
+            ,
+        ) = _claimAndWrap();
+        emit RewardsClaimed(_ethClaimed, _lusdClaimed, _ethWrapped, 0);
+
+        if (address(liquityVoter) == address(0) || keepLQTY == 0) {
+            return;
+        }
+        uint256 _assets = estimatedTotalAssets();
+        uint256 _debt = vault.strategies(address(this)).totalDebt;
+        uint256 _keep = _voterKeep(_assets, _debt + keptProfit);
+        if (_keep > 0) {
+            voterLqtyOwed = SafeCast.toUint96(voterLqtyOwed + _keep);
+            unchecked {
+                keptProfit = SafeCast.toUint96(_assets - _keep - _debt);
+            }
         }
     }
 
@@ -265,6 +623,13 @@ contract StrategyLQTYStaker is BaseStrategy {
 
     // migrate our want token to a new strategy if needed, as well as any LUSD or WETH
     function prepareMigration(address _newStrategy) internal override {
+        // settle up with our voter, otherwise its LQTY would leave with our want
+        uint256 _owed = voterLqtyOwed;
+        address _liquityVoter = address(liquityVoter);
+        if (_owed > 0 && _liquityVoter != address(0)) {
+            _forwardToVoter(_liquityVoter, _owed);
+        }
+
         uint256 _stakedBal = stakedBalance();
         if (_stakedBal > 0) {
             lqtyStaking.unstake(_stakedBal);
@@ -292,23 +657,62 @@ contract StrategyLQTYStaker is BaseStrategy {
 
     /* ========== YSWAPS ========== */
 
-    /// @notice Use to add or update rewards, rebuilds tradefactory too
-    /// @dev Do this before updating trade factory if we have extra rewards.
-    ///  Can only be called by governance.
-    /// @param _rewards Rewards tokens to add to our trade factory.
+    /// @notice Use to add or update rewards, updates tradefactory too
+    /// @dev Only tokens added or removed are approved/revoked and enabled/disabled, the rest are left alone.
+    ///  Do this before updating trade factory if we have extra rewards. Can only be called by governance.
+    /// @param _rewards Our full list of rewards tokens.
     function updateRewards(address[] memory _rewards) external onlyGovernance {
-        address tf = tradeFactory;
-        _removeTradeFactoryPermissions(true);
-        _updateRewards(_rewards);
+        address _tradeFactory = tradeFactory;
+        address _want = address(want);
 
-        tradeFactory = tf;
-        _setUpTradeFactory();
+        // only touch tokens that are leaving or joining our list
+        address[] memory _current = rewardsTokenSet.values();
+        for (uint256 i; i < _current.length; ++i) {
+            address _rewardsToken = _current[i];
+            if (!_includes(_rewards, _rewardsToken)) {
+                rewardsTokenSet.remove(_rewardsToken);
+                if (_tradeFactory != address(0)) {
+                    IERC20(_rewardsToken).approve(_tradeFactory, 0);
+                    ITradeFactory(_tradeFactory).disable(_rewardsToken, _want);
+                }
+            }
+        }
+
+        for (uint256 i; i < _rewards.length; ++i) {
+            address _rewardsToken = _rewards[i];
+            if (
+                rewardsTokenSet.add(_rewardsToken) &&
+                _tradeFactory != address(0)
+            ) {
+                IERC20(_rewardsToken).approve(_tradeFactory, type(uint256).max);
+                ITradeFactory(_tradeFactory).enable(_rewardsToken, _want);
+            }
+        }
     }
 
-    function _updateRewards(address[] memory _rewardsTokens) internal {
-        // empty the rewardsTokens and rebuild
-        delete rewardsTokens;
-        rewardsTokens = _rewardsTokens;
+    // our lists are short, so a linear search in memory is cheaper than anything in storage
+    function _includes(
+        address[] memory _list,
+        address _token
+    ) internal pure returns (bool) {
+        for (uint256 i; i < _list.length; ++i) {
+            if (_list[i] == _token) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    /// @notice Our rewards tokens, in no particular order.
+    /// @param _index Index of the token, must be less than rewardsTokensLength.
+    /// @return Address of the rewards token.
+    function rewardsTokens(uint256 _index) external view returns (address) {
+        return rewardsTokenSet.at(_index);
+    }
+
+    /// @notice Number of rewards tokens we have.
+    function rewardsTokensLength() external view returns (uint256) {
+        return rewardsTokenSet.length();
     }
 
     /// @notice Use to update our trade factory.
@@ -334,8 +738,9 @@ contract StrategyLQTYStaker is BaseStrategy {
         ITradeFactory tf = ITradeFactory(_tradeFactory);
 
         // enable for all rewards tokens too
-        for (uint256 i; i < rewardsTokens.length; ++i) {
-            address _rewardsToken = rewardsTokens[i];
+        address[] memory _rewardsTokens = rewardsTokenSet.values();
+        for (uint256 i; i < _rewardsTokens.length; ++i) {
+            address _rewardsToken = _rewardsTokens[i];
             IERC20(_rewardsToken).approve(_tradeFactory, type(uint256).max);
             tf.enable(_rewardsToken, _want);
         }
@@ -360,8 +765,9 @@ contract StrategyLQTYStaker is BaseStrategy {
         address _want = address(want);
 
         // disable for all rewards tokens too
-        for (uint256 i; i < rewardsTokens.length; ++i) {
-            address _rewardsToken = rewardsTokens[i];
+        address[] memory _rewardsTokens = rewardsTokenSet.values();
+        for (uint256 i; i < _rewardsTokens.length; ++i) {
+            address _rewardsToken = _rewardsTokens[i];
             IERC20(_rewardsToken).approve(_tradeFactory, 0);
             if (_disableTf) {
                 tf.disable(_rewardsToken, _want);
@@ -380,7 +786,11 @@ contract StrategyLQTYStaker is BaseStrategy {
      *  Don't harvest if a strategy is inactive.
      *  If our profit exceeds our upper limit, then harvest no matter what. For
      *  our lower profit limit, credit threshold, max delay, and manual force trigger,
-     *  only harvest if our gas price is acceptable.
+     *  only harvest if our gas price is acceptable. If profitToCostMultiple is set,
+     *  our lower profit limit also needs profit to cover callCostinEth by that multiple.
+     *
+     *  Checks run cheapest first, so we only price our claimable profit (four
+     *  external calls) once nothing cheaper has already decided the outcome.
      *
      * @param callCostinEth The keeper's estimated gas cost to call harvest() (in wei).
      * @return True if harvest() should be called, false otherwise.
@@ -388,57 +798,138 @@ contract StrategyLQTYStaker is BaseStrategy {
     function harvestTrigger(
         uint256 callCostinEth
     ) public view override returns (bool) {
+        return _harvestTrigger(callCostinEth, false, 0, 0);
+    }
+
+    /// @notice Our harvestTrigger, but with claimable profit and the ether price passed in rather than priced here.
+    /// @dev Lets a lens price many strategies with a single set of oracle calls.
+    /// @param callCostinEth The keeper's estimated gas cost to call harvest() (in wei).
+    /// @param claimableProfit Claimable profit in USDC (6 decimals), see claimableProfitInUsdc.
+    /// @param etherPrice Ether price in USDC (6 decimals) that claimableProfit was priced with, see prices.
+    /// @return True if harvest() should be called, false otherwise.
+    function harvestTriggerWithProfit(
+        uint256 callCostinEth,
+        uint256 claimableProfit,
+        uint256 etherPrice
+    ) public view returns (bool) {
+        return
+            _harvestTrigger(callCostinEth, true, claimableProfit, etherPrice);
+    }
+
+    function _harvestTrigger(
+        uint256 callCostinEth,
+        bool _pricesKnown,
+        uint256 _claimableProfit,
+        uint256 _etherPrice
+    ) internal view returns (bool) {
         // Should not trigger if strategy is not active (no assets and no debtRatio). This means we don't need to adjust keeper job.
-        if (!isActive()) {
+        // same as isActive(), but we hold on to our params to check lastReport below
+        StrategyParams memory params = vault.strategies(address(this));
+        if (params.debtRatio == 0 && estimatedTotalAssets() == 0) {
             return false;
         }
 
-        // harvest if we have a profit to claim at our upper limit without considering gas price
-        uint256 claimableProfit = claimableProfitInUsdc();
-        if (claimableProfit > harvestProfitMaxInUsdc) {
-            return true;
+        // check if the base fee gas price is higher than we allow. if it is, only our upper profit limit can trigger.
+        bool baseFeeAcceptable = isBaseFeeAcceptable();
+        if (baseFeeAcceptable) {
+            // trigger if we want to manually harvest, but only if our gas price is acceptable
+            if (forceHarvestTriggerOnce) {
+                return true;
+            }
+
+            // harvest regardless of profit once we reach our maxDelay
+            if (block.timestamp - params.lastReport > maxReportDelay) {
+                return true;
+            }
+
+            // harvest our credit if it's above our threshold
+            if (vault.creditAvailable() > creditThreshold) {
+                return true;
+            }
         }
 
-        // check if the base fee gas price is higher than we allow. if it is, block harvests.
-        if (!isBaseFeeAcceptable()) {
-            return false;
+        // nothing cheaper triggered, so now price our profit. our call cost below reuses the same ether price.
+        if (!_pricesKnown) {
+            uint256 _lusdPrice;
+            (_lusdPrice, _etherPrice) = prices();
+            _claimableProfit = _claimableProfitInUsdc(_lusdPrice, _etherPrice);
         }
+        (uint256 _minProfit, uint256 _maxProfit) = (
+            harvestProfitMinInUsdc,
+            harvestProfitMaxInUsdc
+        );
 
-        // trigger if we want to manually harvest, but only if our gas price is acceptable
-        if (forceHarvestTriggerOnce) {
+        // harvest if we have a profit to claim at our upper limit without considering gas price
+        if (_claimableProfit > _maxProfit) {
             return true;
         }
 
         // harvest if we have a sufficient profit to claim, but only if our gas price is acceptable
-        if (claimableProfit > harvestProfitMinInUsdc) {
-            return true;
+        if (baseFeeAcceptable && _claimableProfit > _minProfit) {
+            // if we're weighing call cost, also make sure our profit pays for the harvest
+            uint256 _multiple = profitToCostMultiple;
+            return
+                _multiple == 0 ||
+                _claimableProfit * FEE_DENOMINATOR >=
+                _ethToUsdc(callCostinEth, _etherPrice) * _multiple;
         }
 
-        StrategyParams memory params = vault.strategies(address(this));
-        // harvest regardless of profit once we reach our maxDelay
-        if (block.timestamp - params.lastReport > maxReportDelay) {
-            return true;
+        // otherwise, we don't harvest
+        return false;
+    }
+
+    /**
+     * @notice
+     *  Provide a signal to the keeper that tend() should be called. Tending
+     *  claims our liquity gains, wraps our ether, and stakes our idle want,
+     *  all without a vault report.
+     *
+     *  Trigger if our idle want (beyond our liquid buffer) or our claimable
+     *  profit reaches its threshold, but only if our gas price is acceptable.
+     *  A threshold of zero turns that check off.
+     *
+     * @param callCostinEth The keeper's estimated gas cost to call tend() (in wei).
+     * @return True if tend() should be called, false otherwise.
+     */
+    function tendTrigger(
+        uint256 callCostinEth
+    ) public view override returns (bool) {
+        if (emergencyExit || !isBaseFeeAcceptable()) {
+            return false;
         }
 
-        // harvest our credit if it's above our threshold
-        if (vault.creditAvailable() > creditThreshold) {
-            return true;
+        (uint256 _wantThreshold, uint256 _profitThreshold) = (
+            tendWantThreshold,
+            tendProfitThresholdInUsdc
+        );
+
+        // anything we hold back for our buffer isn't idle
+        if (_wantThreshold > 0) {
+            uint256 _wantBal = balanceOfWant();
+            uint256 _target = ((_wantBal + stakedBalance()) *
+                liquidBufferBps) / FEE_DENOMINATOR;
+            if (_wantBal > _target && _wantBal - _target >= _wantThreshold) {
+                return true;
+            }
         }
 
-        // otherwise, we don't harvest
-        return false;
+        return
+            _profitThreshold > 0 &&
+            claimableProfitInUsdc() >= _profitThreshold;
     }
 
     /// @notice Calculates the profit if all claimable assets were sold for USDC (6 decimals).
     /// @dev Uses yearn's lens oracle, if returned values are strange then troubleshoot there.
     /// @return Total return in USDC from selling claimable LUSD and ETH.
     function claimableProfitInUsdc() public view returns (uint256) {
-        IOracle yearnOracle = IOracle(
-            0x83d95e0D5f402511dB06817Aff3f9eA88224B030
-        ); // yearn lens oracle
-        uint256 lusdPrice = yearnOracle.getPriceUsdcRecommended(address(lusd));
-        uint256 etherPrice = yearnOracle.getPriceUsdcRecommended(address(weth));
+        (uint256 lusdPrice, uint256 etherPrice) = prices();
+        return _claimableProfitInUsdc(lusdPrice, etherPrice);
+    }
 
+    function _claimableProfitInUsdc(
+        uint256 lusdPrice,
+        uint256 etherPrice
+    ) internal view returns (uint256) {
         uint256 claimableLusd = lqtyStaking.getPendingLUSDGain(address(this));
         uint256 claimableETH = lqtyStaking.getPendingETHGain(address(this));
 
@@ -446,17 +937,76 @@ contract StrategyLQTYStaker is BaseStrategy {
         return (lusdPrice * claimableLusd + etherPrice * claimableETH) / 1e18;
     }
 
+    /// @notice LUSD and ether prices in USDC (6 decimals).
+    /// @dev Uses our cached prices if the cache is on and fresh, otherwise yearn's lens oracle.
+    /// @return lusdPrice Price of LUSD.
+    /// @return etherPrice Price of ether.
+    function prices()
+        public
+        view
+        returns (uint256 lusdPrice, uint256 etherPrice)
+    {
+        uint256 _maxAge = priceCacheMaxAge;
+        if (_maxAge > 0 && block.timestamp - pricesUpdatedAt <= _maxAge) {
+            return (cachedLusdPrice, cachedEtherPrice);
+        }
+        lusdPrice = yearnOracle.getPriceUsdcRecommended(address(lusd));
+        etherPrice = yearnOracle.getPriceUsdcRecommended(address(weth));
+    }
+
+    /// @notice Convert an amount of ether to USDC (6 decimals).
+    /// @dev Uses the same prices as our claimable profit.
+    /// @param _ethAmount Amount of ether.
+    /// @return Value of ether in USDC.
+    function ethToUsdc(uint256 _ethAmount) public view returns (uint256) {
+        (, uint256 etherPrice) = prices();
+        return _ethToUsdc(_ethAmount, etherPrice);
+    }
+
+    function _ethToUsdc(
+        uint256 _ethAmount,
+        uint256 _etherPrice
+    ) internal pure returns (uint256) {
+        return (_ethAmount * _etherPrice) / 1e18;
+    }
+
     /// @notice Convert our keeper's eth cost into want
-    /// @dev We don't use this since we don't factor call cost into our harvestTrigger.
+    /// @dev Priced through yearn's lens oracle. Both ether and LQTY have 18 decimals.
+    ///  Returns zero if the oracle has no LQTY price, rather than reverting.
     /// @param _ethAmount Amount of ether spent.
     /// @return Value of ether in want.
     function ethToWant(
         uint256 _ethAmount
-    ) public view override returns (uint256) {}
+    ) public view override returns (uint256) {
+        if (_ethAmount == 0) {
+            return 0;
+        }
+        uint256 lqtyPrice = yearnOracle.getPriceUsdcRecommended(address(lqty));
+        if (lqtyPrice == 0) {
+            return 0;
+        }
+        return (ethToUsdc(_ethAmount) * 1e18) / lqtyPrice;
+    }
 
     // include so our contract plays nicely with ether
     receive() external payable {}
 
+    /// @notice Refresh our cached prices from yearn's lens oracle.
+    /// @dev Harvests do this for us too, this lets keepers keep the cache fresh between harvests.
+    function updatePrices() external onlyKeepers {
+        _updatePrices();
+    }
+
+    function _updatePrices() internal {
+        cachedLusdPrice = SafeCast.toUint48(
+            yearnOracle.getPriceUsdcRecommended(address(lusd))
+        );
+        cachedEtherPrice = SafeCast.toUint48(
+            yearnOracle.getPriceUsdcRecommended(address(weth))
+        );
+        pricesUpdatedAt = uint32(block.timestamp);
+    }
+
     /* ========== SETTERS ========== */
     // These functions are useful for setting parameters of the strategy that may need to be adjusted.
 
@@ -470,14 +1020,75 @@ contract StrategyLQTYStaker is BaseStrategy {
         if (_keepLqty > 0 && address(liquityVoter) == address(0)) {
             revert();
         }
-        keepLQTY = _keepLqty;
+        keepLQTY = uint16(_keepLqty);
+    }
+
+    /// @notice Use this to set the dust thresholds our harvests use to skip steps that aren't worth the gas.
+    /// @dev All amounts are in wei. Zero only skips steps that would do nothing at all.
+    /// @param _ethDust Pending or loose ether at or below this isn't claimed or wrapped.
+    /// @param _lusdDust Pending LUSD at or below this isn't claimed.
+    /// @param _lqtyDust LQTY for our voter at or below this isn't sent.
+    function setDustThresholds(
+        uint256 _ethDust,
+        uint256 _lusdDust,
+        uint256 _lqtyDust
+    ) external onlyVaultManagers {
+        ethDust = SafeCast.toUint80(_ethDust);
+        lusdDust = SafeCast.toUint80(_lusdDust);
+        lqtyDust = SafeCast.toUint80(_lqtyDust);
+    }
+
+    /**
+     * @notice
+     *  Here we set the thresholds for our tendTrigger. Zero turns a check off.
+     * @param _tendWantThreshold The amount of idle want that will trigger a tend.
+     * @param _tendProfitThresholdInUsdc The amount of claimable profit (in USDC, 6 decimals)
+     *  that will trigger a tend.
+     */
+    function setTendTriggerParams(
+        uint256 _tendWantThreshold,
+        uint256 _tendProfitThresholdInUsdc
+    ) external onlyVaultManagers {
+        tendWantThreshold = SafeCast.toUint128(_tendWantThreshold);
+        tendProfitThresholdInUsdc = SafeCast.toUint128(
+            _tendProfitThresholdInUsdc
+        );
+    }
+
+    /// @notice Use this to batch up the LQTY we send our voter, rather than sending it on every harvest.
+    /// @dev We send once we owe at least our threshold or our interval has passed, whichever comes first. Set both
+    ///  to zero to send on every harvest.
+    /// @param _voterForwardThreshold LQTY owed to our voter that triggers sending it.
+    /// @param _voterForwardInterval Seconds since we last sent our voter LQTY that triggers sending it.
+    function setVoterForwarding(
+        uint256 _voterForwardThreshold,
+        uint256 _voterForwardInterval
+    ) external onlyVaultManagers {
+        voterForwardThreshold = SafeCast.toUint96(_voterForwardThreshold);
+        voterForwardInterval = SafeCast.toUint32(_voterForwardInterval);
+    }
+
+    /// @notice Use this to set how much of our assets we keep unstaked for withdrawals.
+    /// @dev Set in basis points, zero stakes everything. Takes effect on our next harvest.
+    /// @param _liquidBufferBps Percent of total assets to hold back from staking.
+    function setLiquidBuffer(
+        uint256 _liquidBufferBps
+    ) external onlyVaultManagers {
+        require(_liquidBufferBps <= FEE_DENOMINATOR, "!bps");
+        liquidBufferBps = uint16(_liquidBufferBps);
     }
 
     /// @notice Use this to set or update our voter contracts.
-    /// @dev This is where we send our keepLQTY to compound rewards
-    ///  Only governance can set this.
+    /// @dev This is where we send our keepLQTY to compound rewards. Any LQTY we owe our current voter is sent to it
+    ///  first, so call this before that voter removes us. Only governance can set this.
     /// @param _voter Address of our liquity voter.
     function setVoter(address _voter) external onlyGovernance {
+        // settle up with our current voter, otherwise its LQTY would go to the next one
+        uint256 _owed = voterLqtyOwed;
+        address _liquityVoter = address(liquityVoter);
+        if (_owed > 0 && _liquityVoter != address(0)) {
+            _forwardToVoter(_liquityVoter, _owed);
+        }
         liquityVoter = IVoter(_voter);
     }
 
@@ -493,7 +1104,28 @@ contract StrategyLQTYStaker is BaseStrategy {
         uint256 _harvestProfitMinInUsdc,
         uint256 _harvestProfitMaxInUsdc
     ) external onlyVaultManagers {
-        harvestProfitMinInUsdc = _harvestProfitMinInUsdc;
-        harvestProfitMaxInUsdc = _harvestProfitMaxInUsdc;
+        harvestProfitMinInUsdc = SafeCast.toUint128(_harvestProfitMinInUsdc);
+        harvestProfitMaxInUsdc = SafeCast.toUint128(_harvestProfitMaxInUsdc);
+    }
+
+    /// @notice Use this to weigh our keeper's call cost in harvestTrigger.
+    /// @dev Set to zero to ignore call cost. Set in basis points, so 10,000 means profit must at least match cost.
+    /// @param _profitToCostMultiple Multiple of call cost our claimable profit must reach to trigger a harvest.
+    function setProfitToCostMultiple(
+        uint256 _profitToCostMultiple
+    ) external onlyVaultManagers {
+        profitToCostMultiple = SafeCast.toUint32(_profitToCostMultiple);
+    }
+
+    /// @notice Use this to turn our price cache on or off, and to set how long cached prices are good for.
+    /// @dev Set to zero to always use the oracle. Turning it on fills the cache.
+    /// @param _priceCacheMaxAge Seconds our cached prices are used for after an update.
+    function setPriceCacheMaxAge(
+        uint256 _priceCacheMaxAge
+    ) external onlyVaultManagers {
+        priceCacheMaxAge = SafeCast.toUint32(_priceCacheMaxAge);
+        if (_priceCacheMaxAge > 0) {
+            _updatePrices();
+        }
     }
 }
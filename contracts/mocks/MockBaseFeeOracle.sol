@@ -0,0 +1,35 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+interface IBaseFeeProvider {
+    function basefee_global() external view returns (uint256);
+}
+
+/// @notice Local stand-in for yearn's base fee oracle.
+/// @dev Permissionless, unlike the deployed oracle. With no provider set we just return our manual bool.
+contract MockBaseFeeOracle {
+    address public baseFeeProvider;
+    uint256 public maxAcceptableBaseFee;
+    bool public manualBaseFeeBool;
+
+    function isCurrentBaseFeeAcceptable() external view returns (bool) {
+        if (baseFeeProvider == address(0)) {
+            return manualBaseFeeBool;
+        }
+        return
+            IBaseFeeProvider(baseFeeProvider).basefee_global() <=
+            maxAcceptableBaseFee;
+    }
+
+    function setBaseFeeProvider(address _baseFeeProvider) external {
+        baseFeeProvider = _baseFeeProvider;
+    }
+
+    function setMaxAcceptableBaseFee(uint256 _maxAcceptableBaseFee) external {
+        maxAcceptableBaseFee = _maxAcceptableBaseFee;
+    }
+
+    function setManualBaseFeeBool(bool _manualBaseFeeBool) external {
+        manualBaseFeeBool = _manualBaseFeeBool;
+    }
+}
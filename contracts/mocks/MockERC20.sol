@@ -0,0 +1,33 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+/// @notice Freely mintable ERC-20 used as a local stand-in for LQTY, LUSD and friends.
+/// @dev Our stand-ins are deployed once and then have their runtime code copied to the canonical
+///  mainnet address, so nothing set in the constructor survives. Metadata is set with initialize().
+contract MockERC20 is ERC20 {
+    string internal tokenName;
+    string internal tokenSymbol;
+
+    constructor() ERC20("", "") {}
+
+    function initialize(string memory _name, string memory _symbol) external {
+        require(bytes(tokenSymbol).length == 0, "initialized");
+        tokenName = _name;
+        tokenSymbol = _symbol;
+    }
+
+    function name() public view override returns (string memory) {
+        return tokenName;
+    }
+
+    function symbol() public view override returns (string memory) {
+        return tokenSymbol;
+    }
+
+    /// @notice Anyone can mint, this is only ever used on a local dev chain.
+    function mint(address _to, uint256 _amount) external {
+        _mint(_to, _amount);
+    }
+}
@@ -0,0 +1,36 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+/// @notice Local stand-in for yearn's common health check, using the same default profit and loss limits.
+contract MockHealthCheck {
+    uint256 internal constant MAX_BPS = 10_000;
+
+    uint256 public profitLimitRatio;
+    uint256 public lossLimitRatio;
+
+    function setProfitLimitRatio(uint256 _profitLimitRatio) external {
+        require(_profitLimitRatio < MAX_BPS);
+        profitLimitRatio = _profitLimitRatio;
+    }
+
+    function setlossLimitRatio(uint256 _lossLimitRatio) external {
+        require(_lossLimitRatio < MAX_BPS);
+        lossLimitRatio = _lossLimitRatio;
+    }
+
+    function check(
+        uint256 _profit,
+        uint256 _loss,
+        uint256,
+        uint256,
+        uint256 _totalDebt
+    ) external view returns (bool) {
+        if (_profit > ((_totalDebt * profitLimitRatio) / MAX_BPS)) {
+            return false;
+        }
+        if (_loss > ((_totalDebt * lossLimitRatio) / MAX_BPS)) {
+            return false;
+        }
+        return true;
+    }
+}
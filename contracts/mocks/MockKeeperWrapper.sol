@@ -0,0 +1,13 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+interface IHarvestable {
+    function harvest() external;
+}
+
+/// @notice Local stand-in for yearn's KeeperWrapper, makes harvest public when set as a strategy's keeper.
+contract MockKeeperWrapper {
+    function harvest(address _strategy) external {
+        IHarvestable(_strategy).harvest();
+    }
+}
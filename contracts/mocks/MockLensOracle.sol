@@ -0,0 +1,18 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+/// @notice Local stand-in for yearn's lens price oracle.
+/// @dev Prices are in USDC (6 decimals), same as the deployed oracle.
+contract MockLensOracle {
+    mapping(address => uint256) public prices;
+
+    function setPrice(address _token, uint256 _price) external {
+        prices[_token] = _price;
+    }
+
+    function getPriceUsdcRecommended(
+        address _token
+    ) external view returns (uint256) {
+        return prices[_token];
+    }
+}
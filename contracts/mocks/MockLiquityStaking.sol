@@ -0,0 +1,212 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+import "@openzeppelin/contracts/utils/math/Math.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+
+interface IMintable {
+    function mint(address _to, uint256 _amount) external;
+}
+
+/// @notice Local stand-in for Liquity's LQTYStaking.
+/// @dev Mirrors the F_ETH/F_LUSD accumulator math and caller checks of the deployed contract at
+///  0x4f9Fbb3f1E99B56e0Fe2892e623Ed36A76Fc605d. The only differences are that stake() pulls LQTY with
+///  transferFrom instead of the LQTY token's privileged sendToLQTYStaking, and that LUSD fees are minted
+///  here when F_LUSD is increased instead of by BorrowerOperations.
+contract MockLiquityStaking {
+    using SafeERC20 for IERC20;
+
+    uint256 internal constant DECIMAL_PRECISION = 1e18;
+
+    IERC20 public constant lqtyToken =
+        IERC20(0x6DEA81C8171D0bA574754EF6F8b412F2Ed88c54D);
+
+    IERC20 public constant lusdToken =
+        IERC20(0x5f98805A4E8be255a32880FDeC7F6728C6568bA0);
+
+    address public constant troveManagerAddress =
+        0xA39739EF8b0231DbFA0DcdA07d7e29faAbCf4bb2;
+
+    address public constant borrowerOperationsAddress =
+        0x24179CD81c9e782A4096035f7eC97fB8B783e007;
+
+    struct Snapshot {
+        uint256 F_ETH_Snapshot;
+        uint256 F_LUSD_Snapshot;
+    }
+
+    mapping(address => uint256) public stakes;
+    uint256 public totalLQTYStaked;
+
+    // running sums of ETH and LUSD fees per staked LQTY
+    uint256 public F_ETH;
+    uint256 public F_LUSD;
+
+    mapping(address => Snapshot) public snapshots;
+
+    event StakeChanged(address indexed staker, uint256 newStake);
+    event StakingGainsWithdrawn(
+        address indexed staker,
+        uint256 LUSDGain,
+        uint256 ETHGain
+    );
+    event F_ETHUpdated(uint256 _F_ETH);
+    event F_LUSDUpdated(uint256 _F_LUSD);
+    event TotalLQTYStakedUpdated(uint256 _totalLQTYStaked);
+    event EtherSent(address _account, uint256 _amount);
+    event StakerSnapshotsUpdated(
+        address _staker,
+        uint256 _F_ETH,
+        uint256 _F_LUSD
+    );
+
+    /* ========== STAKING ========== */
+
+    function stake(uint256 _LQTYamount) external {
+        require(_LQTYamount > 0, "LQTYStaking: Amount must be non-zero");
+
+        uint256 currentStake = stakes[msg.sender];
+
+        uint256 ETHGain;
+        uint256 LUSDGain;
+        // grab any accumulated ETH and LUSD gains from the current stake
+        if (currentStake != 0) {
+            ETHGain = _getPendingETHGain(msg.sender);
+            LUSDGain = _getPendingLUSDGain(msg.sender);
+        }
+
+        _updateUserSnapshots(msg.sender);
+
+        uint256 newStake = currentStake + _LQTYamount;
+        stakes[msg.sender] = newStake;
+        totalLQTYStaked += _LQTYamount;
+        emit TotalLQTYStakedUpdated(totalLQTYStaked);
+
+        lqtyToken.safeTransferFrom(msg.sender, address(this), _LQTYamount);
+
+        emit StakeChanged(msg.sender, newStake);
+        emit StakingGainsWithdrawn(msg.sender, LUSDGain, ETHGain);
+
+        // send accumulated LUSD and ETH gains to the caller
+        if (currentStake != 0) {
+            lusdToken.safeTransfer(msg.sender, LUSDGain);
+            _sendETHGainToUser(ETHGain);
+        }
+    }
+
+    // unstake the LQTY and send it back to the caller, along with their accumulated LUSD & ETH gains.
+    // if the requested amount > stake, send their entire stake.
+    function unstake(uint256 _LQTYamount) external {
+        uint256 currentStake = stakes[msg.sender];
+        require(
+            currentStake > 0,
+            "LQTYStaking: User must have a non-zero stake"
+        );
+
+        uint256 ETHGain = _getPendingETHGain(msg.sender);
+        uint256 LUSDGain = _getPendingLUSDGain(msg.sender);
+
+        _updateUserSnapshots(msg.sender);
+
+        if (_LQTYamount > 0) {
+            uint256 LQTYToWithdraw = Math.min(_LQTYamount, currentStake);
+
+            uint256 newStake = currentStake - LQTYToWithdraw;
+            stakes[msg.sender] = newStake;
+            totalLQTYStaked -= LQTYToWithdraw;
+            emit TotalLQTYStakedUpdated(totalLQTYStaked);
+
+            lqtyToken.safeTransfer(msg.sender, LQTYToWithdraw);
+
+            emit StakeChanged(msg.sender, newStake);
+        }
+
+        emit StakingGainsWithdrawn(msg.sender, LUSDGain, ETHGain);
+
+        lusdToken.safeTransfer(msg.sender, LUSDGain);
+        _sendETHGainToUser(ETHGain);
+    }
+
+    /* ========== REWARD-PER-UNIT-STAKED INCREASE FUNCTIONS ========== */
+
+    /// @dev Like on mainnet, the ether itself arrives separately (from the ActivePool there, any sender here).
+    function increaseF_ETH(uint256 _ETHFee) external {
+        require(
+            msg.sender == troveManagerAddress,
+            "LQTYStaking: caller is not TroveM"
+        );
+        uint256 ETHFeePerLQTYStaked;
+
+        if (totalLQTYStaked > 0) {
+            ETHFeePerLQTYStaked =
+                (_ETHFee * DECIMAL_PRECISION) /
+                totalLQTYStaked;
+        }
+
+        F_ETH += ETHFeePerLQTYStaked;
+        emit F_ETHUpdated(F_ETH);
+    }
+
+    function increaseF_LUSD(uint256 _LUSDFee) external {
+        require(
+            msg.sender == borrowerOperationsAddress,
+            "LQTYStaking: caller is not BorrowerOps"
+        );
+        uint256 LUSDFeePerLQTYStaked;
+
+        if (totalLQTYStaked > 0) {
+            LUSDFeePerLQTYStaked =
+                (_LUSDFee * DECIMAL_PRECISION) /
+                totalLQTYStaked;
+        }
+
+        // BorrowerOperations mints the fee to us on mainnet
+        IMintable(address(lusdToken)).mint(address(this), _LUSDFee);
+
+        F_LUSD += LUSDFeePerLQTYStaked;
+        emit F_LUSDUpdated(F_LUSD);
+    }
+
+    /* ========== PENDING REWARD FUNCTIONS ========== */
+
+    function getPendingETHGain(address _user) external view returns (uint256) {
+        return _getPendingETHGain(_user);
+    }
+
+    function _getPendingETHGain(address _user) internal view returns (uint256) {
+        uint256 F_ETH_Snapshot = snapshots[_user].F_ETH_Snapshot;
+        return (stakes[_user] * (F_ETH - F_ETH_Snapshot)) / DECIMAL_PRECISION;
+    }
+
+    function getPendingLUSDGain(
+        address _user
+    ) external view returns (uint256) {
+        return _getPendingLUSDGain(_user);
+    }
+
+    function _getPendingLUSDGain(
+        address _user
+    ) internal view returns (uint256) {
+        uint256 F_LUSD_Snapshot = snapshots[_user].F_LUSD_Snapshot;
+        return
+            (stakes[_user] * (F_LUSD - F_LUSD_Snapshot)) / DECIMAL_PRECISION;
+    }
+
+    /* ========== INTERNAL HELPERS ========== */
+
+    function _updateUserSnapshots(address _user) internal {
+        snapshots[_user].F_ETH_Snapshot = F_ETH;
+        snapshots[_user].F_LUSD_Snapshot = F_LUSD;
+        emit StakerSnapshotsUpdated(_user, F_ETH, F_LUSD);
+    }
+
+    function _sendETHGainToUser(uint256 ETHGain) internal {
+        emit EtherSent(msg.sender, ETHGain);
+        (bool success, ) = msg.sender.call{value: ETHGain}("");
+        require(success, "LQTYStaking: Failed to send accumulated ETHGain");
+    }
+
+    // the deployed contract only accepts ether from the ActivePool, we accept it from anyone for easy funding
+    receive() external payable {}
+}
@@ -0,0 +1,17 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+/// @notice Local stand-in for the ySwaps trade factory. Only tracks which swaps a strategy has enabled.
+contract MockTradeFactory {
+    // strategy => tokenIn => tokenOut => enabled
+    mapping(address => mapping(address => mapping(address => bool)))
+        public enabled;
+
+    function enable(address _tokenIn, address _tokenOut) external {
+        enabled[msg.sender][_tokenIn][_tokenOut] = true;
+    }
+
+    function disable(address _tokenIn, address _tokenOut) external {
+        enabled[msg.sender][_tokenIn][_tokenOut] = false;
+    }
+}
@@ -0,0 +1,21 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+import "./MockERC20.sol";
+
+/// @notice WETH9-style wrapper used as a local stand-in for WETH.
+contract MockWETH is MockERC20 {
+    function deposit() public payable {
+        _mint(msg.sender, msg.value);
+    }
+
+    function withdraw(uint256 _amount) external {
+        _burn(msg.sender, _amount);
+        (bool success, ) = msg.sender.call{value: _amount}("");
+        require(success, "ETH transfer failed");
+    }
+
+    receive() external payable {
+        deposit();
+    }
+}
@@ -0,0 +1,133 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+import "@openzeppelin/contracts/proxy/Clones.sol";
+
+interface IStrategy {
+    function initialize(
+        address _vault,
+        address _strategist,
+        address _rewards,
+        address _keeper,
+        address _tradeFactory,
+        uint256 _harvestProfitMinInUsdc,
+        uint256 _harvestProfitMaxInUsdc,
+        address _voter
+    ) external;
+}
+
+interface IVoter {
+    function initialize(address _strategy, address _owner) external;
+}
+
+/// @notice Deploys a StrategyLQTYStaker and its yLQTYVoter together as EIP-1167 minimal proxies.
+/// @dev Clones delegate to our implementations, so they cost a fraction of a full deployment.
+contract yLQTYFactory {
+    /* ========== STATE VARIABLES ========== */
+
+    /// @notice The StrategyLQTYStaker our strategies are cloned from.
+    address public immutable strategyImplementation;
+
+    /// @notice The yLQTYVoter our voters are cloned from.
+    address public immutable voterImplementation;
+
+    /* ========== EVENTS ========== */
+
+    event Deployed(
+        address indexed vault,
+        address indexed strategy,
+        address indexed voter
+    );
+
+    /* ========== CONSTRUCTOR ========== */
+
+    constructor(address _strategyImplementation, address _voterImplementation) {
+        strategyImplementation = _strategyImplementation;
+        voterImplementation = _voterImplementation;
+    }
+
+    /* ========== CORE FUNCTIONS ========== */
+
+    /// @notice Deploy a strategy and its voter, wired up to each other.
+    /// @dev Our strategy still needs to be added to its vault by governance.
+    /// @param _vault Address of the vault our strategy is for.
+    /// @param _strategist Address of our strategist, also our strategy's rewards address.
+    /// @param _keeper Address of our keeper.
+    /// @param _tradeFactory Address of our ySwaps trade factory.
+    /// @param _harvestProfitMinInUsdc See StrategyLQTYStaker.setHarvestTriggerParams.
+    /// @param _harvestProfitMaxInUsdc See StrategyLQTYStaker.setHarvestTriggerParams.
+    /// @param _voterOwner Address that will own our voter.
+    /// @param _salt Use zero for regular clones, anything else for deterministic ones (see predictAddresses).
+    /// @return strategy Address of our new strategy.
+    /// @return voter Address of our new voter.
+    function deploy(
+        address _vault,
+        address _strategist,
+        address _keeper,
+        address _tradeFactory,
+        uint256 _harvestProfitMinInUsdc,
+        uint256 _harvestProfitMaxInUsdc,
+        address _voterOwner,
+        bytes32 _salt
+    ) external returns (address strategy, address voter) {
+        if (_salt == bytes32(0)) {
+            strategy = Clones.clone(strategyImplementation);
+            voter = Clones.clone(voterImplementation);
+        } else {
+            (bytes32 strategySalt, bytes32 voterSalt) = _salts(
+                msg.sender,
+                _salt
+            );
+            strategy = Clones.cloneDeterministic(
+                strategyImplementation,
+                strategySalt
+            );
+            voter = Clones.cloneDeterministic(voterImplementation, voterSalt);
+        }
+
+        IVoter(voter).initialize(strategy, _voterOwner);
+        IStrategy(strategy).initialize(
+            _vault,
+            _strategist,
+            _strategist,
+            _keeper,
+            _tradeFactory,
+            _harvestProfitMinInUsdc,
+            _harvestProfitMaxInUsdc,
+            voter
+        );
+
+        emit Deployed(_vault, strategy, voter);
+    }
+
+    /* ========== VIEWS ========== */
+
+    /// @notice Where a deterministic deploy will put our strategy and voter.
+    /// @dev Salts are per deployer, so nobody can take our addresses by deploying with our salt first.
+    /// @param _deployer Address that will call deploy.
+    /// @param _salt Non-zero salt that will be passed to deploy.
+    /// @return strategy Address of our strategy.
+    /// @return voter Address of our voter.
+    function predictAddresses(
+        address _deployer,
+        bytes32 _salt
+    ) external view returns (address strategy, address voter) {
+        (bytes32 strategySalt, bytes32 voterSalt) = _salts(_deployer, _salt);
+        strategy = Clones.predictDeterministicAddress(
+            strategyImplementation,
+            strategySalt
+        );
+        voter = Clones.predictDeterministicAddress(
+            voterImplementation,
+            voterSalt
+        );
+    }
+
+    function _salts(
+        address _deployer,
+        bytes32 _salt
+    ) internal pure returns (bytes32 strategySalt, bytes32 voterSalt) {
+        strategySalt = keccak256(abi.encode(_deployer, _salt, "strategy"));
+        voterSalt = keccak256(abi.encode(_deployer, _salt, "voter"));
+    }
+}
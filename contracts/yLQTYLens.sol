@@ -0,0 +1,188 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity ^0.8.15;
+
+import "@yearnvaults/contracts/BaseStrategy.sol";
+
+interface IOracle {
+    function getPriceUsdcRecommended(
+        address tokenAddress
+    ) external view returns (uint256);
+}
+
+interface ILiquityStaking {
+    function getPendingETHGain(address _user) external view returns (uint);
+
+    function getPendingLUSDGain(address _user) external view returns (uint);
+
+    function stakes(address _user) external view returns (uint);
+}
+
+interface IStrategy {
+    function vault() external view returns (address);
+
+    function priceCacheMaxAge() external view returns (uint256);
+
+    function prices()
+        external
+        view
+        returns (uint256 lusdPrice, uint256 etherPrice);
+
+    function harvestTriggerWithProfit(
+        uint256 callCostinEth,
+        uint256 claimableProfit,
+        uint256 etherPrice
+    ) external view returns (bool);
+}
+
+interface IVault {
+    function strategies(
+        address _strategy
+    ) external view returns (StrategyParams memory);
+
+    function creditAvailable(
+        address _strategy
+    ) external view returns (uint256);
+}
+
+/// @notice Read-only view of any number of yLQTY strategies and voters in a single call, for keepers.
+/// @dev Oracle prices are fetched once per call and shared by every entry, except for strategies with their price
+///  cache on. Those are priced the same way they price themselves, so our trigger always matches theirs.
+contract yLQTYLens {
+    /* ========== STATE VARIABLES ========== */
+
+    /// @notice LQTY staking contract
+    ILiquityStaking public constant lqtyStaking =
+        ILiquityStaking(0x4f9Fbb3f1E99B56e0Fe2892e623Ed36A76Fc605d);
+
+    /// @notice Yearn's lens oracle, prices are in USDC (6 decimals)
+    IOracle public constant yearnOracle =
+        IOracle(0x83d95e0D5f402511dB06817Aff3f9eA88224B030);
+
+    /// @notice Address of our main rewards token, LUSD
+    address public constant lusd = 0x5f98805A4E8be255a32880FDeC7F6728C6568bA0;
+
+    /// @notice We price our ether rewards as weth
+    address public constant weth = 0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2;
+
+    struct StrategyInfo {
+        address strategy;
+        bool harvestTrigger;
+        uint256 claimableProfitInUsdc;
+        uint256 pendingETH;
+        uint256 pendingLUSD;
+        uint256 stakedBalance;
+        uint256 lastReport;
+        uint256 creditAvailable;
+    }
+
+    struct VoterInfo {
+        address voter;
+        uint256 claimableProfitInUsdc;
+        uint256 pendingETH;
+        uint256 pendingLUSD;
+        uint256 stakedBalance;
+    }
+
+    /* ========== VIEWS ========== */
+
+    /// @notice Everything a keeper needs to know about our strategies and voters.
+    /// @param _strategies Strategies to check.
+    /// @param _voters Voters to check.
+    /// @param _callCostinEth The keeper's estimated gas cost to call harvest() (in wei).
+    /// @return lusdPrice Oracle LUSD price, used for every entry without its own cached price.
+    /// @return etherPrice Oracle ether price, used for every entry without its own cached price.
+    /// @return strategyInfo One entry per strategy, in the order given.
+    /// @return voterInfo One entry per voter, in the order given.
+    function getInfo(
+        address[] calldata _strategies,
+        address[] calldata _voters,
+        uint256 _callCostinEth
+    )
+        external
+        view
+        returns (
+            uint256 lusdPrice,
+            uint256 etherPrice,
+            StrategyInfo[] memory strategyInfo,
+            VoterInfo[] memory voterInfo
+        )
+    {
+        lusdPrice = yearnOracle.getPriceUsdcRecommended(lusd);
+        etherPrice = yearnOracle.getPriceUsdcRecommended(weth);
+
+        strategyInfo = new StrategyInfo[](_strategies.length);
+        for (uint256 i; i < _strategies.length; ++i) {
+            strategyInfo[i] = _strategyInfo(
+                _strategies[i],
+                lusdPrice,
+                etherPrice,
+                _callCostinEth
+            );
+        }
+
+        voterInfo = new VoterInfo[](_voters.length);
+        for (uint256 i; i < _voters.length; ++i) {
+            VoterInfo memory info = voterInfo[i];
+            info.voter = _voters[i];
+            (
+                info.pendingETH,
+                info.pendingLUSD,
+                info.stakedBalance,
+                info.claimableProfitInUsdc
+            ) = _stakingInfo(_voters[i], lusdPrice, etherPrice);
+        }
+    }
+
+    // a strategy with its price cache on prices its profit (and so its trigger) with its own prices, so we do too
+    function _strategyInfo(
+        address _strategy,
+        uint256 _lusdPrice,
+        uint256 _etherPrice,
+        uint256 _callCostinEth
+    ) internal view returns (StrategyInfo memory info) {
+        info.strategy = _strategy;
+        if (IStrategy(_strategy).priceCacheMaxAge() > 0) {
+            (_lusdPrice, _etherPrice) = IStrategy(_strategy).prices();
+        }
+        (
+            info.pendingETH,
+            info.pendingLUSD,
+            info.stakedBalance,
+            info.claimableProfitInUsdc
+        ) = _stakingInfo(_strategy, _lusdPrice, _etherPrice);
+
+        IVault vault = IVault(IStrategy(_strategy).vault());
+        info.lastReport = vault.strategies(_strategy).lastReport;
+        info.creditAvailable = vault.creditAvailable(_strategy);
+        info.harvestTrigger = IStrategy(_strategy).harvestTriggerWithProfit(
+            _callCostinEth,
+            info.claimableProfitInUsdc,
+            _etherPrice
+        );
+    }
+
+    // same math as claimableProfitInUsdc on our strategy and voter
+    function _stakingInfo(
+        address _staker,
+        uint256 _lusdPrice,
+        uint256 _etherPrice
+    )
+        internal
+        view
+        returns (
+            uint256 pendingETH,
+            uint256 pendingLUSD,
+            uint256 staked,
+            uint256 claimableProfit
+        )
+    {
+        pendingETH = lqtyStaking.getPendingETHGain(_staker);
+        pendingLUSD = lqtyStaking.getPendingLUSDGain(_staker);
+        staked = lqtyStaking.stakes(_staker);
+
+        // Oracle returns prices as 6 decimals, so multiply by claimable amount and divide by token decimals (1e18)
+        claimableProfit =
+            (_lusdPrice * pendingLUSD + _etherPrice * pendingETH) /
+            1e18;
+    }
+}
@@ -6,6 +6,7 @@ import "@openzeppelin/contracts/utils/math/Math.sol";
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
 import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
 
 interface IWeth {
     function deposit() external payable;
@@ -29,7 +30,7 @@ interface ILiquityStaking {
     function stakes(address _user) external view returns (uint);
 }
 
-contract yLQTYVoter is Ownable {
+contract yLQTYVoter is Ownable, Initializable {
     using SafeERC20 for IERC20;
     /* ========== STATE VARIABLES ========== */
 
@@ -37,12 +38,12 @@ contract yLQTYVoter is Ownable {
     ILiquityStaking public constant lqtyStaking =
         ILiquityStaking(0x4f9Fbb3f1E99B56e0Fe2892e623Ed36A76Fc605d);
 
-    /// @notice LQTY strategy
-    address public strategy;
-
     // this means all of our fee values are in basis points
     uint256 internal constant FEE_DENOMINATOR = 10000;
 
+    // our reward accumulators are scaled up by this much to limit rounding
+    uint256 internal constant PRECISION = 1e18;
+
     /// @notice Address of our main rewards token, LUSD
     IERC20 public constant lusd =
         IERC20(0x5f98805A4E8be255a32880FDeC7F6728C6568bA0);
@@ -58,17 +59,98 @@ contract yLQTYVoter is Ownable {
     /// @notice This makes sure gov can only sweep out LQTY after a 2-week waiting period.
     uint256 public unstakeQueued;
 
+    struct Position {
+        bool active; // whether this strategy is registered with us
+        uint248 shares; // LQTY this strategy has contributed to our stake
+        uint256 lusdDebt; // shares * lusdPerShare as of this strategy's last payout
+        uint256 wethDebt; // shares * wethPerShare as of this strategy's last payout
+    }
+
+    /// @notice Deprecated, see isStrategy and positions. The first strategy added to us, while it's still registered.
+    /// @dev Kept so integrations built against our single-strategy interface still read the right address.
+    address public strategy;
+
+    /// @notice Each strategy we vote for, and its share of our stake.
+    mapping(address => Position) public positions;
+
+    /// @notice Sum of shares over all of our strategies.
+    uint256 public totalShares;
+
+    /// @notice LUSD paid out to us per share, scaled by 1e18.
+    uint256 public lusdPerShare;
+
+    /// @notice WETH paid out to us per share, scaled by 1e18.
+    uint256 public wethPerShare;
+
+    /// @notice LUSD we hold that has been credited to strategies, but not yet sent to them.
+    uint256 public lusdReserved;
+
+    /// @notice WETH we hold that has been credited to strategies, but not yet sent to them.
+    uint256 public wethReserved;
+
+    /// @notice Everything we track, see snapshot.
+    struct Snapshot {
+        address owner;
+        uint256 stakedBalance;
+        uint256 pendingETH;
+        uint256 pendingLUSD;
+        uint256 lqtyBalance;
+        uint256 lusdBalance;
+        uint256 wethBalance;
+        uint256 unstakeQueued;
+        uint256 totalShares;
+        uint256 lusdPerShare;
+        uint256 wethPerShare;
+        uint256 lusdReserved;
+        uint256 wethReserved;
+    }
+
     /* ========== EVENTS ========== */
 
     event LqtySwept(uint256 indexed amount);
 
+    event StrategyAdded(address indexed strategy);
+
+    event StrategyRemoved(address indexed strategy);
+
+    /// @notice Emitted on every strategyHarvest. Distributed amounts are everything newly credited to all shares.
+    event StrategyHarvested(
+        address indexed strategy,
+        uint256 lqtyStaked,
+        uint256 lusdDistributed,
+        uint256 wethDistributed,
+        uint256 lusdPaid,
+        uint256 wethPaid
+    );
+
     /* ========== CONSTRUCTOR ========== */
 
     constructor(address _strategy) {
+        _initializeVoter(_strategy);
+        // our clones are initialized instead, never us, even if we renounce ownership
+        _disableInitializers();
+    }
+
+    /// @notice Set up a clone of this voter, see yLQTYFactory.
+    /// @dev Only works once, and never on a voter deployed with our constructor.
+    /// @param _strategy Address of our first lqty strategy.
+    /// @param _owner Address that will own this voter.
+    function initialize(
+        address _strategy,
+        address _owner
+    ) external initializer {
+        require(_owner != address(0));
+        _transferOwnership(_owner);
+        _initializeVoter(_strategy);
+    }
+
+    function _initializeVoter(address _strategy) internal {
         // do our approvals
         lqty.approve(address(lqtyStaking), type(uint256).max);
-        strategy = _strategy;
         unstakeQueued = type(uint256).max;
+        if (_strategy != address(0)) {
+            _addStrategy(_strategy);
+        }
     }
 
     /* ========== MODIFIERS ========== */
@@ -79,7 +161,7 @@ contract yLQTYVoter is Ownable {
     }
 
     function _onlyStrategy() internal {
-        require(msg.sender == strategy);
+        require(positions[msg.sender].active);
     }
 
     /* ========== VIEWS ========== */
@@ -94,32 +176,163 @@ contract yLQTYVoter is Ownable {
         return lqtyStaking.stakes(address(this));
     }
 
+    /// @notice All of our accounting and config in a single call, for monitoring.
+    /// @dev See positions for each strategy's share.
+    /// @return snap Our current state.
+    function snapshot() external view returns (Snapshot memory snap) {
+        snap.owner = owner();
+        snap.stakedBalance = stakedBalance();
+        snap.pendingETH = lqtyStaking.getPendingETHGain(address(this));
+        snap.pendingLUSD = lqtyStaking.getPendingLUSDGain(address(this));
+        snap.lqtyBalance = lqty.balanceOf(address(this));
+        snap.lusdBalance = lusd.balanceOf(address(this));
+        snap.wethBalance = weth.balanceOf(address(this));
+        snap.unstakeQueued = unstakeQueued;
+        snap.totalShares = totalShares;
+        snap.lusdPerShare = lusdPerShare;
+        snap.wethPerShare = wethPerShare;
+        snap.lusdReserved = lusdReserved;
+        snap.wethReserved = wethReserved;
+    }
+
+    /// @notice Whether a strategy is registered with this voter.
+    function isStrategy(address _strategy) external view returns (bool) {
+        return positions[_strategy].active;
+    }
+
+    /// @notice LUSD and WETH a strategy would receive from its next harvest, assuming no new LQTY.
+    /// @dev Includes its share of anything still pending in liquity.
+    /// @param _strategy Address of the strategy to check.
+    /// @return lusdAmount LUSD owed to this strategy.
+    /// @return wethAmount WETH (and pending ether) owed to this strategy.
+    function pendingRewards(
+        address _strategy
+    ) external view returns (uint256 lusdAmount, uint256 wethAmount) {
+        Position memory position = positions[_strategy];
+        uint256 _totalShares = totalShares;
+        if (_totalShares == 0) {
+            return (0, 0);
+        }
+
+        // anything not yet credited would be split by share on our next harvest
+        uint256 newLusd = lqtyStaking.getPendingLUSDGain(address(this)) +
+            lusd.balanceOf(address(this)) -
+            lusdReserved;
+        uint256 newWeth = lqtyStaking.getPendingETHGain(address(this)) +
+            address(this).balance +
+            weth.balanceOf(address(this)) -
+            wethReserved;
+        uint256 _lusdPerShare = lusdPerShare +
+            (newLusd * PRECISION) /
+            _totalShares;
+        uint256 _wethPerShare = wethPerShare +
+            (newWeth * PRECISION) /
+            _totalShares;
+
+        lusdAmount =
+            (position.shares * _lusdPerShare) /
+            PRECISION -
+            position.lusdDebt;
+        wethAmount =
+            (position.shares * _wethPerShare) /
+            PRECISION -
+            position.wethDebt;
+    }
+
     /* ========== CORE FUNCTIONS ========== */
 
+    /// @notice Stake any LQTY our calling strategy sent us, and send it its share of our rewards.
+    /// @dev Costs the same no matter how many strategies we have.
     function strategyHarvest() external onlyStrategy {
-        address _strategy = strategy;
         uint256 _lqtyAmount = lqty.balanceOf(address(this));
         if (_lqtyAmount > 0) {
             lqtyStaking.stake(_lqtyAmount);
-        } else if (stakedBalance() > 0) {
+        } else if (
+            lqtyStaking.getPendingETHGain(address(this)) > 0 ||
+            lqtyStaking.getPendingLUSDGain(address(this)) > 0
+        ) {
+            // we can only have pending gains with a stake, and there's no point claiming nothing
             lqtyStaking.unstake(0);
         }
 
+        // whatever we just claimed was earned by our shares before this new LQTY came in
+        (uint256 _lusdDistributed, uint256 _wethDistributed) = _distribute();
+
+        Position storage position = positions[msg.sender];
+        (uint256 _lusdPaid, uint256 _wethPaid) = _payout(msg.sender, position);
+
+        // credit our strategy with its new LQTY
+        if (_lqtyAmount > 0) {
+            position.shares += uint248(_lqtyAmount);
+            totalShares += _lqtyAmount;
+            position.lusdDebt = (position.shares * lusdPerShare) / PRECISION;
+            position.wethDebt = (position.shares * wethPerShare) / PRECISION;
+        }
+
+        emit StrategyHarvested(
+            msg.sender,
+            _lqtyAmount,
+            _lusdDistributed,
+            _wethDistributed,
+            _lusdPaid,
+            _wethPaid
+        );
+    }
+
+    // credit any new LUSD and WETH to our shares, returns how much we credited
+    function _distribute() internal returns (uint256 newLusd, uint256 newWeth) {
         // convert our ether to weth if we have any
         uint256 ethBalance = address(this).balance;
         if (ethBalance > 0) {
             IWeth(address(weth)).deposit{value: ethBalance}();
         }
 
-        uint256 lusdBalance = lusd.balanceOf(address(this));
-        uint256 wethBalance = weth.balanceOf(address(this));
+        // with no shares, leave it for whoever contributes first
+        uint256 _totalShares = totalShares;
+        if (_totalShares == 0) {
+            return (0, 0);
+        }
 
-        if (lusdBalance > 0) {
-            lusd.safeTransfer(_strategy, lusdBalance);
+        newLusd = lusd.balanceOf(address(this)) - lusdReserved;
+        if (newLusd > 0) {
+            lusdPerShare += (newLusd * PRECISION) / _totalShares;
+            lusdReserved += newLusd;
         }
 
-        if (wethBalance > 0) {
-            weth.safeTransfer(_strategy, wethBalance);
+        newWeth = weth.balanceOf(address(this)) - wethReserved;
+        if (newWeth > 0) {
+            wethPerShare += (newWeth * PRECISION) / _totalShares;
+            wethReserved += newWeth;
+        }
+    }
+
+    // send a strategy everything it's been credited since its last payout, returns how much we sent
+    function _payout(
+        address _strategy,
+        Position storage position
+    ) internal returns (uint256 lusdOwed, uint256 wethOwed) {
+        uint256 shares = position.shares;
+        if (shares == 0) {
+            return (0, 0);
+        }
+
+        uint256 lusdAccrued = (shares * lusdPerShare) / PRECISION;
+        uint256 wethAccrued = (shares * wethPerShare) / PRECISION;
+
+        // rounding can leave us a few wei short, so never pay out more than we've reserved
+        lusdOwed = Math.min(lusdAccrued - position.lusdDebt, lusdReserved);
+        wethOwed = Math.min(wethAccrued - position.wethDebt, wethReserved);
+        position.lusdDebt = lusdAccrued;
+        position.wethDebt = wethAccrued;
+
+        if (lusdOwed > 0) {
+            lusdReserved -= lusdOwed;
+            lusd.safeTransfer(_strategy, lusdOwed);
+        }
+
+        if (wethOwed > 0) {
+            wethReserved -= wethOwed;
+            weth.safeTransfer(_strategy, wethOwed);
         }
     }
 
@@ -127,6 +340,10 @@ contract yLQTYVoter is Ownable {
         unstakeQueued = block.timestamp;
     }
 
+    /// @notice Pull LQTY out of our stake and send it to the owner.
+    /// @dev Any rewards this claims are credited to our strategies as usual. Shares are left as they are, so
+    ///  strategies keep splitting whatever we earn afterwards in the same proportions.
+    /// @param _amount Amount of LQTY to unstake, if more than we have we get our whole stake.
     function unstakeAndSweep(uint256 _amount) external onlyOwner {
         require(
             block.timestamp > unstakeQueued + 2 weeks &&
@@ -139,24 +356,7 @@ contract yLQTYVoter is Ownable {
             lqtyStaking.unstake(_amount);
         }
 
-        // convert our ether to weth if we have any
-        uint256 ethBalance = address(this).balance;
-        if (ethBalance > 0) {
-            IWeth(address(weth)).deposit{value: ethBalance}();
-        }
-
-        uint256 lusdBalance = lusd.balanceOf(address(this));
-        uint256 wethBalance = weth.balanceOf(address(this));
-
-        address _strategy = strategy;
-
-        if (lusdBalance > 0) {
-            lusd.safeTransfer(_strategy, lusdBalance);
-        }
-
-        if (wethBalance > 0) {
-            weth.safeTransfer(_strategy, wethBalance);
-        }
+        _distribute();
 
         uint256 lqtyBalance = lqty.balanceOf(address(this));
         if (lqtyBalance > 0) {
@@ -165,10 +365,15 @@ contract yLQTYVoter is Ownable {
         emit LqtySwept(_amount);
     }
 
-    // sweep out tokens sent here
+    // sweep out tokens sent here, but not rewards we owe our strategies
     function sweep(address _token) external onlyOwner {
         require(_token != address(lqty), "can't sweep stake");
         uint256 tokenBalance = IERC20(_token).balanceOf(address(this));
+        if (_token == address(lusd)) {
+            tokenBalance -= lusdReserved;
+        } else if (_token == address(weth)) {
+            tokenBalance -= wethReserved;
+        }
         if (tokenBalance > 0) {
             IERC20(_token).safeTransfer(owner(), tokenBalance);
         }
@@ -199,11 +404,53 @@ contract yLQTYVoter is Ownable {
     /* ========== SETTERS ========== */
     // These functions are useful for setting parameters of the strategy that may need to be adjusted.
 
-    /// @notice Use this to set or update our voter contracts.
-    /// @dev For Curve strategies, this is where we send our keepCVX.
-    ///  Only owner can set this.
-    /// @param _strategy Address of our lqty strategy.
-    function setStrategy(address _strategy) external onlyOwner {
-        strategy = _strategy;
+    /// @notice Use this to register a new strategy with this voter.
+    /// @dev A strategy earns from its first contributed LQTY onwards. Only owner can add strategies.
+    /// @param _strategy Address of an lqty strategy.
+    function addStrategy(address _strategy) external onlyOwner {
+        _addStrategy(_strategy);
+    }
+
+    function _addStrategy(address _strategy) internal {
+        require(!positions[_strategy].active, "already added");
+        positions[_strategy].active = true;
+        if (strategy == address(0)) {
+            strategy = _strategy;
+        }
+        emit StrategyAdded(_strategy);
+    }
+
+    /// @notice Use this to stop voting for a strategy.
+    /// @dev Pays out what it's owed, then unstakes its share of our stake and sends that LQTY back to it, so nothing
+    ///  it contributed keeps earning for everyone else. Only owner can remove strategies.
+    /// @param _strategy Address of an lqty strategy.
+    function removeStrategy(address _strategy) external onlyOwner {
+        Position storage position = positions[_strategy];
+        require(position.active, "!strategy");
+
+        // sweeps leave shares alone, so a share of our stake can be less than the LQTY a strategy sent us
+        uint256 _shares = position.shares;
+        uint256 _lqtyAmount;
+        if (_shares > 0) {
+            _lqtyAmount = (stakedBalance() * _shares) / totalShares;
+        }
+
+        // unstaking claims our pending rewards, those were earned with this strategy's shares still counted
+        if (_lqtyAmount > 0) {
+            lqtyStaking.unstake(_lqtyAmount);
+        }
+        _distribute();
+        _payout(_strategy, position);
+
+        totalShares -= _shares;
+        delete positions[_strategy];
+        if (strategy == _strategy) {
+            strategy = address(0);
+        }
+
+        if (_lqtyAmount > 0) {
+            lqty.safeTransfer(_strategy, _lqtyAmount);
+        }
+        emit StrategyRemoved(_strategy);
     }
 }
@@ -1,58 +1,386 @@
+# declarative deployer for any number of vaults, strategies and voters. everything is sent pipelined, with explicit
+# nonces and gas limits, and only waited on at the end of each phase: first everything our deployer can do on its own,
+# then everything that needs governance (or vault management). every transaction is saved to a state file as it's
+# sent, so after a failure (or a config change) we can run again and only send what didn't land or has changed.
+# without a governance account, governance calls are saved to our state file for a multisig instead.
+#
+# DEPLOY_CONFIG=deploy.yml brownie run deploy --network mainnet, with a config like:
+#
+# deployer: deployer  # brownie account id, password in DEPLOYER_PASSWORD
+# governance: ychad  # optional, brownie account id (or address on forks), password in GOVERNANCE_PASSWORD
+# vaults:
+#   existing:
+#     address: "0x..."
+#   new:  # anything besides token is optional
+#     token: "0x6DEA81C8171D0bA574754EF6F8b412F2Ed88c54D"
+#     governance: "0x..."
+#     rewards: "0x..."
+#     guardian: "0x..."
+#     management: "0x..."
+#     deposit_limit: 1_000_000e18
+# strategies:
+#   - name: lqty
+#     vault: new  # one of our vaults, or an address
+#     trade_factory: "0x..."
+#     harvest_profit_min: 10_000e6
+#     harvest_profit_max: 50_000e6
+#     keeper: "0x..."
+#     health_check: "0x..."
+#     base_fee_oracle: "0x..."
+#     keep_lqty: 500
+#     voter_owner: "0x..."  # leave out voter_owner and voter to keep our voter, or set voter: false for none
+#     debt_ratio: 10_000  # leave out to not add our strategy to its vault
+#     calls:  # any other governance setters on our strategy
+#       setTendTriggerParams: [1_000e18, 0]
+import json
+import os
+from decimal import Decimal
 from pathlib import Path
 
-from brownie import Strategy, accounts, config, network, project, web3
-from eth_utils import is_checksum_address
-import click
+import rlp
+import yaml
+from brownie import (
+    StrategyLQTYStaker,
+    accounts,
+    config,
+    network,
+    project,
+    web3,
+    yLQTYVoter,
+)
+from eth_utils import keccak, to_checksum_address
 
-API_VERSION = config["dependencies"][0].split("@")[-1]
-Vault = project.load(
-    Path.home() / ".brownie" / "packages" / config["dependencies"][0]
-).Vault
+# gas limits for each kind of transaction, since we can't estimate calls to contracts that aren't mined yet
+DEFAULT_GAS = {"deploy": 8_000_000, "call": 500_000}
 
+# how long to wait for each phase's transactions before giving up (we can always resume)
+RECEIPT_TIMEOUT = 600
 
-def get_address(msg: str, default: str = None) -> str:
-    val = click.prompt(msg, default=default)
 
-    # Keep asking user for click.prompt until it passes
-    while True:
+class DeployError(Exception):
+    pass
 
-        if is_checksum_address(val):
-            return val
-        elif addr := web3.ens.address(val):
-            click.echo(f"Found ENS '{val}' [{addr}]")
-            return addr
 
-        click.echo(
-            f"I'm sorry, but '{val}' is not a checksummed address or valid ENS record"
+# yaml reads 10_000e6 as a string, and floats can't hold 1e24 exactly
+def _int(value):
+    return int(Decimal(str(value).replace("_", "")))
+
+
+# addresses and bools as they are, everything else is a number
+def _arg(value):
+    if isinstance(value, bool) or str(value).startswith("0x"):
+        return value
+    return _int(value)
+
+
+# the address a contract deployed by this sender with this nonce will have
+def _create_address(sender, nonce):
+    return to_checksum_address(
+        keccak(rlp.encode([bytes.fromhex(sender[2:]), nonce]))[12:]
+    )
+
+
+def _encode(container, fn_name, *args):
+    return web3.eth.contract(abi=container.abi).encodeABI(
+        fn_name=fn_name, args=list(args)
+    )
+
+
+class Step:
+    def __init__(self, id, sender, to, data, description):
+        self.id = id
+        self.sender = sender  # "deployer" or "governance"
+        self.to = to  # None for deploys
+        self.data = data
+        self.description = description
+        self.hash = keccak(hexstr=data).hex()
+
+
+class Deployment:
+    def __init__(
+        self, spec, deployer, governance=None, state_path=None, vault_container=None
+    ):
+        self.spec = spec
+        self.accounts = {"deployer": deployer, "governance": governance}
+        self.state_path = Path(state_path) if state_path else None
+        self.vault_container = vault_container
+        self.gas = {**DEFAULT_GAS, **spec.get("gas", {})}
+        self.state = self._load()
+        self.addresses = {}
+
+    def _load(self):
+        state = {"chain_id": web3.eth.chain_id, "steps": {}, "governance_calls": []}
+        if self.state_path and self.state_path.exists():
+            state = json.loads(self.state_path.read_text())
+            if state["chain_id"] != web3.eth.chain_id:
+                raise DeployError(
+                    f"{self.state_path} is for chain {state['chain_id']}, not {web3.eth.chain_id}"
+                )
+        return state
+
+    def _save(self):
+        if self.state_path is None:
+            return
+        # write then rename, so a crash never leaves us with half a state file
+        temp = self.state_path.with_suffix(".tmp")
+        temp.write_text(json.dumps(self.state, indent=2))
+        temp.replace(self.state_path)
+
+    # every step in order. this is a generator so each step can use the addresses of the deploys before it.
+    def _steps(self):
+        for name, vault in self.spec.get("vaults", {}).items():
+            if "address" in vault:
+                self.addresses[f"vault.{name}"] = to_checksum_address(vault["address"])
+                continue
+            yield self._deploy(f"vault.{name}", self.vault_container)
+            address = self.addresses[f"vault.{name}"]
+            deployer = self.accounts["deployer"].address
+            yield self._call(
+                f"vault.{name}",
+                "deployer",
+                address,
+                self.vault_container,
+                "initialize",
+                vault["token"],
+                vault.get("governance", deployer),
+                vault.get("rewards", deployer),
+                vault.get("name", ""),
+                vault.get("symbol", ""),
+                vault.get("guardian", deployer),
+                vault.get("management", deployer),
+            )
+            if "deposit_limit" in vault:
+                yield self._call(
+                    f"vault.{name}",
+                    "governance",
+                    address,
+                    self.vault_container,
+                    "setDepositLimit",
+                    _int(vault["deposit_limit"]),
+                )
+
+        for strategy in self.spec.get("strategies", []):
+            yield from self._strategy_steps(strategy)
+
+    def _deploy(self, id, container, *args):
+        return Step(
+            id, "deployer", None, container.deploy.encode_input(*args), f"deploy {id}",
+        )
+
+    def _call(self, id, sender, to, container, fn_name, *args):
+        return Step(
+            f"{id}.{fn_name}",
+            sender,
+            to,
+            _encode(container, fn_name, *args),
+            f"{fn_name} on {id}",
         )
-        # NOTE: Only display default once
-        val = click.prompt(msg)
+
+    def _strategy_steps(self, spec):
+        name = spec["name"]
+        vault = self.addresses.get(f"vault.{spec['vault']}", spec["vault"])
+        id = f"strategy.{name}"
+
+        yield self._deploy(
+            id,
+            StrategyLQTYStaker,
+            vault,
+            spec["trade_factory"],
+            _int(spec.get("harvest_profit_min", 10_000e6)),
+            _int(spec.get("harvest_profit_max", 50_000e6)),
+        )
+        strategy = self.addresses[id]
+
+        def call(sender, fn_name, *args):
+            return self._call(id, sender, strategy, StrategyLQTYStaker, fn_name, *args)
+
+        # what our deployer can do, as our strategist and our voter's owner
+        voter = None
+        if spec.get("voter", True):
+            yield self._deploy(f"{id}.voter", yLQTYVoter, strategy)
+            voter = self.addresses[f"{id}.voter"]
+        if "keeper" in spec:
+            yield call("deployer", "setKeeper", spec["keeper"])
+        if voter and "voter_owner" in spec:
+            yield self._call(
+                f"{id}.voter",
+                "deployer",
+                voter,
+                yLQTYVoter,
+                "transferOwnership",
+                spec["voter_owner"],
+            )
+        if "strategist" in spec:
+            yield call("deployer", "setStrategist", spec["strategist"])
+
+        # what needs governance or management
+        if "health_check" in spec:
+            yield call("governance", "setHealthCheck", spec["health_check"])
+            yield call(
+                "governance", "setDoHealthCheck", spec.get("do_health_check", True)
+            )
+        if "base_fee_oracle" in spec:
+            yield call("governance", "setBaseFeeOracle", spec["base_fee_oracle"])
+        if voter:
+            yield call("governance", "setVoter", voter)
+        if "keep_lqty" in spec:
+            yield call("governance", "setKeepLqty", _int(spec["keep_lqty"]))
+        for fn_name, args in spec.get("calls", {}).items():
+            yield call("governance", fn_name, *[_arg(arg) for arg in args])
+        if "debt_ratio" in spec:
+            if self.vault_container is None:
+                raise DeployError(f"we need yearn's Vault to add {id} to its vault")
+            yield self._call(
+                id,
+                "governance",
+                vault,
+                self.vault_container,
+                "addStrategy",
+                strategy,
+                _int(spec["debt_ratio"]),
+                _int(spec.get("min_debt_per_harvest", 0)),
+                _int(spec.get("max_debt_per_harvest", 2 ** 256 - 1)),
+                _int(spec.get("performance_fee", 1_000)),
+            )
+
+    # send every step for one of our accounts that hasn't already landed, without waiting on any of them
+    def _send(self, phase):
+        account = self.accounts[phase]
+        nonce = None
+        sent = []
+        if phase == "governance":
+            self.state["governance_calls"] = []
+
+        for step in self._steps():
+            record = self.state["steps"].get(step.id)
+            landed = (
+                record is not None
+                and record["status"] == "confirmed"
+                and record["hash"] == step.hash
+            )
+            if step.to is None and landed:
+                self.addresses[step.id] = record["address"]
+            if step.sender != phase or landed:
+                continue
+
+            if account is None:
+                self.state["governance_calls"].append(
+                    {"to": step.to, "data": step.data, "description": step.description}
+                )
+                continue
+
+            if nonce is None:
+                nonce = web3.eth.get_transaction_count(account.address, "pending")
+            if step.to is None:
+                self.addresses[step.id] = _create_address(account.address, nonce)
+            # our calls may depend on contracts that aren't mined yet, so we can't check them for reverts first
+            tx = account.transfer(
+                step.to,
+                0,
+                gas_limit=self.gas["deploy" if step.to is None else "call"],
+                data=step.data,
+                nonce=nonce,
+                required_confs=0,
+                allow_revert=True,
+                silent=True,
+            )
+            print(f"{step.description}: {tx.txid} (nonce {nonce})")
+            self.state["steps"][step.id] = {
+                "status": "sent",
+                "tx": tx.txid,
+                "sender": account.address,
+                "nonce": nonce,
+                "hash": step.hash,
+                "address": self.addresses.get(step.id) if step.to is None else None,
+                "description": step.description,
+            }
+            self._save()
+            sent.append(step.id)
+            nonce += 1
+        return sent
+
+    # wait for everything we've sent to land or be dropped, and record how it went
+    def _settle(self):
+        pending = {
+            id: record
+            for id, record in self.state["steps"].items()
+            if record["status"] == "sent"
+        }
+        for id, record in pending.items():
+            try:
+                receipt = web3.eth.wait_for_transaction_receipt(
+                    record["tx"], timeout=RECEIPT_TIMEOUT
+                )
+            except Exception:
+                # if our nonce has moved on without this transaction, it was dropped or replaced
+                if web3.eth.get_transaction_count(record["sender"]) > record["nonce"]:
+                    record["status"] = "dropped"
+                    continue
+                raise
+            if receipt["status"] == 1 and (
+                record["address"] is None or web3.eth.get_code(record["address"])
+            ):
+                record["status"] = "confirmed"
+            else:
+                record["status"] = "failed"
+        self._save()
+        return [
+            id for id in pending if self.state["steps"][id]["status"] != "confirmed"
+        ]
+
+    def run(self):
+        # pick up anything a previous run sent but didn't see land
+        self._settle()
+        for phase in ("deployer", "governance"):
+            self._send(phase)
+            failed = self._settle()
+            if failed:
+                raise DeployError(
+                    f"{', '.join(failed)} didn't land, fix the cause and run again to resume"
+                )
+        self.state["addresses"] = self.addresses
+        self._save()
+        if self.state["governance_calls"]:
+            print(
+                f"{len(self.state['governance_calls'])} governance calls to send, see {self.state_path}"
+            )
+        return self.addresses
+
+
+# deploy everything in our spec (a dict, or a path to a yaml or json file). returns every address we deployed or
+# used, keyed like our state file's steps.
+def deploy(spec, deployer, governance=None, state_path=None, vault_container=None):
+    if not isinstance(spec, dict):
+        spec = yaml.safe_load(Path(spec).read_text())
+    return Deployment(spec, deployer, governance, state_path, vault_container).run()
+
+
+# addresses only work on forks, where we can send from any account
+def _account(id, password):
+    if id is None:
+        return None
+    if id.startswith("0x"):
+        return accounts.at(id, force=True)
+    return accounts.load(id, password=password)
 
 
 def main():
     print(f"You are using the '{network.show_active()}' network")
-    dev = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
-    print(f"You are using: 'dev' [{dev.address}]")
-
-    if input("Is there a Vault for this strategy already? y/[N]: ").lower() == "y":
-        vault = Vault.at(get_address("Deployed Vault: "))
-        assert vault.apiVersion() == API_VERSION
-    else:
-        print("You should deploy one vault using scripts from Vault project")
-        return  # TODO: Deploy one using scripts from Vault project
-
-    print(
-        f"""
-    Strategy Parameters
-
-       api: {API_VERSION}
-     token: {vault.token()}
-      name: '{vault.name()}'
-    symbol: '{vault.symbol()}'
-    """
-    )
-    publish_source = click.confirm("Verify source on etherscan?")
-    if input("Deploy Strategy? y/[N]: ").lower() != "y":
-        return
+    path = os.environ.get("DEPLOY_CONFIG", "deploy.yml")
+    spec = yaml.safe_load(Path(path).read_text())
+    deployer = _account(spec["deployer"], os.environ.get("DEPLOYER_PASSWORD"))
+    governance = _account(spec.get("governance"), os.environ.get("GOVERNANCE_PASSWORD"))
+    print(f"You are using: 'deployer' [{deployer.address}]")
 
-    strategy = Strategy.deploy(vault, {"from": dev}, publish_source=publish_source)
+    vault_container = project.load(
+        Path.home() / ".brownie" / "packages" / config["dependencies"][0]
+    ).Vault
+    addresses = deploy(
+        spec,
+        deployer,
+        governance,
+        os.environ.get("DEPLOY_STATE", f"{path}.state.json"),
+        vault_container,
+    )
+    for id, address in addresses.items():
+        print(f"{id}: {address}")
@@ -0,0 +1,436 @@
+# asyncio keeper for any number of our strategies and voters. every poll reads all harvest triggers in one call to
+# yLQTYLens and all tend triggers in one JSON-RPC batch, then sends whatever is due concurrently, with one nonce
+# manager and gas policy shared by every transaction. configured with env vars, see main(). metrics are served in
+# prometheus' text format if KEEPER_METRICS_PORT is set.
+import asyncio
+import os
+import time
+from collections import Counter, defaultdict
+
+import aiohttp
+from brownie import (
+    StrategyLQTYStaker,
+    accounts,
+    network,
+    web3,
+    yLQTYLens,
+    yLQTYVoter,
+)
+from eth_account import Account as EthAccount
+
+# what we tell harvestTrigger a harvest costs, in gas. close to a harvest with our voter on, see test_gas.py.
+HARVEST_GAS = 450_000
+
+GWEI = 10 ** 9
+
+
+class RpcError(Exception):
+    pass
+
+
+class DroppedTransaction(Exception):
+    pass
+
+
+# bare JSON-RPC over HTTP, so we can batch calls and never block our event loop
+class Rpc:
+    def __init__(self, url):
+        self.url = url
+        self._session = None
+        self._id = 0
+
+    async def _post(self, payload):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        async with self._session.post(self.url, json=payload) as response:
+            return await response.json(content_type=None)
+
+    def _request(self, method, params):
+        self._id += 1
+        return {"jsonrpc": "2.0", "id": self._id, "method": method, "params": params}
+
+    async def call(self, method, params):
+        response = await self._post(self._request(method, params))
+        if "error" in response:
+            raise RpcError(f"{method} failed: {response['error']}")
+        return response["result"]
+
+    # any number of (method, params) in one round trip, results come back in the same order
+    async def batch(self, calls):
+        payload = [self._request(method, params) for method, params in calls]
+        responses = {response["id"]: response for response in await self._post(payload)}
+        results = []
+        for request in payload:
+            response = responses[request["id"]]
+            if "error" in response:
+                raise RpcError(f"{request['method']} failed: {response['error']}")
+            results.append(response["result"])
+        return results
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# hands out nonces to concurrent transactions. if a send fails, or a transaction is dropped, replaced or never lands,
+# we resync from the chain, so a gap doesn't stall us.
+class NonceManager:
+    def __init__(self, rpc, address):
+        self.rpc = rpc
+        self.address = address
+        self._lock = asyncio.Lock()
+        self._next = None
+
+    async def reserve(self):
+        async with self._lock:
+            if self._next is None:
+                self._next = int(
+                    await self.rpc.call(
+                        "eth_getTransactionCount", [self.address, "pending"]
+                    ),
+                    16,
+                )
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    async def resync(self):
+        async with self._lock:
+            self._next = None
+
+
+# don't send anything above our base fee limit, our strategies' own base fee check should agree. otherwise pay
+# enough to land in the next few blocks even if the base fee keeps climbing.
+class GasPolicy:
+    def __init__(self, max_base_fee=100 * GWEI, priority_fee=GWEI, headroom=2):
+        self.max_base_fee = int(max_base_fee)
+        self.priority_fee = int(priority_fee)
+        self.headroom = headroom
+
+    # returns None if we shouldn't send anything right now
+    def fees(self, base_fee, legacy=False):
+        if base_fee > self.max_base_fee:
+            return None
+        max_fee = (
+            int(min(base_fee * self.headroom, self.max_base_fee)) + self.priority_fee
+        )
+        if legacy:
+            return {"gasPrice": max_fee}
+        return {"maxFeePerGas": max_fee, "maxPriorityFeePerGas": self.priority_fee}
+
+
+# counters, gauges and latencies for our polls and transactions
+class Metrics:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counters = Counter()
+        self.gauges = {}
+        self.latencies = defaultdict(list)
+
+    def count(self, name, amount=1):
+        self.counters[name] += amount
+
+    def gauge(self, name, value, **labels):
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, seconds):
+        self.latencies[name].append(seconds)
+
+    def summary(self):
+        uptime = time.monotonic() - self.started
+        latencies = {}
+        for name, values in self.latencies.items():
+            values = sorted(values)
+            latencies[name] = {
+                "count": len(values),
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, len(values) * 95 // 100)],
+                "max": values[-1],
+            }
+        confirmed = self.counters["harvest_confirmed"] + self.counters["tend_confirmed"]
+        return {
+            "uptime": uptime,
+            "throughput_per_minute": confirmed * 60 / uptime if uptime else 0,
+            "counters": dict(self.counters),
+            "latencies": latencies,
+        }
+
+    def prometheus(self):
+        summary = self.summary()
+        lines = [
+            f"keeper_uptime_seconds {summary['uptime']:.3f}",
+            f"keeper_throughput_per_minute {summary['throughput_per_minute']:.6f}",
+        ]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"keeper_{name}_total {value}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+            lines.append(f"keeper_{name}{{{label_text}}} {value}")
+        for name, stats in sorted(summary["latencies"].items()):
+            for key, quantile in (("p50", "0.5"), ("p95", "0.95")):
+                lines.append(
+                    f'keeper_{name}_seconds{{quantile="{quantile}"}} {stats[key]:.6f}'
+                )
+            lines.append(f"keeper_{name}_seconds_count {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(metrics, port):
+    async def handle(reader, writer):
+        await reader.read(1024)
+        body = metrics.prometheus().encode()
+        writer.write(
+            b"HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(handle, "0.0.0.0", port)
+
+
+class Keeper:
+    def __init__(
+        self,
+        url,
+        account,
+        strategies,
+        lens,
+        voters=(),
+        gas_policy=None,
+        poll_interval=12,
+        tend=True,
+        harvest_gas=HARVEST_GAS,
+        receipt_interval=1,
+        receipt_timeout=600,
+    ):
+        self.rpc = Rpc(url)
+        self.address = account.address
+        # brownie's local accounts can sign for themselves, anything else we assume our node has unlocked
+        self.private_key = getattr(account, "private_key", None)
+        self.strategies = list(strategies)
+        self.voters = list(voters)
+        self.lens = lens
+        self.gas_policy = gas_policy or GasPolicy()
+        self.poll_interval = poll_interval
+        self.tend = tend
+        self.harvest_gas = harvest_gas
+        self.receipt_interval = receipt_interval
+        self.receipt_timeout = receipt_timeout
+        self.nonces = NonceManager(self.rpc, self.address)
+        self.metrics = Metrics()
+        self.in_flight = set()
+        self._chain_id = None
+
+    # check every trigger in two round trips, returns ([(action, strategy)], fees) with fees None if gas is too high
+    async def poll(self):
+        start = time.perf_counter()
+        block = await self.rpc.call("eth_getBlockByNumber", ["latest", False])
+        legacy = "baseFeePerGas" not in block
+        if legacy:
+            base_fee = int(await self.rpc.call("eth_gasPrice", []), 16)
+        else:
+            base_fee = int(block["baseFeePerGas"], 16)
+        call_cost = self.harvest_gas * base_fee
+
+        calls = [
+            self._eth_call(
+                self.lens,
+                self.lens.getInfo.encode_input(self.strategies, self.voters, call_cost),
+            )
+        ]
+        if self.tend:
+            calls += [
+                self._eth_call(strategy, strategy.tendTrigger.encode_input(call_cost))
+                for strategy in self.strategies
+            ]
+        results = await self.rpc.batch(calls)
+
+        (_, _, strategy_info, voter_info) = self.lens.getInfo.decode_output(results[0])
+        due = []
+        for i, (strategy, info) in enumerate(zip(self.strategies, strategy_info)):
+            self.metrics.gauge(
+                "claimable_profit_usdc",
+                info["claimableProfitInUsdc"],
+                strategy=strategy.address,
+            )
+            if info["harvestTrigger"]:
+                due.append(("harvest", strategy))
+            elif self.tend and strategy.tendTrigger.decode_output(results[1 + i]):
+                due.append(("tend", strategy))
+        for voter, info in zip(self.voters, voter_info):
+            self.metrics.gauge(
+                "claimable_profit_usdc",
+                info["claimableProfitInUsdc"],
+                voter=voter.address,
+            )
+            self.metrics.gauge(
+                "staked_balance", info["stakedBalance"], voter=voter.address
+            )
+
+        self.metrics.gauge("base_fee_gwei", base_fee / GWEI)
+        self.metrics.count("polls")
+        self.metrics.observe("poll", time.perf_counter() - start)
+        return (due, self.gas_policy.fees(base_fee, legacy))
+
+    def _eth_call(self, contract, data):
+        return ("eth_call", [{"to": contract.address, "data": data}, "latest"])
+
+    # send one harvest or tend and wait for it to land
+    async def execute(self, action, strategy, fees):
+        start = time.perf_counter()
+        try:
+            data = getattr(strategy, action).encode_input()
+            tx = {"from": self.address, "to": strategy.address, "data": data}
+
+            # estimate first, so a call that would revert never takes a nonce
+            gas = int(await self.rpc.call("eth_estimateGas", [tx]), 16) * 12 // 10
+            nonce = await self.nonces.reserve()
+            try:
+                tx_hash = await self._send(tx, gas, nonce, fees)
+            except Exception:
+                await self.nonces.resync()
+                raise
+            self.metrics.count(f"{action}_sent")
+
+            try:
+                receipt = await self._wait(tx_hash, nonce)
+            except (TimeoutError, DroppedTransaction):
+                await self.nonces.resync()
+                raise
+            if int(receipt["status"], 16) == 1:
+                self.metrics.count(f"{action}_confirmed")
+                self.metrics.count("gas_used", int(receipt["gasUsed"], 16))
+            else:
+                self.metrics.count(f"{action}_failed")
+            return receipt
+        except Exception as e:
+            self.metrics.count(f"{action}_failed")
+            print(f"{action} of {strategy.address} failed: {e}")
+        finally:
+            self.in_flight.discard(strategy.address)
+            self.metrics.observe(action, time.perf_counter() - start)
+
+    async def _send(self, tx, gas, nonce, fees):
+        if self.private_key is None:
+            params = {
+                **tx,
+                "gas": hex(gas),
+                "nonce": hex(nonce),
+                **{key: hex(value) for key, value in fees.items()},
+            }
+            return await self.rpc.call("eth_sendTransaction", [params])
+
+        if self._chain_id is None:
+            self._chain_id = int(await self.rpc.call("eth_chainId", []), 16)
+        unsigned = {
+            "chainId": self._chain_id,
+            "nonce": nonce,
+            "to": tx["to"],
+            "data": tx["data"],
+            "gas": gas,
+            "value": 0,
+            **fees,
+        }
+        if "maxFeePerGas" in fees:
+            unsigned["type"] = 2
+        signed = EthAccount.sign_transaction(unsigned, self.private_key)
+        raw = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+        return await self.rpc.call("eth_sendRawTransaction", ["0x" + bytes(raw).hex()])
+
+    # wait for our receipt, giving up if our node forgets our transaction or something else lands with its nonce
+    async def _wait(self, tx_hash, nonce):
+        deadline = time.monotonic() + self.receipt_timeout
+        while time.monotonic() < deadline:
+            (receipt, tx, mined) = await self.rpc.batch(
+                [
+                    ("eth_getTransactionReceipt", [tx_hash]),
+                    ("eth_getTransactionByHash", [tx_hash]),
+                    ("eth_getTransactionCount", [self.address, "latest"]),
+                ]
+            )
+            if receipt is not None:
+                return receipt
+            if tx is None:
+                raise DroppedTransaction(f"{tx_hash} was dropped")
+            if int(mined, 16) > nonce:
+                # either we just landed in a block that came in mid-batch, or we were replaced
+                receipt = await self.rpc.call("eth_getTransactionReceipt", [tx_hash])
+                if receipt is not None:
+                    return receipt
+                raise DroppedTransaction(f"{tx_hash} was replaced")
+            await asyncio.sleep(self.receipt_interval)
+        raise TimeoutError(f"no receipt for {tx_hash}")
+
+    # poll until stopped (or for max_polls), sending anything due without waiting on earlier transactions
+    async def run(self, max_polls=None, stop=None):
+        tasks = set()
+        polls = 0
+        try:
+            while max_polls is None or polls < max_polls:
+                if stop is not None and stop.is_set():
+                    break
+                polls += 1
+                try:
+                    (due, fees) = await self.poll()
+                except Exception as e:
+                    self.metrics.count("poll_failed")
+                    print(f"poll failed: {e}")
+                    due = []
+                for action, strategy in due:
+                    if strategy.address in self.in_flight:
+                        continue
+                    if fees is None:
+                        self.metrics.count("skipped_base_fee")
+                        continue
+                    self.in_flight.add(strategy.address)
+                    task = asyncio.create_task(self.execute(action, strategy, fees))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if max_polls is None or polls < max_polls:
+                    await asyncio.sleep(self.poll_interval)
+            await asyncio.gather(*tasks)
+        finally:
+            await self.rpc.close()
+        return self.metrics.summary()
+
+
+# KEEPER_STRATEGIES and KEEPER_VOTERS are comma-separated addresses, KEEPER_LENS is a deployed yLQTYLens, and
+# KEEPER_ACCOUNT is a brownie account id (with its password in KEEPER_PASSWORD).
+def main():
+    print(f"You are using the '{network.show_active()}' network")
+    account = accounts.load(
+        os.environ["KEEPER_ACCOUNT"], password=os.environ.get("KEEPER_PASSWORD")
+    )
+    strategies = [
+        StrategyLQTYStaker.at(address)
+        for address in os.environ["KEEPER_STRATEGIES"].split(",")
+    ]
+    voters = [
+        yLQTYVoter.at(address)
+        for address in os.environ.get("KEEPER_VOTERS", "").split(",")
+        if address
+    ]
+    keeper = Keeper(
+        web3.provider.endpoint_uri,
+        account,
+        strategies,
+        yLQTYLens.at(os.environ["KEEPER_LENS"]),
+        voters=voters,
+        gas_policy=GasPolicy(
+            max_base_fee=int(
+                float(os.environ.get("KEEPER_MAX_BASE_FEE_GWEI", 100)) * GWEI
+            )
+        ),
+        poll_interval=float(os.environ.get("KEEPER_POLL_INTERVAL", 12)),
+    )
+
+    async def run():
+        port = os.environ.get("KEEPER_METRICS_PORT")
+        if port:
+            await serve_metrics(keeper.metrics, int(port))
+        await keeper.run()
+
+    asyncio.run(run())
@@ -0,0 +1,415 @@
+# incremental indexer for our strategies', vaults' and voters' logs, kept as numpy columns so analytics are vectorized.
+# each sync reads Harvested, StrategyReported and LqtySwept logs in block ranges, adds gas for each harvest and our
+# vault's share price at each report, and saves each range's rows together with our checkpoint, so the next sync
+# starts where this one stopped. amounts are in wei (as exact python ints), times are unix timestamps. configured
+# with env vars, see main().
+import os
+from pathlib import Path
+
+import numpy as np
+from brownie import network, web3
+from eth_abi import decode
+from eth_utils import (
+    event_abi_to_log_topic,
+    function_signature_to_4byte_selector,
+    to_checksum_address,
+)
+
+SECONDS_PER_YEAR = 31_536_000
+
+# (contract kind, indexed args, other args), all args are uint256 unless they're an address
+EVENTS = {
+    "Harvested": (
+        "strategy",
+        [],
+        ["profit", "loss", "debtPayment", "debtOutstanding"],
+    ),
+    "StrategyReported": (
+        "vault",
+        ["strategy"],
+        [
+            "gain",
+            "loss",
+            "debtPaid",
+            "totalGain",
+            "totalLoss",
+            "totalDebt",
+            "debtAdded",
+            "debtRatio",
+        ],
+    ),
+    "LqtySwept": ("voter", ["amount"], []),
+}
+ADDRESS_ARGS = {"strategy"}
+
+# our columns for each event, besides block, timestamp, log_index and the emitting contract
+COLUMNS = {
+    "Harvested": [
+        "profit",
+        "loss",
+        "debtPayment",
+        "debtOutstanding",
+        "gasUsed",
+        "gasCost",
+    ],
+    "StrategyReported": [
+        "strategy",
+        "gain",
+        "loss",
+        "debtPaid",
+        "totalGain",
+        "totalLoss",
+        "totalDebt",
+        "debtAdded",
+        "debtRatio",
+        "pricePerShare",
+    ],
+    "LqtySwept": ["amount"],
+}
+# everything else is a uint256, kept as python ints so nothing is rounded, and saved as decimal strings
+INT_COLUMNS = {"block", "timestamp", "log_index", "contract", "strategy", "gasUsed"}
+
+PRICE_PER_SHARE = "0x" + function_signature_to_4byte_selector("pricePerShare()").hex()
+
+
+def _topic(name):
+    (_, indexed, other) = EVENTS[name]
+    inputs = [
+        {"type": "address" if arg in ADDRESS_ARGS else "uint256", "name": arg}
+        for arg in indexed + other
+    ]
+    return (
+        "0x"
+        + event_abi_to_log_topic(
+            {"type": "event", "name": name, "inputs": inputs}
+        ).hex()
+    )
+
+
+TOPICS = {_topic(name): name for name in EVENTS}
+
+
+# which of our events a log is, if any. hexbytes' hex() may or may not add 0x, depending on its version.
+def _event(log):
+    return TOPICS.get("0x" + bytes(log["topics"][0]).hex()) if log["topics"] else None
+
+
+def _column(column, values):
+    return np.array(values, dtype=np.int64 if column in INT_COLUMNS else object)
+
+
+def _encode(column, values):
+    return values if column in INT_COLUMNS else values.astype(str)
+
+
+def _decode(column, values):
+    if column in INT_COLUMNS:
+        return values
+    return _column(column, [int(value) for value in values])
+
+
+# our columns, plus our checkpoint and the addresses our integer columns point to. on disk, each save is one more
+# part holding only its new rows, along with our checkpoint and addresses as of that save.
+class Ledger:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.addresses = []
+        self.next_block = 0
+        # each column is a list of arrays until we read it, and rows we haven't saved yet
+        self._chunks = {
+            name: {
+                column: [_column(column, [])]
+                for column in ["block", "timestamp", "log_index", "contract"]
+                + COLUMNS[name]
+            }
+            for name in EVENTS
+        }
+        self._unsaved = {name: [] for name in EVENTS}
+        self._parts = 0
+        if self.path and self.path.exists():
+            self._load()
+
+    def _load(self):
+        parts = sorted(self.path.glob("part-*.npz"))
+        for part in parts:
+            with np.load(part) as columns:
+                for key in columns.files:
+                    if "." in key:
+                        (name, column) = key.split(".")
+                        self._chunks[name][column].append(_decode(column, columns[key]))
+                self._checkpoint(columns)
+        if parts:
+            self._parts = int(parts[-1].stem.split("-")[1]) + 1
+        if (self.path / "checkpoint.npz").exists():
+            with np.load(self.path / "checkpoint.npz") as checkpoint:
+                if int(checkpoint["next_block"]) > self.next_block:
+                    self._checkpoint(checkpoint)
+
+    def _checkpoint(self, saved):
+        self.next_block = int(saved["next_block"])
+        self.addresses = saved["addresses"].tolist()
+
+    # new rows and our checkpoint go out in a single file, renamed into place once it's complete, so a crash leaves us
+    # either before this range or after it. with no new rows, only our checkpoint moves.
+    def save(self):
+        if self.path is None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        columns = {
+            f"{name}.{column}": _encode(
+                column, np.concatenate([chunk[column] for chunk in chunks])
+            )
+            for name, chunks in self._unsaved.items()
+            if chunks
+            for column in chunks[0]
+        }
+        if columns:
+            target = self.path / f"part-{self._parts:08d}.npz"
+            self._parts += 1
+        else:
+            target = self.path / "checkpoint.npz"
+        np.savez(
+            self.path / "save.tmp.npz",
+            next_block=self.next_block,
+            addresses=np.array(self.addresses, dtype=str),
+            **columns,
+        )
+        (self.path / "save.tmp.npz").replace(target)
+        self._unsaved = {name: [] for name in EVENTS}
+
+    # every column as one array
+    @property
+    def tables(self):
+        for chunks in self._chunks.values():
+            for column, arrays in chunks.items():
+                if len(arrays) > 1:
+                    chunks[column] = [np.concatenate(arrays)]
+        return {
+            name: {column: arrays[0] for column, arrays in chunks.items()}
+            for name, chunks in self._chunks.items()
+        }
+
+    def code(self, address):
+        address = to_checksum_address(address)
+        if address not in self.addresses:
+            self.addresses.append(address)
+        return self.addresses.index(address)
+
+    def append(self, name, rows):
+        if not rows:
+            return
+        chunk = {
+            column: _column(column, [row[column] for row in rows])
+            for column in self._chunks[name]
+        }
+        for column, values in chunk.items():
+            self._chunks[name][column].append(values)
+        self._unsaved[name].append(chunk)
+
+    def __len__(self):
+        return sum(len(table["block"]) for table in self.tables.values())
+
+    # rows of one of our tables, optionally only for one contract (the strategy for our reports)
+    def select(self, name, address=None, column="contract"):
+        table = self.tables[name]
+        if address is None:
+            return table
+        address = to_checksum_address(address)
+        if address not in self.addresses:
+            mask = np.zeros(len(table["block"]), dtype=bool)
+        else:
+            mask = table[column] == self.addresses.index(address)
+        return {key: values[mask] for key, values in table.items()}
+
+    # profit and loss of each harvest, in wei
+    def profit_per_harvest(self, strategy=None):
+        harvests = self.select("Harvested", strategy)
+        return {key: harvests[key] for key in ("block", "timestamp", "profit", "loss")}
+
+    # gas used by each harvest, and what it cost in wei
+    def gas_per_harvest(self, strategy=None):
+        harvests = self.select("Harvested", strategy)
+        return {
+            key: harvests[key] for key in ("block", "timestamp", "gasUsed", "gasCost")
+        }
+
+    # our vault's price per share after each report
+    def share_price_history(self, vault):
+        reports = self.select("StrategyReported", vault)
+        return {key: reports[key] for key in ("block", "timestamp", "pricePerShare")}
+
+    # realized APR between each of a vault's reports from its share price, and over the whole history. profit is
+    # unlocked gradually, so single periods can be lumpy.
+    def realized_apr(self, vault):
+        history = self.share_price_history(vault)
+        (times, prices) = (history["timestamp"], history["pricePerShare"].astype(float))
+        elapsed = np.diff(times).astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            apr = np.where(
+                elapsed > 0,
+                np.diff(prices) / prices[:-1] * SECONDS_PER_YEAR / elapsed,
+                0.0,
+            )
+        total = 0.0
+        if len(times) > 1 and times[-1] > times[0]:
+            total = (
+                (prices[-1] / prices[0] - 1) * SECONDS_PER_YEAR / (times[-1] - times[0])
+            )
+        return {"timestamp": times[1:], "apr": apr, "total": total}
+
+    # APR of each of a strategy's reports, net of losses, on the debt it had going into that report
+    def strategy_apr(self, strategy):
+        reports = self.select("StrategyReported", strategy, column="strategy")
+        times = reports["timestamp"]
+        debt_before = (
+            reports["totalDebt"]
+            - reports["debtAdded"]
+            + reports["debtPaid"]
+            + reports["loss"]
+        ).astype(float)
+        net = (reports["gain"] - reports["loss"]).astype(float)
+        elapsed = np.diff(times).astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            apr = np.where(
+                (elapsed > 0) & (debt_before[1:] > 0),
+                net[1:] / debt_before[1:] * SECONDS_PER_YEAR / elapsed,
+                0.0,
+            )
+        return {"timestamp": times[1:], "apr": apr}
+
+
+class Indexer:
+    def __init__(
+        self,
+        ledger,
+        strategies=(),
+        vaults=(),
+        voters=(),
+        chunk_size=10_000,
+        confirmations=0,
+    ):
+        self.ledger = ledger
+        self.kinds = {}
+        for kind, contracts in (
+            ("strategy", strategies),
+            ("vault", vaults),
+            ("voter", voters),
+        ):
+            for contract in contracts:
+                self.kinds[to_checksum_address(str(contract))] = kind
+        self.chunk_size = chunk_size
+        self.confirmations = confirmations
+
+    # index everything up to a block (default our latest minus confirmations), returns how many logs we added
+    def sync(self, to_block=None, start_block=None):
+        if to_block is None:
+            to_block = web3.eth.block_number - self.confirmations
+        if start_block is not None and self.ledger.next_block == 0:
+            self.ledger.next_block = start_block
+
+        added = 0
+        chunk = self.chunk_size
+        while self.ledger.next_block <= to_block:
+            end = min(self.ledger.next_block + chunk - 1, to_block)
+            try:
+                logs = web3.eth.get_logs(
+                    {
+                        "fromBlock": self.ledger.next_block,
+                        "toBlock": end,
+                        "address": list(self.kinds),
+                        "topics": [list(TOPICS)],
+                    }
+                )
+            except ValueError:
+                # most providers limit how many logs we can get at once
+                if chunk == 1:
+                    raise
+                chunk = max(chunk // 2, 1)
+                continue
+            added += self._ingest(logs)
+            self.ledger.next_block = end + 1
+            self.ledger.save()
+        return added
+
+    def _ingest(self, logs):
+        # only take events from the kind of contract that should emit them
+        logs = [
+            log
+            for log in logs
+            if _event(log) is not None
+            and EVENTS[_event(log)][0]
+            == self.kinds[to_checksum_address(log["address"])]
+        ]
+        timestamps = {
+            block: web3.eth.get_block(block)["timestamp"]
+            for block in {log["blockNumber"] for log in logs}
+        }
+        receipts = {}
+        rows = {name: [] for name in EVENTS}
+        for log in logs:
+            name = _event(log)
+            (_, indexed, other) = EVENTS[name]
+            row = {
+                "block": log["blockNumber"],
+                "timestamp": timestamps[log["blockNumber"]],
+                "log_index": log["logIndex"],
+                "contract": self.ledger.code(log["address"]),
+            }
+            for arg, topic in zip(indexed, log["topics"][1:]):
+                (value,) = decode(
+                    ["address" if arg in ADDRESS_ARGS else "uint256"], bytes(topic)
+                )
+                row[arg] = self.ledger.code(value) if arg in ADDRESS_ARGS else value
+            values = decode(["uint256"] * len(other), bytes(log["data"]))
+            row.update(zip(other, values))
+
+            if name == "Harvested":
+                tx = log["transactionHash"]
+                if tx not in receipts:
+                    receipts[tx] = web3.eth.get_transaction_receipt(tx)
+                receipt = receipts[tx]
+                row["gasUsed"] = receipt["gasUsed"]
+                row["gasCost"] = receipt["gasUsed"] * receipt.get(
+                    "effectiveGasPrice", 0
+                )
+            elif name == "StrategyReported":
+                price = web3.eth.call(
+                    {"to": log["address"], "data": PRICE_PER_SHARE}, log["blockNumber"]
+                )
+                row["pricePerShare"] = int.from_bytes(bytes(price), "big")
+            rows[name].append(row)
+
+        for name, table_rows in rows.items():
+            self.ledger.append(name, table_rows)
+        return len(logs)
+
+
+# LEDGER_STRATEGIES, LEDGER_VAULTS and LEDGER_VOTERS are comma-separated addresses, LEDGER_PATH is where we keep our
+# columns and checkpoint, and LEDGER_START_BLOCK is where our first sync starts.
+def main():
+    print(f"You are using the '{network.show_active()}' network")
+
+    def addresses(name):
+        return [address for address in os.environ.get(name, "").split(",") if address]
+
+    ledger = Ledger(os.environ.get("LEDGER_PATH", "ledger"))
+    indexer = Indexer(
+        ledger,
+        addresses("LEDGER_STRATEGIES"),
+        addresses("LEDGER_VAULTS"),
+        addresses("LEDGER_VOTERS"),
+        confirmations=int(os.environ.get("LEDGER_CONFIRMATIONS", 12)),
+    )
+    added = indexer.sync(start_block=int(os.environ.get("LEDGER_START_BLOCK", 0)))
+    print(f"Added {added} logs, next block {ledger.next_block}")
+
+    for strategy in addresses("LEDGER_STRATEGIES"):
+        profits = ledger.profit_per_harvest(strategy)
+        gas = ledger.gas_per_harvest(strategy)
+        print(
+            f"{strategy}: {len(profits['profit'])} harvests, "
+            f"{profits['profit'].sum() / 1e18:,.2f} profit, "
+            f"{gas['gasUsed'].mean() if len(gas['gasUsed']) else 0:,.0f} gas per harvest"
+        )
+    for vault in addresses("LEDGER_VAULTS"):
+        print(f"{vault}: {ledger.realized_apr(vault)['total']:.2%} realized APR")
@@ -0,0 +1,251 @@
+# monte-carlo simulation of our harvest policy, to pick keepLQTY, harvestProfitMinInUsdc, harvestProfitMaxInUsdc,
+# maxReportDelay and profitToCostMultiple without guessing. every parameter combination is run over the same random
+# market paths (liquity fees, ether and LQTY prices, base fee) at once with numpy, so a grid of thousands of configs
+# over a year of blocks takes seconds. no chain needed: python scripts/simulate_harvests.py, or brownie run.
+import itertools
+import time
+
+import numpy as np
+
+SECONDS_PER_YEAR = 31_536_000
+SECONDS_PER_DAY = 86_400
+BLOCK_TIME = 12
+MAX_BPS = 10_000
+
+# what we assume about liquity and mainnet. fee amounts are protocol-wide, and split between stakers by stake.
+DEFAULT_MARKET = {
+    "years": 1.0,
+    "poll_blocks": 300,  # how often our keepers check harvestTrigger, once an hour
+    "tvl": 1_000_000.0,  # LQTY in our strategy
+    "total_staked": 20_000_000.0,  # LQTY staked in liquity by everyone else
+    "lusd_fees_per_day": 5_000.0,  # borrowing fees, in LUSD
+    "eth_fees_per_day": 1.0,  # redemption fees, in ether
+    "fee_events_per_day": 20.0,  # fees arrive in lumps, one per borrow or redemption
+    "fee_size_sigma": 1.5,  # lognormal spread of each lump's size
+    "lqty_price": 1.0,
+    "lqty_vol": 0.6,  # annualized
+    "eth_price": 1_600.0,
+    "eth_vol": 0.6,
+    "base_fee_gwei": 20.0,  # long-run median base fee
+    "base_fee_vol": 0.5,  # spread of log base fee around that median
+    "base_fee_half_life_hours": 6.0,  # how quickly a gas spike fades
+    "max_base_fee_gwei": 50.0,  # our base fee oracle's limit, see isBaseFeeAcceptable
+    "harvest_gas": 450_000,  # gas for a harvest with our voter on, see test_gas.py
+    "swap_cost_bps": 30,  # yswaps fees and slippage selling LUSD and WETH for LQTY
+}
+
+# a small grid around our current settings, 1,440 configs
+DEFAULT_GRID = {
+    "keep_lqty": [0, 250, 500, 1_000],
+    "harvest_profit_min": [1_000.0, 5_000.0, 10_000.0, 25_000.0, 50_000.0],
+    "harvest_profit_max": [25_000.0, 50_000.0, 100_000.0, 250_000.0],
+    "max_report_delay": [SECONDS_PER_DAY * days for days in [7, 14, 30, 60, 120, 365]],
+    "profit_to_cost_multiple": [0, 10_000, 50_000],
+}
+
+
+# every combination of the given values, as one array per parameter
+def parameter_grid(**values):
+    combos = list(itertools.product(*values.values()))
+    return {
+        name: np.array([combo[i] for combo in combos], dtype=float)
+        for i, name in enumerate(values)
+    }
+
+
+# the profit part of StrategyLQTYStaker._harvestTrigger, vectorized. profits and costs are in USDC, time in seconds.
+# assumes an active strategy with no forced harvest and no credit above our threshold.
+def harvest_trigger(
+    profit,
+    since_report,
+    base_fee_ok,
+    call_cost,
+    harvest_profit_min,
+    harvest_profit_max,
+    max_report_delay,
+    profit_to_cost_multiple,
+):
+    return (
+        (base_fee_ok & (since_report > max_report_delay))
+        | (profit > harvest_profit_max)
+        | (
+            base_fee_ok
+            & (profit > harvest_profit_min)
+            & (
+                (profit_to_cost_multiple == 0)
+                | (profit * MAX_BPS >= call_cost * profit_to_cost_multiple)
+            )
+        )
+    )
+
+
+# random market paths, returns arrays of shape (steps, paths). every config sees these same paths.
+def market_paths(market, paths, rng):
+    dt = market["poll_blocks"] * BLOCK_TIME
+    dt_years = dt / SECONDS_PER_YEAR
+    steps = int(market["years"] * SECONDS_PER_YEAR / dt)
+
+    # geometric brownian motion for our prices
+    def prices(start, vol):
+        shocks = rng.standard_normal((steps, paths)) * vol * np.sqrt(dt_years)
+        return start * np.exp(np.cumsum(shocks - 0.5 * vol ** 2 * dt_years, axis=0))
+
+    # log base fee mean-reverts to our median
+    phi = 0.5 ** (dt / 3_600 / market["base_fee_half_life_hours"])
+    shocks = (
+        rng.standard_normal((steps, paths))
+        * market["base_fee_vol"]
+        * np.sqrt(1 - phi ** 2)
+    )
+    log_base_fee = np.empty((steps, paths))
+    last = rng.standard_normal(paths) * market["base_fee_vol"]
+    for step in range(steps):
+        last = last * phi + shocks[step]
+        log_base_fee[step] = last
+
+    # fees are a count of lumps each step, scaled so their mean matches our daily totals
+    def fees(per_day):
+        rate = market["fee_events_per_day"] * dt / SECONDS_PER_DAY
+        sigma = market["fee_size_sigma"]
+        counts = rng.poisson(rate, (steps, paths))
+        sizes = rng.lognormal(-0.5 * sigma ** 2, sigma, (steps, paths))
+        return counts * sizes * per_day / market["fee_events_per_day"]
+
+    return {
+        "steps": steps,
+        "dt": dt,
+        "lqty_price": prices(market["lqty_price"], market["lqty_vol"]),
+        "eth_price": prices(market["eth_price"], market["eth_vol"]),
+        "base_fee": market["base_fee_gwei"] * np.exp(log_base_fee),
+        "lusd_fees": fees(market["lusd_fees_per_day"]),
+        "eth_fees": fees(market["eth_fees_per_day"]),
+    }
+
+
+# run every config in our grid over the same market paths. returns per-config averages over paths, APRs are in LQTY.
+def simulate(grid, market=DEFAULT_MARKET, paths=16, seed=0):
+    market = {**DEFAULT_MARKET, **market}
+    rng = np.random.default_rng(seed)
+    path = market_paths(market, paths, rng)
+    configs = len(next(iter(grid.values())))
+    shape = (paths, configs)
+
+    # one row per path, one column per config
+    keep = grid["keep_lqty"][None, :] / MAX_BPS
+    trigger_params = {
+        name: grid[name][None, :]
+        for name in (
+            "harvest_profit_min",
+            "harvest_profit_max",
+            "max_report_delay",
+            "profit_to_cost_multiple",
+        )
+    }
+    swap_kept = 1 - market["swap_cost_bps"] / MAX_BPS
+
+    staked = np.full(shape, market["tvl"])
+    loose = np.zeros(shape)  # last harvest's rewards, sold for LQTY by yswaps
+    voter = np.zeros(shape)
+    pending_lusd = np.zeros(shape)
+    pending_eth = np.zeros(shape)
+    voter_lusd = np.zeros(shape)
+    voter_eth = np.zeros(shape)
+    last_report = np.zeros(shape)
+    gas = np.zeros(shape)  # in LQTY
+    harvests = np.zeros(shape)
+
+    for step in range(path["steps"]):
+        now = (step + 1) * path["dt"]
+        lqty_price = path["lqty_price"][step][:, None]
+        eth_price = path["eth_price"][step][:, None]
+        base_fee = path["base_fee"][step][:, None]
+
+        # liquity splits fees by stake, and our voter's stake counts too
+        total = market["total_staked"] + staked + voter
+        lusd_fees = path["lusd_fees"][step][:, None] / total
+        eth_fees = path["eth_fees"][step][:, None] / total
+        pending_lusd += lusd_fees * staked
+        pending_eth += eth_fees * staked
+        voter_lusd += lusd_fees * voter
+        voter_eth += eth_fees * voter
+
+        # LUSD is priced at a dollar, like our oracle would more or less
+        call_cost = market["harvest_gas"] * base_fee * 1e-9 * eth_price
+        harvest = harvest_trigger(
+            pending_lusd + pending_eth * eth_price,
+            now - last_report,
+            base_fee <= market["max_base_fee_gwei"],
+            call_cost,
+            **trigger_params,
+        )
+        if not harvest.any():
+            continue
+
+        # send our voter its keep from what yswaps bought, and restake the rest
+        reported = loose * harvest
+        to_voter = reported * keep
+        staked += reported - to_voter
+        loose -= reported
+        voter += to_voter
+
+        # claim our rewards, plus our voter's if we forwarded it anything, for yswaps to sell before next harvest
+        forwarded = to_voter > 0
+        claimed = (pending_lusd + pending_eth * eth_price) * harvest
+        claimed += (voter_lusd + voter_eth * eth_price) * forwarded
+        loose += claimed * (swap_kept / lqty_price)
+        pending_lusd[harvest] = 0
+        pending_eth[harvest] = 0
+        voter_lusd[forwarded] = 0
+        voter_eth[forwarded] = 0
+
+        gas += harvest * (call_cost / lqty_price)
+        harvests += harvest
+        last_report[harvest] = now
+
+    years = path["steps"] * path["dt"] / SECONDS_PER_YEAR
+    gross_apr = ((staked + loose) / market["tvl"] - 1) / years
+    gas_apr = gas / market["tvl"] / years
+    net_apr = gross_apr - gas_apr
+    return {
+        "net_apr": net_apr.mean(axis=0),
+        "net_apr_std": net_apr.std(axis=0),
+        "gross_apr": gross_apr.mean(axis=0),
+        "gas_apr": gas_apr.mean(axis=0),
+        "harvests_per_year": harvests.mean(axis=0) / years,
+        "voter_lqty": voter.mean(axis=0),
+    }
+
+
+def main(top=10):
+    grid = parameter_grid(**DEFAULT_GRID)
+    configs = len(grid["keep_lqty"])
+    paths = 16
+    start = time.perf_counter()
+    results = simulate(grid, paths=paths)
+    elapsed = time.perf_counter() - start
+    blocks = DEFAULT_MARKET["years"] * SECONDS_PER_YEAR / BLOCK_TIME
+    print(
+        f"{configs:,} configs x {paths} paths x {blocks:,.0f} blocks in {elapsed:.1f}s"
+    )
+
+    print(
+        f"\n{'keep':>6} {'min':>8} {'max':>8} {'delay':>6} {'mult':>6} "
+        f"{'net APR':>8} {'std':>7} {'gas APR':>8} {'harvests':>9}"
+    )
+    for i in np.argsort(-results["net_apr"])[:top]:
+        print(
+            f"{grid['keep_lqty'][i]:>6.0f} "
+            f"{grid['harvest_profit_min'][i]:>8.0f} "
+            f"{grid['harvest_profit_max'][i]:>8.0f} "
+            f"{grid['max_report_delay'][i] / SECONDS_PER_DAY:>5.0f}d "
+            f"{grid['profit_to_cost_multiple'][i]:>6.0f} "
+            f"{results['net_apr'][i]:>8.2%} "
+            f"{results['net_apr_std'][i]:>7.2%} "
+            f"{results['gas_apr'][i]:>8.3%} "
+            f"{results['harvests_per_year'][i]:>9.1f}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    main()
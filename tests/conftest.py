@@ -1,17 +1,178 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
 import pytest
-from brownie import config, Contract, ZERO_ADDRESS, chain, interface, accounts
-from eth_abi import encode_single
+from brownie import (
+    config,
+    Contract,
+    ZERO_ADDRESS,
+    chain,
+    interface,
+    accounts,
+    history,
+    web3,
+)
 import requests
+from utils import deal, set_code, set_balance
 
 
+# our vault, strategy and voter are built once per session. we snapshot after any session-scoped setup so each
+# test starts from that same state, then revert to it afterwards instead of redeploying everything.
 @pytest.fixture(scope="function", autouse=True)
-def isolate(fn_isolation):
-    pass
+def isolate(module_isolation, stand_ins):
+    chain.snapshot()
+    yield
+    start = time.perf_counter()
+    chain.revert()
+    setup_benchmark["reverts"].append(time.perf_counter() - start)
+
+
+# brownie only runs tests in parallel (brownie test -n auto) if they all use module_isolation. each xdist worker
+# launches and owns its own chain (port 8545 + worker number) with its own fork or stand-ins, but brownie's version
+# of this fixture resets that chain between modules, throwing away our session setup. isolate already reverts
+# after every test, so there's nothing left to do here.
+@pytest.fixture(scope="module")
+def module_isolation():
+    yield
+
+
+# track what our one-time setup costs vs reverting to it, printed at the end of the session
+setup_benchmark = {"seconds": 0.0, "txs": 0, "reverts": [], "workers": 0}
+
+
+@contextmanager
+def timed_setup():
+    start = time.perf_counter()
+    txs = len(history)
+    yield
+    setup_benchmark["seconds"] += time.perf_counter() - start
+    setup_benchmark["txs"] += len(history) - txs
+
+
+# gas used by each benchmarked path, see test_gas.py. our baseline is committed in gas-snapshot.json, keyed by test
+# mode since our stand-ins don't cost the same gas as the real contracts. any path using more than our tolerance above
+# its baseline fails, and paths with no baseline yet are listed at the end of the run. normal runs never touch the
+# snapshot; to record new paths, lock in improvements or accept a regression, run with UPDATE_GAS_SNAPSHOT=1 and
+# commit the result.
+GAS_SNAPSHOT = Path(__file__).parent / "gas-snapshot.json"
+gas_tolerance = float(os.getenv("GAS_TOLERANCE", "0.02"))
+update_gas_snapshot = os.getenv("UPDATE_GAS_SNAPSHOT", "0") == "1"
+gas_results = {}
+
+
+def load_gas_snapshot():
+    if not GAS_SNAPSHOT.exists():
+        return {}
+    return json.loads(GAS_SNAPSHOT.read_text())
+
+
+def gas_baseline():
+    return load_gas_snapshot().get("local" if use_local else "fork", {})
+
+
+@pytest.fixture(scope="session")
+def gas_snapshot():
+    baseline = gas_baseline()
+
+    def check(name, gas_used):
+        gas_results[name] = gas_used
+        print(f"{name}: {gas_used} gas")
+        if update_gas_snapshot or name not in baseline:
+            return
+        limit = baseline[name] * (1 + gas_tolerance)
+        assert (
+            gas_used <= limit
+        ), f"{name} regressed: {gas_used} gas vs {baseline[name]} baseline (+{gas_tolerance:.0%} allowed)"
+
+    yield check
+
+
+# only called with UPDATE_GAS_SNAPSHOT=1. paths we didn't run this time keep their old numbers.
+def write_gas_snapshot():
+    mode = "local" if use_local else "fork"
+    snapshot = load_gas_snapshot()
+    baseline = snapshot.setdefault(mode, {})
+    baseline.update(gas_results)
+    snapshot[mode] = dict(sorted(baseline.items()))
+    GAS_SNAPSHOT.write_text(json.dumps(snapshot, indent=2) + "\n")
+
+
+# when running in parallel, each worker ships its numbers back to the controller, which does the printing and writing
+def pytest_sessionfinish(session):
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["setup_benchmark"] = setup_benchmark
+        session.config.workeroutput["gas_results"] = gas_results
+    elif gas_results and update_gas_snapshot:
+        write_gas_snapshot()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    worker_output = getattr(node, "workeroutput", {})
+    worker_benchmark = worker_output.get("setup_benchmark")
+    if worker_benchmark:
+        setup_benchmark["seconds"] += worker_benchmark["seconds"]
+        setup_benchmark["txs"] += worker_benchmark["txs"]
+        setup_benchmark["reverts"].extend(worker_benchmark["reverts"])
+        setup_benchmark["workers"] += 1
+    gas_results.update(worker_output.get("gas_results", {}))
+
+
+def pytest_terminal_summary(terminalreporter):
+    gas_summary(terminalreporter)
+    reverts = setup_benchmark["reverts"]
+    if not reverts or not setup_benchmark["txs"]:
+        return
+    # every worker does its own one-time setup
+    workers = max(setup_benchmark["workers"], 1)
+    setup_seconds = setup_benchmark["seconds"] / workers
+    avg_revert = sum(reverts) / len(reverts)
+    saved = setup_seconds - avg_revert
+    terminalreporter.write_sep("=", "snapshot fixtures")
+    terminalreporter.write_line(
+        f"one-time setup: {setup_benchmark['txs'] // workers} txs, {setup_seconds:.2f}s (x{workers} workers)"
+    )
+    terminalreporter.write_line(
+        f"revert per test: {avg_revert:.3f}s avg over {len(reverts)} tests"
+    )
+    terminalreporter.write_line(
+        f"saved per test: ~{saved:.2f}s, ~{saved * len(reverts):.1f}s total"
+    )
+
+
+# every path that moved against our baseline, so improvements are visible (and can be locked in) as well as regressions
+def gas_summary(terminalreporter):
+    baseline = gas_baseline()
+    changes = {
+        name: (baseline[name], gas_used)
+        for name, gas_used in gas_results.items()
+        if name in baseline and gas_used != baseline[name]
+    }
+    missing = sorted(name for name in gas_results if name not in baseline)
+    if not changes and not missing:
+        return
+    terminalreporter.write_sep("=", "gas vs baseline")
+    for name, (before, after) in sorted(changes.items()):
+        change = f" ({(after - before) / before:+.2%})" if before else ""
+        terminalreporter.write_line(f"{name}: {before} -> {after}{change}")
+    for name in missing:
+        terminalreporter.write_line(f"{name}: no baseline, {gas_results[name]}")
+    if not update_gas_snapshot:
+        terminalreporter.write_line(
+            f"run with UPDATE_GAS_SNAPSHOT=1 to write these to {GAS_SNAPSHOT.name}"
+        )
 
 
 # set this for if we want to use tenderly or not; mostly helpful because with brownie.reverts fails in tenderly forks.
 use_tenderly = False
 
+# set this to run against our bundled stand-in contracts (contracts/mocks) on a plain local dev chain instead of a mainnet fork.
+# can also be turned on with an env var: TEST_MODE=local brownie test --network development
+# NOTE: the dev chain needs to support code injection, so use ganache v7+, anvil or hardhat.
+use_local = os.getenv("TEST_MODE", "fork") == "local"
+
 # use this to set what chain we use. 1 for ETH, 250 for fantom, 10 optimism, 42161 arbitrum
 chain_used = 1
 
@@ -32,6 +193,93 @@ def tenderly_fork(web3, chain):
     print(f"https://dashboard.tenderly.co/yearn/yearn-web/fork/{fork_id}")
 
 
+################################################## LOCAL STAND-INS ##################################################
+
+# these are the canonical mainnet addresses our strategy, voter, and fixtures expect to find things at
+LQTY = "0x6DEA81C8171D0bA574754EF6F8b412F2Ed88c54D"
+LUSD = "0x5f98805A4E8be255a32880FDeC7F6728C6568bA0"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+CRV = "0xD533a949740bb3306d119CC777fa900bA034cd52"
+LQTY_STAKING = "0x4f9Fbb3f1E99B56e0Fe2892e623Ed36A76Fc605d"
+LENS_ORACLE = "0x83d95e0D5f402511dB06817Aff3f9eA88224B030"
+TRADE_FACTORY = "0xcADBA199F3AC26F67f660C89d43eB1820b7f7a3b"
+HEALTH_CHECK = "0xDDCea799fF1699e98EDF118e0629A974Df7DF012"
+BASE_FEE_ORACLE = "0xfeCA6895DcF50d6350ad0b5A8232CF657C316dA7"
+KEEPER_WRAPPER = "0x0D26E894C2371AB6D20d99A65E991775e3b5CAd7"
+
+# our whales, on any chain we write them roughly what they hold on mainnet, see deal
+LQTY_WHALE = "0x83b1eC6cc7D44bb9BA1A48c53AB0337cAE5A0DBe"
+LQTY_PROFIT_WHALE = "0xD8c9D9071123a059C6E0A945cF0e0c82b508d816"
+LUSD_WHALE = "0x99C9fc46f92E8a1c0deC1b1747d010903E884bE1"
+LUSD_BORROWER = "0xaC5406AEBe35A27691D62bFb80eeFcD7c0093164"
+
+
+# deploy each stand-in, then copy its runtime code over to the canonical address. nothing happens in fork mode.
+@pytest.fixture(scope="session", autouse=True)
+def stand_ins(
+    MockERC20,
+    MockWETH,
+    MockLiquityStaking,
+    MockLensOracle,
+    MockTradeFactory,
+    MockHealthCheck,
+    MockBaseFeeOracle,
+    MockKeeperWrapper,
+):
+    if not use_local:
+        yield False
+        return
+
+    deployer = accounts[0]
+    for address, container in (
+        (LQTY, MockERC20),
+        (LUSD, MockERC20),
+        (WETH, MockWETH),
+        (CRV, MockERC20),
+        (LQTY_STAKING, MockLiquityStaking),
+        (LENS_ORACLE, MockLensOracle),
+        (TRADE_FACTORY, MockTradeFactory),
+        (HEALTH_CHECK, MockHealthCheck),
+        (BASE_FEE_ORACLE, MockBaseFeeOracle),
+        (KEEPER_WRAPPER, MockKeeperWrapper),
+    ):
+        deployed = container.deploy({"from": deployer})
+        set_code(address, web3.eth.get_code(deployed.address))
+
+    # storage doesn't come along with the code, so set up anything our tests rely on
+    lqty = MockERC20.at(LQTY)
+    lusd = MockERC20.at(LUSD)
+    lqty.initialize("LQTY", "LQTY", {"from": deployer})
+    lusd.initialize("LUSD Stablecoin", "LUSD", {"from": deployer})
+    MockWETH.at(WETH).initialize("Wrapped Ether", "WETH", {"from": deployer})
+    MockERC20.at(CRV).initialize("Curve DAO Token", "CRV", {"from": deployer})
+
+    # oracle prices are in USDC, 6 decimals
+    oracle = MockLensOracle.at(LENS_ORACLE)
+    oracle.setPrice(LQTY, 1e6, {"from": deployer})
+    oracle.setPrice(LUSD, 1e6, {"from": deployer})
+    oracle.setPrice(WETH, 1_600e6, {"from": deployer})
+
+    # same limits as yearn's common health check
+    health_check = MockHealthCheck.at(HEALTH_CHECK)
+    health_check.setProfitLimitRatio(100, {"from": deployer})
+    health_check.setlossLimitRatio(1, {"from": deployer})
+
+    # give our borrower ether in case our dev chain charges for gas, our whales are funded by their fixtures
+    set_balance(LUSD_BORROWER, 10_000e18)
+
+    # the staking contract holds the ether it pays out as fees, on mainnet this comes from the ActivePool
+    set_balance(LQTY_STAKING, 10_000e18)
+
+    # someone else needs to be staked so fees are spread over more than just our strategy, like on mainnet
+    lusd_borrower = accounts.at(LUSD_BORROWER, force=True)
+    deal(lqty, lusd_borrower, 1_000_000e18)
+    lqty.approve(LQTY_STAKING, 2 ** 256 - 1, {"from": lusd_borrower})
+    MockLiquityStaking.at(LQTY_STAKING).stake(1_000_000e18, {"from": lusd_borrower})
+
+    yield True
+
+
 ################################################ UPDATE THINGS BELOW HERE ################################################
 
 #################### FIXTURES BELOW NEED TO BE ADJUSTED FOR THIS REPO ####################
@@ -44,16 +292,12 @@ def token():
 
 
 @pytest.fixture(scope="session")
-def whale(amount, token):
+def whale(token):
     # Totally in it for the tech
-    # Update this with a large holder of your want token (the largest EOA holder of LP)
-    whale = accounts.at(
-        "0x83b1eC6cc7D44bb9BA1A48c53AB0337cAE5A0DBe", force=True
-    )  # 0x83b1eC6cc7D44bb9BA1A48c53AB0337cAE5A0DBe, LQTY, 9.8m tokens
-    if token.balanceOf(whale) < 2 * amount:
-        raise ValueError(
-            "Our whale needs more funds. Find another whale or reduce your amount variable."
-        )
+    # any address works, we write its balance straight to storage so we don't depend on what it holds at our fork block
+    whale = accounts.at(LQTY_WHALE, force=True)
+    deal(token, whale, 9_800_000e18)
+    set_balance(whale, 10_000e18)
     yield whale
 
 
@@ -64,15 +308,11 @@ def amount(token):
 
 
 @pytest.fixture(scope="session")
-def profit_whale(profit_amount, token):
+def profit_whale(token):
     # ideally not the same whale as the main whale, or else they will lose money
-    profit_whale = accounts.at(
-        "0xD8c9D9071123a059C6E0A945cF0e0c82b508d816", force=True
-    )  # 0xD8c9D9071123a059C6E0A945cF0e0c82b508d816, LQTY, 8.7m tokens
-    if token.balanceOf(profit_whale) < 5 * profit_amount:
-        raise ValueError(
-            "Our profit whale needs more funds. Find another whale or reduce your profit_amount variable."
-        )
+    profit_whale = accounts.at(LQTY_PROFIT_WHALE, force=True)
+    deal(token, profit_whale, 8_700_000e18)
+    set_balance(profit_whale, 10_000e18)
     yield profit_whale
 
 
@@ -120,7 +360,7 @@ def use_yswaps():
 # whether or not a strategy is clonable. if true, don't forget to update what our cloning function is called in test_cloning.py
 @pytest.fixture(scope="session")
 def is_clonable():
-    is_clonable = False
+    is_clonable = True
     yield is_clonable
 
 
@@ -175,20 +415,28 @@ if chain_used == 1:  # mainnet
 
     @pytest.fixture(scope="session")
     def gov():
-        yield accounts.at("0xFEB4acf3df3cDEA7399794D0869ef76A6EfAff52", force=True)
+        gov = accounts.at("0xFEB4acf3df3cDEA7399794D0869ef76A6EfAff52", force=True)
+        if use_local:
+            set_balance(gov, 10_000e18)
+        yield gov
 
     @pytest.fixture(scope="session")
     def health_check():
-        yield interface.IHealthCheck("0xddcea799ff1699e98edf118e0629a974df7df012")
+        yield interface.IHealthCheck(HEALTH_CHECK)
 
     @pytest.fixture(scope="session")
     def base_fee_oracle():
-        yield interface.IBaseFeeOracle("0xfeCA6895DcF50d6350ad0b5A8232CF657C316dA7")
+        yield interface.IBaseFeeOracle(BASE_FEE_ORACLE)
 
     # set all of the following to SMS, just simpler
     @pytest.fixture(scope="session")
     def management():
-        yield accounts.at("0x16388463d60FFE0661Cf7F1f31a7D658aC790ff7", force=True)
+        management = accounts.at(
+            "0x16388463d60FFE0661Cf7F1f31a7D658aC790ff7", force=True
+        )
+        if use_local:
+            set_balance(management, 10_000e18)
+        yield management
 
     @pytest.fixture(scope="session")
     def rewards(management):
@@ -209,27 +457,34 @@ if chain_used == 1:  # mainnet
     @pytest.fixture(scope="session")
     def to_sweep():
         # token we can sweep out of strategy (use CRV)
-        yield interface.IERC20("0xD533a949740bb3306d119CC777fa900bA034cd52")
+        yield interface.IERC20(CRV)
 
     @pytest.fixture(scope="session")
-    def trade_factory():
-        yield Contract("0xcADBA199F3AC26F67f660C89d43eB1820b7f7a3b")
+    def trade_factory(MockTradeFactory):
+        if use_local:
+            yield MockTradeFactory.at(TRADE_FACTORY)
+        else:
+            yield Contract(TRADE_FACTORY)
 
     @pytest.fixture(scope="session")
-    def keeper_wrapper():
-        yield Contract("0x0D26E894C2371AB6D20d99A65E991775e3b5CAd7")
+    def keeper_wrapper(MockKeeperWrapper):
+        if use_local:
+            yield MockKeeperWrapper.at(KEEPER_WRAPPER)
+        else:
+            yield Contract(KEEPER_WRAPPER)
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def vault(pm, gov, rewards, guardian, management, token, vault_address):
-    if vault_address == ZERO_ADDRESS:
-        Vault = pm(config["dependencies"][0]).Vault
-        vault = guardian.deploy(Vault)
-        vault.initialize(token, gov, rewards, "", "", guardian)
-        vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
-        vault.setManagement(management, {"from": gov})
-    else:
-        vault = interface.IVaultFactory045(vault_address)
+    with timed_setup():
+        if vault_address == ZERO_ADDRESS:
+            Vault = pm(config["dependencies"][0]).Vault
+            vault = guardian.deploy(Vault)
+            vault.initialize(token, gov, rewards, "", "", guardian)
+            vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+            vault.setManagement(management, {"from": gov})
+        else:
+            vault = interface.IVaultFactory045(vault_address)
     yield vault
 
 
@@ -238,7 +493,8 @@ def vault(pm, gov, rewards, guardian, management, token, vault_address):
 #################### FIXTURES BELOW LIKELY NEED TO BE ADJUSTED FOR THIS REPO ####################
 
 
-@pytest.fixture
+# deployed and wired up once per session, each test reverts back to this state
+@pytest.fixture(scope="session")
 def strategy(
     strategist,
     keeper,
@@ -252,34 +508,35 @@ def strategy(
     vault_address,
     trade_factory,
 ):
-    # will need to update this based on the strategy's constructor ******
-    strategy = gov.deploy(contract_name, vault, trade_factory, 10_000e6, 50_000e6)
-
-    strategy.setKeeper(keeper, {"from": gov})
-    strategy.setHealthCheck(health_check, {"from": gov})
-    strategy.setDoHealthCheck(True, {"from": gov})
-    vault.setPerformanceFee(0, {"from": gov})
-    vault.setManagementFee(0, {"from": gov})
-
-    # if we have other strategies, set them to zero DR and remove them from the queue
-    if vault_address != ZERO_ADDRESS:
-        for i in range(0, 20):
-            strat_address = vault.withdrawalQueue(i)
-            if ZERO_ADDRESS == strat_address:
-                break
-
-            if vault.strategies(strat_address)["debtRatio"] > 0:
-                vault.updateStrategyDebtRatio(strat_address, 0, {"from": gov})
-                interface.ICurveStrategy045(strat_address).harvest({"from": gov})
-                vault.removeStrategyFromQueue(strat_address, {"from": gov})
-
-    vault.addStrategy(strategy, 10_000, 0, 2 ** 256 - 1, 0, {"from": gov})
-
-    # turn our oracle into testing mode by setting the provider to 0x00, then forcing true
-    strategy.setBaseFeeOracle(base_fee_oracle, {"from": management})
-    base_fee_oracle.setBaseFeeProvider(ZERO_ADDRESS, {"from": management})
-    base_fee_oracle.setManualBaseFeeBool(True, {"from": management})
-    assert strategy.isBaseFeeAcceptable() == True
+    with timed_setup():
+        # will need to update this based on the strategy's constructor ******
+        strategy = gov.deploy(contract_name, vault, trade_factory, 10_000e6, 50_000e6)
+
+        strategy.setKeeper(keeper, {"from": gov})
+        strategy.setHealthCheck(health_check, {"from": gov})
+        strategy.setDoHealthCheck(True, {"from": gov})
+        vault.setPerformanceFee(0, {"from": gov})
+        vault.setManagementFee(0, {"from": gov})
+
+        # if we have other strategies, set them to zero DR and remove them from the queue
+        if vault_address != ZERO_ADDRESS:
+            for i in range(0, 20):
+                strat_address = vault.withdrawalQueue(i)
+                if ZERO_ADDRESS == strat_address:
+                    break
+
+                if vault.strategies(strat_address)["debtRatio"] > 0:
+                    vault.updateStrategyDebtRatio(strat_address, 0, {"from": gov})
+                    interface.ICurveStrategy045(strat_address).harvest({"from": gov})
+                    vault.removeStrategyFromQueue(strat_address, {"from": gov})
+
+        vault.addStrategy(strategy, 10_000, 0, 2 ** 256 - 1, 0, {"from": gov})
+
+        # turn our oracle into testing mode by setting the provider to 0x00, then forcing true
+        strategy.setBaseFeeOracle(base_fee_oracle, {"from": management})
+        base_fee_oracle.setBaseFeeProvider(ZERO_ADDRESS, {"from": management})
+        base_fee_oracle.setManualBaseFeeBool(True, {"from": management})
+        assert strategy.isBaseFeeAcceptable() == True
 
     yield strategy
 
@@ -289,7 +546,7 @@ def strategy(
 ####################         PUT UNIQUE FIXTURES FOR THIS REPO BELOW         ####################
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def voter(
     yLQTYVoter,
     strategy,
@@ -300,13 +557,75 @@ def voter(
     token,
     vault_address,
 ):
-    voter = gov.deploy(yLQTYVoter, strategy)
+    with timed_setup():
+        voter = gov.deploy(yLQTYVoter, strategy)
     yield voter
 
 
+@pytest.fixture(scope="session")
+def factory(yLQTYFactory, strategy, voter, gov):
+    with timed_setup():
+        factory = gov.deploy(yLQTYFactory, strategy, voter)
+    yield factory
+
+
+@pytest.fixture(scope="session")
+def lens(yLQTYLens, gov):
+    with timed_setup():
+        lens = gov.deploy(yLQTYLens)
+    yield lens
+
+
 @pytest.fixture(scope="session")
 def lusd_whale():
-    return accounts.at("0x99C9fc46f92E8a1c0deC1b1747d010903E884bE1", force=True)
+    lusd_whale = accounts.at(LUSD_WHALE, force=True)
+    deal(interface.IERC20(LUSD), lusd_whale, 10_000_000e18)
+    set_balance(lusd_whale, 10_000e18)
+    return lusd_whale
+
+
+@pytest.fixture(scope="session")
+def lqty_staking(MockLiquityStaking):
+    if use_local:
+        yield MockLiquityStaking.at(LQTY_STAKING)
+    else:
+        yield Contract(LQTY_STAKING)
+
+
+@pytest.fixture(scope="session")
+def lens_oracle(MockLensOracle):
+    if use_local:
+        yield MockLensOracle.at(LENS_ORACLE)
+    else:
+        yield Contract(LENS_ORACLE)
+
+
+# a liquity staker that isn't us, useful to check that fees are accruing
+@pytest.fixture(scope="session")
+def lusd_borrower():
+    yield accounts.at(LUSD_BORROWER, force=True)
+
+
+# this is who is allowed to increase F_ETH on liquity's staking contract
+@pytest.fixture(scope="session")
+def trove_manager():
+    trove_manager = accounts.at(
+        "0xA39739EF8b0231DbFA0DcdA07d7e29faAbCf4bb2", force=True
+    )
+    if use_local:
+        set_balance(trove_manager, 10_000e18)
+    yield trove_manager
+
+
+# this is who is allowed to increase F_LUSD on liquity's staking contract
+@pytest.fixture(scope="session")
+def borrower_operations():
+    borrower_operations = accounts.at(
+        "0x24179CD81c9e782A4096035f7eC97fB8B783e007", force=True
+    )
+    if use_local:
+        set_balance(borrower_operations, 10_000e18)
+    yield borrower_operations
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,736 @@
+# pure-python model of our strategy and voter, plus just enough of liquity's staking and a yearn 0.4.6 vault to check
+# their accounting without a chain. all math is integer math in the same order as the contracts, so everything should
+# match to the wei. see test_model.py, which replays the same random operations against this and our contracts.
+# this assumes what our fixtures set up: no vault fees, one strategy, no health check, and no emergency exit.
+import random
+
+MAX_BPS = 10_000
+DECIMAL_PRECISION = 10 ** 18
+DEGRADATION_COEFFICIENT = 10 ** 18
+MAX_UINT256 = 2 ** 256 - 1
+
+
+# anything that can hold our tokens. eth is native ether, the rest are ERC-20 balances.
+class Account:
+    def __init__(self):
+        self.lqty = 0
+        self.lusd = 0
+        self.weth = 0
+        self.eth = 0
+
+
+class LiquityStaking(Account):
+    # seed from the chain, since other stakers change how fees are split
+    def __init__(self, total_staked=0, f_eth=0, f_lusd=0):
+        super().__init__()
+        self.total_staked = total_staked
+        self.f_eth = f_eth
+        self.f_lusd = f_lusd
+        self.stakes = {}
+        self.snapshots = {}
+
+    # returns (eth, lusd) a staker could claim
+    def pending(self, user):
+        stake = self.stakes.get(user, 0)
+        f_eth, f_lusd = self.snapshots.get(user, (0, 0))
+        return (
+            stake * (self.f_eth - f_eth) // DECIMAL_PRECISION,
+            stake * (self.f_lusd - f_lusd) // DECIMAL_PRECISION,
+        )
+
+    def stake(self, user, amount):
+        assert amount > 0, "LQTYStaking: Amount must be non-zero"
+        current = self.stakes.get(user, 0)
+        eth_gain, lusd_gain = self.pending(user) if current else (0, 0)
+        self.snapshots[user] = (self.f_eth, self.f_lusd)
+        self.stakes[user] = current + amount
+        self.total_staked += amount
+        user.lqty -= amount
+        user.lusd += lusd_gain
+        user.eth += eth_gain
+
+    # like liquity, asking for more than our stake gets us our whole stake
+    def unstake(self, user, amount):
+        current = self.stakes.get(user, 0)
+        assert current > 0, "LQTYStaking: User must have a non-zero stake"
+        eth_gain, lusd_gain = self.pending(user)
+        self.snapshots[user] = (self.f_eth, self.f_lusd)
+        if amount > 0:
+            withdrawn = min(amount, current)
+            self.stakes[user] = current - withdrawn
+            self.total_staked -= withdrawn
+            user.lqty += withdrawn
+        user.lusd += lusd_gain
+        user.eth += eth_gain
+
+    def increase_f_eth(self, fee):
+        if self.total_staked > 0:
+            self.f_eth += fee * DECIMAL_PRECISION // self.total_staked
+
+    def increase_f_lusd(self, fee):
+        if self.total_staked > 0:
+            self.f_lusd += fee * DECIMAL_PRECISION // self.total_staked
+
+
+class Vault(Account):
+    def __init__(self, locked_profit_degradation=46 * 10 ** 15, now=0):
+        super().__init__()
+        self.total_idle = 0
+        self.total_debt = 0
+        self.total_supply = 0
+        self.debt_ratio = 0
+        self.locked_profit = 0
+        self.locked_profit_degradation = locked_profit_degradation
+        self.last_report = now
+        self.strategies = {}
+        self.withdrawal_queue = []
+
+    # keys match what vault.strategies() returns, so we can compare them directly
+    def add_strategy(self, strategy, debt_ratio, now):
+        self.strategies[strategy] = {
+            "activation": now,
+            "debtRatio": debt_ratio,
+            "minDebtPerHarvest": 0,
+            "maxDebtPerHarvest": MAX_UINT256,
+            "lastReport": now,
+            "totalDebt": 0,
+            "totalGain": 0,
+            "totalLoss": 0,
+        }
+        self.debt_ratio += debt_ratio
+        self.withdrawal_queue.append(strategy)
+
+    def update_strategy_debt_ratio(self, strategy, debt_ratio):
+        self.debt_ratio -= self.strategies[strategy]["debtRatio"]
+        self.strategies[strategy]["debtRatio"] = debt_ratio
+        self.debt_ratio += debt_ratio
+        assert self.debt_ratio <= MAX_BPS
+
+    def total_assets(self):
+        return self.total_idle + self.total_debt
+
+    def calculate_locked_profit(self, now):
+        locked_funds_ratio = (now - self.last_report) * self.locked_profit_degradation
+        if locked_funds_ratio < DEGRADATION_COEFFICIENT:
+            return (
+                self.locked_profit
+                - locked_funds_ratio * self.locked_profit // DEGRADATION_COEFFICIENT
+            )
+        return 0
+
+    def free_funds(self, now):
+        return self.total_assets() - self.calculate_locked_profit(now)
+
+    def shares_for_amount(self, amount, now):
+        free_funds = self.free_funds(now)
+        return amount * self.total_supply // free_funds if free_funds > 0 else 0
+
+    def share_value(self, shares, now):
+        if self.total_supply == 0:
+            return shares
+        return shares * self.free_funds(now) // self.total_supply
+
+    def credit_available(self, strategy):
+        params = self.strategies[strategy]
+        vault_total_assets = self.total_assets()
+        vault_debt_limit = self.debt_ratio * vault_total_assets // MAX_BPS
+        strategy_debt_limit = params["debtRatio"] * vault_total_assets // MAX_BPS
+        if (
+            strategy_debt_limit <= params["totalDebt"]
+            or vault_debt_limit <= self.total_debt
+        ):
+            return 0
+        available = strategy_debt_limit - params["totalDebt"]
+        available = min(available, vault_debt_limit - self.total_debt)
+        available = min(available, self.total_idle)
+        if available < params["minDebtPerHarvest"]:
+            return 0
+        return min(available, params["maxDebtPerHarvest"])
+
+    def debt_outstanding(self, strategy):
+        params = self.strategies[strategy]
+        if self.debt_ratio == 0:
+            return params["totalDebt"]
+        strategy_debt_limit = params["debtRatio"] * self.total_assets() // MAX_BPS
+        if params["totalDebt"] <= strategy_debt_limit:
+            return 0
+        return params["totalDebt"] - strategy_debt_limit
+
+    # returns shares minted
+    def deposit(self, amount, now):
+        assert amount > 0
+        if self.total_supply > 0:
+            shares = amount * self.total_supply // self.free_funds(now)
+        else:
+            shares = amount
+        assert shares != 0
+        self.total_supply += shares
+        self.total_idle += amount
+        return shares
+
+    # returns the want sent back, pulling from our strategies in queue order if we need to
+    def withdraw(self, shares, now, max_loss=1):
+        assert 0 < shares <= self.total_supply
+        value = self.share_value(shares, now)
+        vault_balance = self.total_idle
+        if value > vault_balance:
+            total_loss = 0
+            for strategy in self.withdrawal_queue:
+                if value <= vault_balance:
+                    break
+                params = self.strategies[strategy]
+                amount_needed = min(value - vault_balance, params["totalDebt"])
+                if amount_needed == 0:
+                    continue
+                withdrawn, loss = strategy.withdraw(amount_needed)
+                vault_balance += withdrawn
+                if loss > 0:
+                    value -= loss
+                    total_loss += loss
+                    self._report_loss(strategy, loss)
+                params["totalDebt"] -= withdrawn
+                self.total_debt -= withdrawn
+            self.total_idle = vault_balance
+            if value > vault_balance:
+                value = vault_balance
+                shares = self.shares_for_amount(value + total_loss, now)
+            assert total_loss <= max_loss * (value + total_loss) // MAX_BPS
+        self.total_supply -= shares
+        self.total_idle -= value
+        return value
+
+    def _report_loss(self, strategy, loss):
+        params = self.strategies[strategy]
+        assert params["totalDebt"] >= loss
+        if self.debt_ratio != 0:
+            ratio_change = min(
+                loss * self.debt_ratio // self.total_debt, params["debtRatio"]
+            )
+            params["debtRatio"] -= ratio_change
+            self.debt_ratio -= ratio_change
+        params["totalLoss"] += loss
+        params["totalDebt"] -= loss
+        self.total_debt -= loss
+
+    # returns what the strategy should pay back next time
+    def report(self, strategy, gain, loss, debt_payment, now):
+        params = self.strategies[strategy]
+        assert strategy.lqty >= gain + debt_payment
+        if loss > 0:
+            self._report_loss(strategy, loss)
+        # with no fees there's nothing to assess, but the vault still won't take two reports in one block
+        assert params["activation"] == now or now > params["lastReport"]
+        params["totalGain"] += gain
+
+        credit = self.credit_available(strategy)
+        debt = self.debt_outstanding(strategy)
+        debt_payment = min(debt_payment, debt)
+        if debt_payment > 0:
+            params["totalDebt"] -= debt_payment
+            self.total_debt -= debt_payment
+            debt -= debt_payment
+        if credit > 0:
+            params["totalDebt"] += credit
+            self.total_debt += credit
+
+        total_avail = gain + debt_payment
+        if total_avail < credit:
+            self.total_idle -= credit - total_avail
+            strategy.lqty += credit - total_avail
+        elif total_avail > credit:
+            self.total_idle += total_avail - credit
+            strategy.lqty -= total_avail - credit
+
+        locked_profit_before_loss = self.calculate_locked_profit(now) + gain
+        self.locked_profit = max(locked_profit_before_loss - loss, 0)
+        params["lastReport"] = now
+        self.last_report = now
+
+        if params["debtRatio"] == 0:
+            return strategy.estimated_total_assets()
+        return debt
+
+
+class Voter(Account):
+    def __init__(self, staking):
+        super().__init__()
+        self.staking = staking
+        self.positions = {}
+        self.total_shares = 0
+        self.lusd_per_share = 0
+        self.weth_per_share = 0
+        self.lusd_reserved = 0
+        self.weth_reserved = 0
+
+    def add_strategy(self, strategy):
+        assert strategy not in self.positions, "already added"
+        self.positions[strategy] = {
+            "active": True,
+            "shares": 0,
+            "lusdDebt": 0,
+            "wethDebt": 0,
+        }
+
+    def staked_balance(self):
+        return self.staking.stakes.get(self, 0)
+
+    # returns our StrategyHarvested event
+    def strategy_harvest(self, strategy):
+        position = self.positions[strategy]
+        assert position["active"]
+        lqty_amount = self.lqty
+        if lqty_amount > 0:
+            self.staking.stake(self, lqty_amount)
+        elif any(self.staking.pending(self)):
+            self.staking.unstake(self, 0)
+
+        lusd_distributed, weth_distributed = self._distribute()
+        lusd_paid, weth_paid = self._payout(strategy, position)
+
+        if lqty_amount > 0:
+            position["shares"] += lqty_amount
+            self.total_shares += lqty_amount
+            position["lusdDebt"] = (
+                position["shares"] * self.lusd_per_share // DECIMAL_PRECISION
+            )
+            position["wethDebt"] = (
+                position["shares"] * self.weth_per_share // DECIMAL_PRECISION
+            )
+
+        return {
+            "strategy": strategy,
+            "lqtyStaked": lqty_amount,
+            "lusdDistributed": lusd_distributed,
+            "wethDistributed": weth_distributed,
+            "lusdPaid": lusd_paid,
+            "wethPaid": weth_paid,
+        }
+
+    def _distribute(self):
+        if self.eth > 0:
+            self.weth += self.eth
+            self.eth = 0
+        if self.total_shares == 0:
+            return (0, 0)
+        new_lusd = self.lusd - self.lusd_reserved
+        if new_lusd > 0:
+            self.lusd_per_share += new_lusd * DECIMAL_PRECISION // self.total_shares
+            self.lusd_reserved += new_lusd
+        new_weth = self.weth - self.weth_reserved
+        if new_weth > 0:
+            self.weth_per_share += new_weth * DECIMAL_PRECISION // self.total_shares
+            self.weth_reserved += new_weth
+        return (new_lusd, new_weth)
+
+    def _payout(self, strategy, position):
+        shares = position["shares"]
+        if shares == 0:
+            return (0, 0)
+        lusd_accrued = shares * self.lusd_per_share // DECIMAL_PRECISION
+        weth_accrued = shares * self.weth_per_share // DECIMAL_PRECISION
+        lusd_owed = min(lusd_accrued - position["lusdDebt"], self.lusd_reserved)
+        weth_owed = min(weth_accrued - position["wethDebt"], self.weth_reserved)
+        position["lusdDebt"] = lusd_accrued
+        position["wethDebt"] = weth_accrued
+        if lusd_owed > 0:
+            self.lusd_reserved -= lusd_owed
+            self.lusd -= lusd_owed
+            strategy.lusd += lusd_owed
+        if weth_owed > 0:
+            self.weth_reserved -= weth_owed
+            self.weth -= weth_owed
+            strategy.weth += weth_owed
+        return (lusd_owed, weth_owed)
+
+
+class Strategy(Account):
+    def __init__(self, vault, staking):
+        super().__init__()
+        self.vault = vault
+        self.staking = staking
+        self.voter = None
+        self.keep_lqty = 500
+        self.liquid_buffer_bps = 0
+        self.eth_dust = 0
+        self.lusd_dust = 0
+        self.lqty_dust = 0
+        self.voter_forward_threshold = 0
+        self.voter_forward_interval = 0
+        self.last_voter_forward = 0
+        self.voter_lqty_owed = 0
+        self.kept_profit = 0
+
+    def balance_of_want(self):
+        return self.lqty - self.voter_lqty_owed
+
+    def staked_balance(self):
+        return self.staking.stakes.get(self, 0)
+
+    def estimated_total_assets(self):
+        return self.balance_of_want() + self.staked_balance()
+
+    # returns the events our harvest emits, keyed by name
+    def harvest(self, now):
+        events = {}
+        debt_outstanding = self.vault.debt_outstanding(self)
+        profit, loss, debt_payment = self._prepare_return(debt_outstanding, now, events)
+        debt_outstanding = self.vault.report(self, profit, loss, debt_payment, now)
+        self._adjust_position(events, tend=False)
+        events["Harvested"] = {
+            "profit": profit,
+            "loss": loss,
+            "debtPayment": debt_payment,
+            "debtOutstanding": debt_outstanding,
+        }
+        return events
+
+    def tend(self):
+        events = {}
+        self._adjust_position(events, tend=True)
+        return events
+
+    # called by our vault, returns (amount sent to the vault, loss)
+    def withdraw(self, amount_needed):
+        freed, loss = self._liquidate_position(amount_needed)
+        self.lqty -= freed
+        return (freed, loss)
+
+    def _prepare_return(self, debt_outstanding, now, events):
+        assets = self.estimated_total_assets()
+        debt = self.vault.strategies[self]["totalDebt"]
+        assets -= self._claim_rewards(assets, debt, now, events)
+
+        profit = loss = debt_payment = 0
+        if assets >= debt:
+            profit = assets - debt
+            debt_payment = debt_outstanding
+            to_free = profit + debt_payment
+            freed, _ = self._liquidate_position(to_free)
+            if to_free > freed:
+                if debt_payment > freed:
+                    debt_payment = freed
+                    profit = 0
+                else:
+                    profit = freed - debt_payment
+        else:
+            loss = debt - assets
+        return (profit, loss, debt_payment)
+
+    # returns the LQTY we set aside for our voter
+    def _claim_rewards(self, assets, debt, now, events):
+        (
+            eth_claimed,
+            lusd_claimed,
+            eth_wrapped,
+            skipped_claim,
+            skipped_wrap,
+        ) = self._claim_and_wrap()
+        lqty_to_voter = keep = 0
+        skipped_voter = False
+        kept_profit, self.kept_profit = self.kept_profit, 0
+        if self.voter is not None:
+            keep = self._voter_keep(assets, debt + kept_profit)
+            owed = self.voter_lqty_owed + keep
+            if owed > self.lqty_dust and self._voter_forward_due(owed, now):
+                events["StrategyHarvested"] = self._forward_to_voter(owed, now)
+                lqty_to_voter = owed
+            elif owed > 0:
+                self.voter_lqty_owed = owed
+                skipped_voter = True
+
+        if skipped_claim or skipped_wrap or skipped_voter:
+            events["HarvestStepsSkipped"] = {
+                "claim": skipped_claim,
+                "wrap": skipped_wrap,
+                "voter": skipped_voter,
+            }
+        events["RewardsClaimed"] = {
+            "ethClaimed": eth_claimed,
+            "lusdClaimed": lusd_claimed,
+            "ethWrapped": eth_wrapped,
+            "lqtyToVoter": lqty_to_voter,
+        }
+        return keep
+
+    # our keep only comes out of what we hold beyond our debt
+    def _voter_keep(self, assets, debt):
+        if self.keep_lqty == 0 or assets <= debt:
+            return 0
+        return (assets - debt) * self.keep_lqty // MAX_BPS
+
+    def _voter_forward_due(self, owed, now):
+        threshold, interval = self.voter_forward_threshold, self.voter_forward_interval
+        if threshold == 0 and interval == 0:
+            return True
+        return (threshold > 0 and owed >= threshold) or (
+            interval > 0 and now - self.last_voter_forward >= interval
+        )
+
+    def _forward_to_voter(self, owed, now):
+        self.voter_lqty_owed = 0
+        self.last_voter_forward = now
+        self.lqty -= owed
+        self.voter.lqty += owed
+        return self.voter.strategy_harvest(self)
+
+    def _claim_and_wrap(self):
+        eth_claimed = lusd_claimed = eth_wrapped = 0
+        skipped_claim = skipped_wrap = False
+        if self.staked_balance() > 0:
+            pending_eth, pending_lusd = self.staking.pending(self)
+            if pending_eth > self.eth_dust or pending_lusd > self.lusd_dust:
+                self.staking.unstake(self, 0)
+                eth_claimed, lusd_claimed = pending_eth, pending_lusd
+            else:
+                skipped_claim = True
+
+        if self.eth > self.eth_dust:
+            eth_wrapped = self.eth
+            self.weth += self.eth
+            self.eth = 0
+        elif self.eth > 0:
+            skipped_wrap = True
+        return (eth_claimed, lusd_claimed, eth_wrapped, skipped_claim, skipped_wrap)
+
+    def _adjust_position(self, events, tend):
+        if tend:
+            eth_claimed, lusd_claimed, eth_wrapped, _, _ = self._claim_and_wrap()
+            events["RewardsClaimed"] = {
+                "ethClaimed": eth_claimed,
+                "lusdClaimed": lusd_claimed,
+                "ethWrapped": eth_wrapped,
+                "lqtyToVoter": 0,
+            }
+            if self.voter is not None and self.keep_lqty > 0:
+                assets = self.estimated_total_assets()
+                debt = self.vault.strategies[self]["totalDebt"]
+                keep = self._voter_keep(assets, debt + self.kept_profit)
+                if keep > 0:
+                    self.voter_lqty_owed += keep
+                    self.kept_profit = assets - keep - debt
+
+        want_bal = self.balance_of_want()
+        buffer = self.liquid_buffer_bps
+        if buffer > 0:
+            staked_bal = self.staked_balance()
+            target = (want_bal + staked_bal) * buffer // MAX_BPS
+            if want_bal > target:
+                self.staking.stake(self, want_bal - target)
+            elif want_bal < target and staked_bal > 0:
+                self.staking.unstake(self, min(target - want_bal, staked_bal))
+            return
+
+        if want_bal > 0:
+            self.staking.stake(self, want_bal)
+
+    def _liquidate_position(self, amount_needed):
+        want_bal = self.balance_of_want()
+        if amount_needed > want_bal:
+            staked_bal = self.staked_balance()
+            if staked_bal > 0:
+                self.staking.unstake(self, min(staked_bal, amount_needed - want_bal))
+            liquidated = min(amount_needed, self.balance_of_want())
+            return (liquidated, amount_needed - liquidated)
+        return (amount_needed, 0)
+
+
+# one vault, strategy and voter wired up like our fixtures, plus a depositor. step() applies one of the operations
+# from random_operations, and snapshot() reads back the same fields as our contracts' snapshot views.
+class Model:
+    def __init__(self, staking=None, locked_profit_degradation=46 * 10 ** 15, now=0):
+        self.staking = staking or LiquityStaking()
+        self.vault = Vault(locked_profit_degradation, now)
+        self.strategy = Strategy(self.vault, self.staking)
+        self.voter = Voter(self.staking)
+        self.voter.add_strategy(self.strategy)
+        self.strategy.voter = self.voter
+        self.vault.add_strategy(self.strategy, MAX_BPS, now)
+        self.shares = 0
+        # LQTY in from deposits and donations, less what went back out
+        self.net_inflow = 0
+
+    # our keep and any losses can leave shares with nothing behind them, and then our vault can't price a deposit.
+    # it would revert on chain too, so our scenarios skip it.
+    def skips(self, op):
+        return (
+            op[0] == "deposit"
+            and self.vault.total_supply > 0
+            and self.vault.total_assets() == 0
+        )
+
+    # returns any events emitted, keyed by name
+    def step(self, op, now):
+        name, *args = op
+        strategy, vault = self.strategy, self.vault
+        if name == "deposit":
+            self.shares += vault.deposit(args[0], now)
+            self.net_inflow += args[0]
+        elif name == "withdraw":
+            shares = self.shares * args[0] // MAX_BPS
+            if shares > 0:
+                self.net_inflow -= vault.withdraw(shares, now, MAX_BPS)
+                self.shares -= shares
+        elif name == "donate":
+            strategy.lqty += args[0]
+            self.net_inflow += args[0]
+        elif name == "lose":
+            lost = strategy.balance_of_want() * args[0] // MAX_BPS
+            strategy.lqty -= lost
+            self.net_inflow -= lost
+        elif name == "fees":
+            self.staking.increase_f_lusd(args[0])
+            self.staking.increase_f_eth(args[1])
+        elif name == "harvest":
+            return strategy.harvest(now)
+        elif name == "tend":
+            return strategy.tend()
+        elif name == "debt_ratio":
+            vault.update_strategy_debt_ratio(strategy, args[0])
+        elif name == "keep":
+            strategy.keep_lqty = args[0]
+        elif name == "buffer":
+            strategy.liquid_buffer_bps = args[0]
+        elif name == "forwarding":
+            strategy.voter_forward_threshold, strategy.voter_forward_interval = args
+        elif name == "dust":
+            strategy.eth_dust, strategy.lusd_dust, strategy.lqty_dust = args
+        elif name != "sleep":
+            raise ValueError(f"Unknown operation {name}")
+        return {}
+
+    def snapshot(self):
+        strategy, vault, voter = self.strategy, self.vault, self.voter
+        pending_eth, pending_lusd = self.staking.pending(strategy)
+        voter_pending_eth, voter_pending_lusd = self.staking.pending(voter)
+        position = voter.positions[strategy]
+        return {
+            "strategy": {
+                "balanceOfWant": strategy.balance_of_want(),
+                "stakedBalance": strategy.staked_balance(),
+                "estimatedTotalAssets": strategy.estimated_total_assets(),
+                "pendingETH": pending_eth,
+                "pendingLUSD": pending_lusd,
+                "voterLqtyOwed": strategy.voter_lqty_owed,
+                "creditAvailable": vault.credit_available(strategy),
+                "debtOutstanding": vault.debt_outstanding(strategy),
+                "lastVoterForward": strategy.last_voter_forward,
+                "keptProfit": strategy.kept_profit,
+                "lusdBalance": strategy.lusd,
+                "wethBalance": strategy.weth,
+                "ethBalance": strategy.eth,
+            },
+            "params": {
+                key: vault.strategies[strategy][key]
+                for key in (
+                    "debtRatio",
+                    "lastReport",
+                    "totalDebt",
+                    "totalGain",
+                    "totalLoss",
+                )
+            },
+            "vault": {
+                "totalIdle": vault.total_idle,
+                "totalDebt": vault.total_debt,
+                "totalSupply": vault.total_supply,
+                "debtRatio": vault.debt_ratio,
+                "lockedProfit": vault.locked_profit,
+            },
+            "voter": {
+                "stakedBalance": voter.staked_balance(),
+                "pendingETH": voter_pending_eth,
+                "pendingLUSD": voter_pending_lusd,
+                "lusdBalance": voter.lusd,
+                "wethBalance": voter.weth,
+                "totalShares": voter.total_shares,
+                "lusdPerShare": voter.lusd_per_share,
+                "wethPerShare": voter.weth_per_share,
+                "lusdReserved": voter.lusd_reserved,
+                "wethReserved": voter.weth_reserved,
+                "shares": position["shares"],
+                "lusdDebt": position["lusdDebt"],
+                "wethDebt": position["wethDebt"],
+            },
+        }
+
+
+# a random sequence of operations, weighted towards the ones that move money. amounts are in wei, and small enough
+# for our whales and liquity's ether to cover any sequence.
+def random_operations(rng, count):
+    ops = [("deposit", rng.randint(1, 10_000) * 10 ** 18)]
+    for i in range(count - 1):
+        name = rng.choices(
+            [
+                "deposit",
+                "withdraw",
+                "donate",
+                "lose",
+                "fees",
+                "harvest",
+                "tend",
+                "debt_ratio",
+                "keep",
+                "buffer",
+                "forwarding",
+                "dust",
+                "sleep",
+            ],
+            weights=[4, 3, 3, 1, 4, 8, 2, 2, 1, 2, 1, 1, 3],
+        )[0]
+        if name == "deposit":
+            ops.append((name, rng.randint(1, 10_000) * 10 ** 18))
+        elif name == "withdraw":
+            ops.append((name, rng.randint(1, MAX_BPS)))
+        elif name == "lose":
+            ops.append((name, rng.randint(1, MAX_BPS // 2)))
+        elif name == "donate":
+            ops.append((name, rng.randint(1, 1_000) * 10 ** 16))
+        elif name == "fees":
+            ops.append(
+                (name, rng.randint(0, 10_000) * 10 ** 18, rng.randint(0, 10) * 10 ** 17)
+            )
+        elif name == "debt_ratio":
+            ops.append((name, rng.choice([0, 5_000, MAX_BPS])))
+        elif name == "keep":
+            ops.append((name, rng.randint(0, 1_000)))
+        elif name == "buffer":
+            ops.append((name, rng.choice([0, 0, 100, 2_000])))
+        elif name == "forwarding":
+            ops.append((name, rng.choice([0, 10 ** 18]), rng.choice([0, 86_400])))
+        elif name == "dust":
+            ops.append(
+                (
+                    name,
+                    rng.choice([0, 10 ** 15]),
+                    rng.choice([0, 10 ** 18]),
+                    rng.choice([0, 10 ** 17]),
+                )
+            )
+        elif name == "sleep":
+            ops.append((name, rng.randint(1, 7 * 86_400)))
+        else:
+            ops.append((name,))
+    return ops
+
+
+# runs a whole sequence on a fresh model, returning the model and every op's events
+def run_scenario(ops, seed_staking=None, start=10 ** 9):
+    model = Model(seed_staking or LiquityStaking(total_staked=10 ** 24), now=start)
+    now = start
+    events = []
+    for op in ops:
+        now += op[1] if op[0] == "sleep" else 13
+        events.append({} if model.skips(op) else model.step(op, now))
+    return model, events
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = random.Random(0)
+    scenarios = [random_operations(rng, 50) for i in range(1_000)]
+    start = time.perf_counter()
+    for ops in scenarios:
+        run_scenario(ops)
+    elapsed = time.perf_counter() - start
+    print(f"{len(scenarios) / elapsed:,.0f} scenarios of 50 operations per second")
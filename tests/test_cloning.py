@@ -25,6 +25,11 @@ def test_cloning(
     profit_amount,
     destination_strategy,
     use_yswaps,
+    voter,
+    factory,
+    trade_factory,
+    yLQTYVoter,
+    RELATIVE_APPROX,
 ):
 
     # skip this test if we don't clone
@@ -46,16 +51,35 @@ def test_cloning(
     )
     before_pps = vault.pricePerShare()
 
-    # clone our strategy
-    tx = strategy.cloneRouterStrategy(
+    # clone our strategy and voter
+    tx = factory.deploy(
         vault,
         strategist,
-        rewards,
         keeper,
-        destination_vault,
-        strategy_name,
+        trade_factory,
+        10_000e6,
+        50_000e6,
+        gov,
+        0,
+        {"from": gov},
     )
-    new_strategy = contract_name.at(tx.return_value)
+    (new_strategy, new_voter) = tx.return_value
+    new_strategy = contract_name.at(new_strategy)
+    new_voter = yLQTYVoter.at(new_voter)
+    new_strategy.setHealthCheck(strategy.healthCheck(), {"from": gov})
+    new_strategy.setDoHealthCheck(True, {"from": gov})
+    new_strategy.setBaseFeeOracle(strategy.baseFeeOracle(), {"from": gov})
+
+    # our clones should be set up just like a regular deployment, and pointed at each other
+    assert new_strategy.vault() == vault.address
+    assert new_strategy.strategist() == strategist.address
+    assert new_strategy.keeper() == keeper.address
+    assert new_strategy.tradeFactory() == trade_factory.address
+    assert new_strategy.name() == strategy.name()
+    assert new_strategy.keepLQTY() == strategy.keepLQTY()
+    assert new_strategy.liquityVoter() == new_voter.address
+    assert new_voter.isStrategy(new_strategy)
+    assert new_voter.owner() == gov.address
 
     # tenderly doesn't work for "with brownie.reverts"
     if tests_using_tenderly == False:
@@ -66,8 +90,10 @@ def test_cloning(
                 strategist,
                 rewards,
                 keeper,
-                destination_vault,
-                strategy_name,
+                trade_factory,
+                10_000e6,
+                50_000e6,
+                voter,
                 {"from": gov},
             )
 
@@ -78,22 +104,22 @@ def test_cloning(
                 strategist,
                 rewards,
                 keeper,
-                destination_vault,
-                strategy_name,
+                trade_factory,
+                10_000e6,
+                50_000e6,
+                voter,
                 {"from": gov},
             )
 
-            ## shouldn't be able to clone a clone
+        # same for our voters, even once nobody owns them
         with brownie.reverts():
-            new_strategy.cloneRouterStrategy(
-                vault,
-                strategist,
-                rewards,
-                keeper,
-                destination_vault,
-                strategy_name,
-                {"from": gov},
-            )
+            voter.initialize(strategy, gov, {"from": gov})
+        with brownie.reverts():
+            new_voter.initialize(strategy, gov, {"from": gov})
+        for unowned in (voter, new_voter):
+            unowned.renounceOwnership({"from": gov})
+            with brownie.reverts():
+                unowned.initialize(strategy, gov, {"from": gov})
 
     # revoke, get funds back into vault, remove old strat from queue
     vault.revokeStrategy(strategy, {"from": gov})
@@ -173,3 +199,61 @@ def test_cloning(
 
     # make sure our PPS went us as well
     assert vault.pricePerShare() >= before_pps
+
+
+# cloning should be much cheaper than deploying both contracts from scratch
+def test_clone_gas(
+    gov,
+    vault,
+    strategist,
+    keeper,
+    contract_name,
+    yLQTYVoter,
+    factory,
+    trade_factory,
+    is_clonable,
+    gas_snapshot,
+):
+    # skip this test if we don't clone
+    if not is_clonable:
+        return
+
+    new_strategy = gov.deploy(contract_name, vault, trade_factory, 10_000e6, 50_000e6)
+    new_voter = gov.deploy(yLQTYVoter, new_strategy)
+    full_gas = new_strategy.tx.gas_used + new_voter.tx.gas_used
+
+    # regular and deterministic clones
+    clone_gas = {}
+    for salt in [0, "0x" + "01" * 32]:
+        if salt:
+            predicted = factory.predictAddresses(gov, salt)
+        tx = factory.deploy(
+            vault,
+            strategist,
+            keeper,
+            trade_factory,
+            10_000e6,
+            50_000e6,
+            gov,
+            salt,
+            {"from": gov},
+        )
+        if salt:
+            assert tx.return_value == predicted
+        clone_gas["create2" if salt else "create"] = tx.gas_used
+
+    # the same deployer can't reuse a salt, but anyone else can
+    with brownie.reverts():
+        factory.deploy(
+            vault, strategist, keeper, trade_factory, 0, 0, gov, salt, {"from": gov}
+        )
+    assert factory.predictAddresses(strategist, salt) != predicted
+
+    print("\nFull deploy:", full_gas)
+    for kind, gas_used in clone_gas.items():
+        print(
+            f"Clone ({kind}):", gas_used, "{:.1%} of full".format(gas_used / full_gas)
+        )
+        assert gas_used < full_gas / 2
+        gas_snapshot(f"deploy[clone,{kind}]", gas_used)
+    gas_snapshot("deploy[full]", full_gas)
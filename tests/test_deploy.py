@@ -0,0 +1,120 @@
+import json
+from brownie import ZERO_ADDRESS, StrategyLQTYStaker, accounts, config, yLQTYVoter
+from scripts.deploy import deploy
+
+
+# deploy two strategies and voters, one into a new vault, then resume: first to send what needs governance, then after
+# a config change
+def test_deploy(
+    gov,
+    token,
+    vault,
+    whale,
+    amount,
+    trade_factory,
+    keeper,
+    health_check,
+    base_fee_oracle,
+    rewards,
+    guardian,
+    management,
+    pm,
+    tmp_path,
+):
+    Vault = pm(config["dependencies"][0]).Vault
+    deployer = accounts.add()
+    gov.transfer(deployer, 100e18)
+    common = {
+        "trade_factory": trade_factory.address,
+        "keeper": keeper.address,
+        "health_check": health_check.address,
+        "base_fee_oracle": base_fee_oracle.address,
+    }
+    spec = {
+        "vaults": {
+            "existing": {"address": vault.address},
+            "new": {
+                "token": token.address,
+                "governance": gov.address,
+                "rewards": rewards.address,
+                "guardian": guardian.address,
+                "management": management.address,
+                "deposit_limit": "1_000_000e18",
+            },
+        },
+        "strategies": [
+            {"name": "existing", "vault": "existing", "debt_ratio": 0, **common},
+            {
+                "name": "new",
+                "vault": "new",
+                "harvest_profit_min": "1_000e6",
+                "harvest_profit_max": "2_000e6",
+                "keep_lqty": 1_000,
+                "voter_owner": gov.address,
+                "debt_ratio": 10_000,
+                "performance_fee": 0,
+                "calls": {"setTendTriggerParams": ["1_000e18", 0]},
+                **common,
+            },
+        ],
+    }
+    state_path = tmp_path / "deploy.json"
+
+    # without governance, our deployer sends all it can in one go, and saves the rest for later
+    addresses = deploy(spec, deployer, None, state_path, Vault)
+    assert deployer.nonce == 9
+    state = json.loads(state_path.read_text())
+    assert len(state["governance_calls"]) == 13
+    assert sorted(record["nonce"] for record in state["steps"].values()) == list(
+        range(9)
+    )
+    assert all(record["status"] == "confirmed" for record in state["steps"].values())
+
+    new_vault = Vault.at(addresses["vault.new"])
+    new_strategy = StrategyLQTYStaker.at(addresses["strategy.new"])
+    new_voter = yLQTYVoter.at(addresses["strategy.new.voter"])
+    assert new_vault.token() == token.address
+    assert new_vault.governance() == gov.address
+    assert new_strategy.vault() == new_vault.address
+    assert new_strategy.keeper() == keeper.address
+    assert new_strategy.harvestProfitMinInUsdc() == 1_000e6
+    assert new_voter.owner() == gov.address
+    assert new_voter.positions(new_strategy)["active"]
+    assert new_strategy.liquityVoter() == ZERO_ADDRESS
+
+    # resume with governance, nothing from our deployer should be sent again
+    gov_nonce = gov.nonce
+    assert deploy(spec, deployer, gov, state_path, Vault) == addresses
+    assert deployer.nonce == 9
+    assert gov.nonce == gov_nonce + 13
+    assert json.loads(state_path.read_text())["governance_calls"] == []
+
+    existing_strategy = StrategyLQTYStaker.at(addresses["strategy.existing"])
+    for name, strategy, strategy_vault in [
+        ("existing", existing_strategy, vault),
+        ("new", new_strategy, new_vault),
+    ]:
+        assert strategy.healthCheck() == health_check.address
+        assert strategy.doHealthCheck()
+        assert strategy.baseFeeOracle() == base_fee_oracle.address
+        assert strategy.liquityVoter() == addresses[f"strategy.{name}.voter"]
+        assert strategy_vault.strategies(strategy)["activation"] > 0
+    assert vault.strategies(existing_strategy)["debtRatio"] == 0
+    assert new_vault.strategies(new_strategy)["debtRatio"] == 10_000
+    assert new_vault.depositLimit() == 1_000_000e18
+    assert new_strategy.keepLQTY() == 1_000
+    assert new_strategy.tendWantThreshold() == 1_000e18
+
+    # change one setting, and only that call should be sent
+    spec["strategies"][1]["keep_lqty"] = 2_000
+    gov_nonce = gov.nonce
+    deploy(spec, deployer, gov, state_path, Vault)
+    assert deployer.nonce == 9
+    assert gov.nonce == gov_nonce + 1
+    assert new_strategy.keepLQTY() == 2_000
+
+    # and our new vault should work like any other
+    token.approve(new_vault, 2 ** 256 - 1, {"from": whale})
+    new_vault.deposit(amount, {"from": whale})
+    new_strategy.harvest({"from": keeper})
+    assert new_strategy.stakedBalance() == amount
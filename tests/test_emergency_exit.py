@@ -1,5 +1,5 @@
 import pytest
-from brownie import Contract, chain
+from brownie import chain
 from utils import harvest_strategy
 
 # test that emergency exit works properly
@@ -191,6 +191,7 @@ def test_emergency_exit_with_loss(
     destination_strategy,
     use_yswaps,
     old_vault,
+    lqty_staking,
 ):
     ## deposit to the vault after approving
     starting_whale = token.balanceOf(whale)
@@ -207,9 +208,8 @@ def test_emergency_exit_with_loss(
     )
 
     ################# SEND ALL FUNDS AWAY. ADJUST AS NEEDED PER STRATEGY. #################
-    staking = Contract(strategy.lqtyStaking())
-    to_send = staking.stakes(strategy)
-    staking.unstake(to_send, {"from": strategy})
+    to_send = lqty_staking.stakes(strategy)
+    lqty_staking.unstake(to_send, {"from": strategy})
     token.transfer(gov, to_send, {"from": strategy})
 
     # confirm we emptied the strategy
@@ -272,6 +272,7 @@ def test_emergency_exit_with_no_loss(
     destination_strategy,
     use_yswaps,
     RELATIVE_APPROX,
+    lqty_staking,
 ):
     ## deposit to the vault after approving
     starting_whale = token.balanceOf(whale)
@@ -288,9 +289,8 @@ def test_emergency_exit_with_no_loss(
     )
 
     ################# SEND ALL FUNDS AWAY. ADJUST AS NEEDED PER STRATEGY. #################
-    staking = Contract(strategy.lqtyStaking())
-    to_send = staking.stakes(strategy)
-    staking.unstake(to_send, {"from": strategy})
+    to_send = lqty_staking.stakes(strategy)
+    lqty_staking.unstake(to_send, {"from": strategy})
     token.transfer(gov, to_send, {"from": strategy})
 
     # confirm we emptied the strategy
@@ -0,0 +1,357 @@
+import pytest
+from brownie import chain
+from utils import function_gas, storage_reads
+
+# gas benchmarks for our keeper-paid and user-paid paths. each result is checked against gas-snapshot.json, see
+# gas_snapshot in conftest.py. these need debug_traceTransaction to break out internal functions.
+
+
+# deposit and do our first harvest so we have a stake in liquity
+def stake_strategy(token, vault, whale, strategy, gov, amount):
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+    chain.mine(1)
+
+
+# simulate liquity fees accruing to our stakers
+def accrue_fees(lqty_staking, borrower_operations, trove_manager):
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+
+
+# voter off only makes sense with no keep, since we can't set keep without a voter
+@pytest.mark.parametrize(
+    "use_voter,keep", [(False, 0), (True, 0), (True, 500), (True, 1000)]
+)
+@pytest.mark.parametrize("pending", [False, True])
+def test_harvest_gas(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    voter,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+    gas_snapshot,
+    use_voter,
+    keep,
+    pending,
+):
+    stake_strategy(token, vault, whale, strategy, gov, amount)
+    if use_voter:
+        strategy.setVoter(voter, {"from": gov})
+    strategy.setKeepLqty(keep, {"from": gov})
+
+    # our voter needs a stake of its own for the pending rewards scenario to mean anything
+    if use_voter and keep > 0:
+        token.transfer(strategy, amount // 1_000, {"from": whale})
+        strategy.harvest({"from": gov})
+        chain.sleep(1)
+        chain.mine(1)
+
+    if pending:
+        accrue_fees(lqty_staking, borrower_operations, trove_manager)
+        assert lqty_staking.getPendingLUSDGain(strategy) > 0
+
+    # send in some loose LQTY so there is something to keep and to stake
+    token.transfer(strategy, amount // 1_000, {"from": whale})
+    tx = strategy.harvest({"from": gov})
+
+    scenario = f"voter={int(use_voter)},keep={keep},pending={int(pending)}"
+    gas_snapshot(f"harvest[{scenario}]", tx.gas_used)
+    for fn in ["prepareReturn", "adjustPosition"]:
+        gas_used = function_gas(tx, f"StrategyLQTYStaker.{fn}")
+        if gas_used:
+            gas_snapshot(f"{fn}[{scenario}]", gas_used)
+
+    # cold slots are the bulk of our storage cost, so track how many we touch as well as the gas
+    gas_snapshot(f"harvest_slots[{scenario}]", len(storage_reads(tx, strategy)))
+
+    voter_gas = function_gas(tx, "yLQTYVoter.strategyHarvest")
+    if use_voter and keep > 0:
+        assert voter_gas
+        gas_snapshot(f"yLQTYVoter.strategyHarvest[{scenario}]", voter_gas)
+    else:
+        assert voter_gas is None
+
+
+# a harvest where every step only has dust to move, with and without our dust thresholds
+@pytest.mark.parametrize("dust", [False, True])
+def test_dust_harvest_gas(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    voter,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+    gas_snapshot,
+    dust,
+):
+    stake_strategy(token, vault, whale, strategy, gov, amount)
+    strategy.setVoter(voter, {"from": gov})
+    strategy.setKeepLqty(500, {"from": gov})
+    if dust:
+        strategy.setDustThresholds(1e16, 1e18, 1e18, {"from": gov})
+
+    lqty_staking.increaseF_LUSD(1e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(1e15, {"from": trove_manager})
+    whale.transfer(strategy, 1e15)
+    token.transfer(strategy, 1e18, {"from": whale})
+    tx = strategy.harvest({"from": gov})
+
+    if dust:
+        skipped = tx.events["HarvestStepsSkipped"]
+        assert skipped["claim"] and skipped["wrap"] and skipped["voter"]
+    else:
+        assert "HarvestStepsSkipped" not in tx.events
+    gas_snapshot(f"harvest[dust={int(dust)}]", tx.gas_used)
+
+
+# 50 harvests, six hours apart, each with some profit to keep. our threshold is hit about every 10 harvests, and our
+# interval every 8.
+@pytest.mark.parametrize("forwarding", ["every", "threshold", "interval"])
+def test_voter_forwarding_gas(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    voter,
+    lqty_staking,
+    borrower_operations,
+    gas_snapshot,
+    forwarding,
+):
+    stake_strategy(token, vault, whale, strategy, gov, amount)
+    strategy.setVoter(voter, {"from": gov})
+    strategy.setKeepLqty(1000, {"from": gov})
+
+    profit = amount // 10_000
+    keep = profit * 1000 // 10_000
+    if forwarding == "threshold":
+        strategy.setVoterForwarding(keep * 10, 0, {"from": gov})
+    elif forwarding == "interval":
+        strategy.setVoterForwarding(0, 2 * 86400, {"from": gov})
+
+    total_gas = 0
+    forwards = 0
+    for i in range(50):
+        lqty_staking.increaseF_LUSD(1_000e18, {"from": borrower_operations})
+        token.transfer(strategy, profit, {"from": whale})
+        tx = strategy.harvest({"from": gov})
+        total_gas += tx.gas_used
+        if function_gas(tx, "yLQTYVoter.strategyHarvest"):
+            forwards += 1
+        chain.sleep(6 * 3600)
+        chain.mine(1)
+
+    # every bit of LQTY we kept is either with our voter or still owed to it
+    assert voter.positions(strategy)["shares"] + strategy.voterLqtyOwed() == keep * 50
+    assert voter.stakedBalance() == voter.positions(strategy)["shares"]
+    if forwarding == "every":
+        assert forwards == 50
+    else:
+        assert 0 < forwards < 10
+
+    print(
+        f"\n50 harvests forwarding {forwarding}: {forwards} forwards, {total_gas} gas"
+    )
+    gas_snapshot(f"harvest_x50[forwarding={forwarding}]", total_gas)
+
+
+# how updating our rewards scales with the number of rewards tokens we have
+@pytest.mark.parametrize("size", [2, 5, 10, 20])
+def test_update_rewards_gas(gov, strategy, MockERC20, gas_snapshot, size):
+    tokens = [strategy.weth(), strategy.lusd()]
+    for i in range(size - 2):
+        tokens.append(gov.deploy(MockERC20).address)
+    strategy.updateRewards(tokens, {"from": gov})
+    assert strategy.rewardsTokensLength() == size
+
+    extra = gov.deploy(MockERC20).address
+    updates = {
+        "same": tokens,
+        "add": tokens + [extra],
+        "remove": tokens[:-1],
+    }
+    for update, new_tokens in updates.items():
+        tx = strategy.updateRewards(new_tokens, {"from": gov})
+        assert strategy.rewardsTokensLength() == len(new_tokens)
+        gas_snapshot(f"updateRewards[{update},size={size}]", tx.gas_used)
+        # put things back the way they were before our next update
+        strategy.updateRewards(tokens, {"from": gov})
+
+
+@pytest.mark.parametrize("pending", [False, True])
+def test_emergency_exit_harvest_gas(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+    gas_snapshot,
+    pending,
+):
+    stake_strategy(token, vault, whale, strategy, gov, amount)
+    if pending:
+        accrue_fees(lqty_staking, borrower_operations, trove_manager)
+
+    strategy.setEmergencyExit({"from": gov})
+    tx = strategy.harvest({"from": gov})
+    gas_snapshot(f"harvest[emergency_exit,pending={int(pending)}]", tx.gas_used)
+
+
+# partial is 10% of our shares, small is 1%, which fits inside a 5% buffer
+@pytest.mark.parametrize("size", ["full", "partial", "small"])
+@pytest.mark.parametrize("buffer", [0, 500])
+@pytest.mark.parametrize("pending", [False, True])
+def test_withdraw_gas(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+    gas_snapshot,
+    size,
+    buffer,
+    pending,
+):
+    strategy.setLiquidBuffer(buffer, {"from": gov})
+    stake_strategy(token, vault, whale, strategy, gov, amount)
+    if pending:
+        accrue_fees(lqty_staking, borrower_operations, trove_manager)
+
+    shares = vault.balanceOf(whale)
+    staked = strategy.stakedBalance()
+    to_withdraw = {"full": shares, "partial": shares // 10, "small": shares // 100}
+    tx = vault.withdraw(to_withdraw[size], {"from": whale})
+
+    scenario = f"size={size},buffer={buffer},pending={int(pending)}"
+    gas_snapshot(f"withdraw[{scenario}]", tx.gas_used)
+    gas_snapshot(f"withdraw_slots[{scenario}]", len(storage_reads(tx, strategy)))
+    gas_used = function_gas(tx, "StrategyLQTYStaker.liquidatePosition")
+    if gas_used:
+        gas_snapshot(f"liquidatePosition[{scenario}]", gas_used)
+
+    # the whole point of our buffer is to skip unstaking (and claiming) on small withdrawals
+    if buffer > 0 and size == "small":
+        assert strategy.stakedBalance() == staked
+
+
+@pytest.mark.parametrize("pending", [False, True])
+def test_migration_gas(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    contract_name,
+    trade_factory,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+    gas_snapshot,
+    pending,
+):
+    stake_strategy(token, vault, whale, strategy, gov, amount)
+    if pending:
+        accrue_fees(lqty_staking, borrower_operations, trove_manager)
+
+    new_strategy = gov.deploy(contract_name, vault, trade_factory, 10_000e6, 50_000e6)
+    tx = vault.migrateStrategy(strategy, new_strategy, {"from": gov})
+
+    scenario = f"pending={int(pending)}"
+    gas_snapshot(f"migrate[{scenario}]", tx.gas_used)
+    gas_used = function_gas(tx, "StrategyLQTYStaker.prepareMigration")
+    if gas_used:
+        gas_snapshot(f"prepareMigration[{scenario}]", gas_used)
+
+
+# each of the outcomes covered in test_triggers.py, with the expected result. everything else is set so it can't fire.
+TRIGGER_SCENARIOS = {
+    "inactive": False,
+    "none": False,
+    "force": True,
+    "max_delay": True,
+    "credit": True,
+    "min_profit": True,
+    "max_profit": True,
+    "base_fee_blocked": False,
+    "base_fee_max_profit": True,
+}
+
+# these return before pricing our profit. our old ordering priced it first, on every call.
+CHEAP_TRIGGERS = ["force", "max_delay", "credit"]
+
+
+@pytest.mark.parametrize("scenario", TRIGGER_SCENARIOS)
+def test_trigger_gas(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+    base_fee_oracle,
+    gas_snapshot,
+    scenario,
+):
+    if scenario == "inactive":
+        vault.updateStrategyDebtRatio(strategy, 0, {"from": gov})
+    else:
+        stake_strategy(token, vault, whale, strategy, gov, amount)
+        accrue_fees(lqty_staking, borrower_operations, trove_manager)
+
+    strategy.setHarvestTriggerParams(2 ** 128 - 1, 2 ** 128 - 1, {"from": gov})
+    strategy.setCreditThreshold(2 ** 256 - 1, {"from": gov})
+    strategy.setMaxReportDelay(2 ** 64, {"from": gov})
+
+    if scenario == "force":
+        strategy.setForceHarvestTriggerOnce(True, {"from": gov})
+    elif scenario == "max_delay":
+        strategy.setMaxReportDelay(0, {"from": gov})
+    elif scenario == "credit":
+        strategy.setCreditThreshold(0, {"from": gov})
+        vault.deposit(amount // 10, {"from": whale})
+    elif scenario == "min_profit":
+        strategy.setHarvestTriggerParams(1, 2 ** 128 - 1, {"from": gov})
+    elif scenario == "max_profit":
+        strategy.setHarvestTriggerParams(2 ** 128 - 1, 1, {"from": gov})
+    elif scenario.startswith("base_fee"):
+        base_fee_oracle.setManualBaseFeeBool(False, {"from": gov})
+        strategy.setForceHarvestTriggerOnce(True, {"from": gov})
+        if scenario == "base_fee_max_profit":
+            strategy.setHarvestTriggerParams(2 ** 128 - 1, 1, {"from": gov})
+
+    chain.sleep(1)
+    chain.mine(1)
+    assert strategy.harvestTrigger(0) == TRIGGER_SCENARIOS[scenario]
+    gas = strategy.harvestTrigger.estimate_gas(0)
+    gas_snapshot(f"harvestTrigger[{scenario}]", gas)
+
+    # before and after for our ordering: profit first would have paid for pricing (less its own 21k call) on top
+    if scenario in CHEAP_TRIGGERS:
+        pricing = strategy.claimableProfitInUsdc.estimate_gas() - 21_000
+        gas_snapshot(f"harvestTrigger_profit_first[{scenario}]", gas + pricing)
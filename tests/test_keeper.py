@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from brownie import accounts, web3
+from scripts.keeper import GasPolicy, Keeper
+
+
+# run our keeper against two strategies and voters on our dev chain, both with an account our node signs for and with
+# a key our keeper signs with itself
+@pytest.mark.parametrize("signer", ["node", "local"])
+def test_keeper(
+    signer,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    voter,
+    factory,
+    lens,
+    strategist,
+    keeper,
+    trade_factory,
+    contract_name,
+    yLQTYVoter,
+    profit_whale,
+):
+    # clone our strategy and voter, and split our vault between the two strategies
+    tx = factory.deploy(
+        vault,
+        strategist,
+        keeper,
+        trade_factory,
+        10_000e6,
+        50_000e6,
+        gov,
+        0,
+        {"from": gov},
+    )
+    (new_strategy, new_voter) = tx.return_value
+    new_strategy = contract_name.at(new_strategy)
+    new_voter = yLQTYVoter.at(new_voter)
+    new_strategy.setHealthCheck(strategy.healthCheck(), {"from": gov})
+    new_strategy.setDoHealthCheck(True, {"from": gov})
+    new_strategy.setBaseFeeOracle(strategy.baseFeeOracle(), {"from": gov})
+    vault.updateStrategyDebtRatio(strategy, 5_000, {"from": gov})
+    vault.addStrategy(new_strategy, 5_000, 0, 2 ** 256 - 1, 0, {"from": gov})
+
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+
+    if signer == "local":
+        account = accounts.add()
+        gov.transfer(account, 10e18)
+        for s in [strategy, new_strategy]:
+            s.setKeeper(account, {"from": gov})
+    else:
+        account = keeper
+    strategies = [strategy, new_strategy]
+    starting_nonce = account.nonce
+
+    def run(polls):
+        runner = Keeper(
+            web3.provider.endpoint_uri,
+            account,
+            strategies,
+            lens,
+            voters=[voter, new_voter],
+            gas_policy=GasPolicy(max_base_fee=1_000e9),
+            poll_interval=0.1,
+            receipt_interval=0.1,
+            receipt_timeout=60,
+        )
+        return runner, asyncio.run(runner.run(max_polls=polls))
+
+    # nothing is due, so nothing gets sent
+    (runner, summary) = run(2)
+    assert summary["counters"]["polls"] == 2
+    assert "harvest_sent" not in summary["counters"]
+    assert account.nonce == starting_nonce
+
+    # force both harvests, and both should go out from the same poll with their own nonces
+    for s in strategies:
+        s.setForceHarvestTriggerOnce(True, {"from": gov})
+    (runner, summary) = run(1)
+    assert summary["counters"]["harvest_sent"] == 2
+    assert summary["counters"]["harvest_confirmed"] == 2
+    assert "harvest_failed" not in summary["counters"]
+    assert summary["latencies"]["harvest"]["count"] == 2
+    assert summary["throughput_per_minute"] > 0
+    assert account.nonce == starting_nonce + 2
+    for s in strategies:
+        assert s.forceHarvestTriggerOnce() == False
+        assert s.stakedBalance() > 0
+        assert vault.strategies(s)["totalDebt"] > 0
+
+    # idle want in just one strategy should get it a tend, and nothing else
+    new_strategy.setTendTriggerParams(1, 0, {"from": gov})
+    token.transfer(new_strategy, 1e18, {"from": profit_whale})
+    staked = new_strategy.stakedBalance()
+    (runner, summary) = run(1)
+    assert summary["counters"]["tend_confirmed"] == 1
+    assert "harvest_sent" not in summary["counters"]
+    assert account.nonce == starting_nonce + 3
+    # our donation is staked, less anything held back for our voter
+    owed = new_strategy.voterLqtyOwed()
+    assert new_strategy.stakedBalance() + owed == staked + 1e18
+    assert new_strategy.tendTrigger(0) == False
+
+    # our metrics should come out in prometheus' format
+    text = runner.metrics.prometheus()
+    assert "keeper_tend_confirmed_total 1" in text
+    assert f'keeper_staked_balance{{voter="{voter.address}"}}' in text
+    assert 'keeper_poll_seconds{quantile="0.5"}' in text
+
+    # over our base fee limit, we don't send anything
+    policy = GasPolicy(max_base_fee=100e9, priority_fee=1e9)
+    assert policy.fees(101e9) is None
+    assert policy.fees(30e9) == {"maxFeePerGas": 61e9, "maxPriorityFeePerGas": 1e9}
+    assert policy.fees(80e9, legacy=True) == {"gasPrice": 101e9}
+
+
+# a node that accepts every transaction but never mines it, so we can drop, replace or time out our harvest
+class StuckNode:
+    def __init__(self, fate):
+        self.fate = fate
+        self.nonce = 5
+
+    async def call(self, method, params):
+        if method == "eth_estimateGas":
+            return hex(100_000)
+        elif method == "eth_getTransactionCount":
+            return hex(self.nonce + (self.fate == "replaced" and params[1] == "latest"))
+        elif method == "eth_chainId":
+            return hex(1)
+        elif method in ("eth_sendTransaction", "eth_sendRawTransaction"):
+            return "0x" + "11" * 32
+        elif method == "eth_getTransactionByHash":
+            return None if self.fate == "dropped" else {"hash": params[0]}
+        elif method == "eth_getTransactionReceipt":
+            return None
+
+    async def batch(self, calls):
+        return [await self.call(method, params) for method, params in calls]
+
+
+# a harvest that's dropped, replaced or never lands should give up and resync our nonces from the chain
+@pytest.mark.parametrize("fate", ["dropped", "replaced", "timeout"])
+def test_keeper_resyncs_nonces(fate, strategy, lens, keeper):
+    node = StuckNode(fate)
+    runner = Keeper(
+        "", keeper, [strategy], lens, receipt_interval=0.01, receipt_timeout=0.1
+    )
+    runner.rpc = runner.nonces.rpc = node
+    fees = {"maxFeePerGas": 10 ** 9, "maxPriorityFeePerGas": 10 ** 9}
+
+    assert asyncio.run(runner.execute("harvest", strategy, fees)) is None
+    assert runner.metrics.counters["harvest_failed"] == 1
+    node.nonce = 7
+    assert asyncio.run(runner.nonces.reserve()) == 7
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from brownie import chain, history
+from scripts.ledger import SECONDS_PER_YEAR, Indexer, Ledger
+from utils import harvest_strategy
+
+
+# index a few harvests and a voter sweep from our local chain, across more than one sync, and check our columns and
+# queries against our contracts
+def test_ledger(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    voter,
+    amount,
+    sleep_time,
+    profit_whale,
+    profit_amount,
+    destination_strategy,
+    use_yswaps,
+    tmp_path,
+):
+    start_block = chain.height + 1
+    ledger = Ledger(tmp_path)
+    indexer = Indexer(ledger, [strategy], [vault], [voter], chunk_size=5)
+
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.setVoter(voter, {"from": gov})
+    for i in range(2):
+        harvest_strategy(
+            use_yswaps,
+            strategy,
+            token,
+            gov,
+            profit_whale,
+            profit_amount,
+            destination_strategy,
+        )
+        chain.sleep(sleep_time)
+    assert indexer.sync(start_block=start_block) == 4
+    assert ledger.next_block == chain.height + 1
+
+    # a fresh ledger picks up from our checkpoint, and only reads new blocks
+    for i in range(2):
+        harvest_strategy(
+            use_yswaps,
+            strategy,
+            token,
+            gov,
+            profit_whale,
+            profit_amount,
+            destination_strategy,
+        )
+        chain.sleep(sleep_time)
+    voter.queueSweep({"from": gov})
+    chain.sleep(86400 * 15)
+    chain.mine(1)
+    voter.unstakeAndSweep(2 ** 256 - 1, {"from": gov})
+
+    # a save that never finished is ignored
+    (tmp_path / "save.tmp.npz").write_bytes(b"")
+    ledger = Ledger(tmp_path)
+    assert len(ledger) == 4
+    indexer = Indexer(ledger, [strategy], [vault], [voter])
+    assert indexer.sync() == 5
+    assert indexer.sync() == 0
+    assert len(ledger) == 9
+
+    # every harvest, with its gas
+    harvests = [
+        tx for tx in history.filter(fn_name="harvest") if tx.block_number >= start_block
+    ]
+    profits = ledger.profit_per_harvest(strategy)
+    np.testing.assert_array_equal(
+        profits["block"], [tx.block_number for tx in harvests]
+    )
+    np.testing.assert_array_equal(
+        profits["profit"], [tx.events["Harvested"]["profit"] for tx in harvests]
+    )
+    assert profits["profit"].sum() == vault.strategies(strategy)["totalGain"]
+    gas = ledger.gas_per_harvest(strategy)
+    np.testing.assert_array_equal(gas["gasUsed"], [tx.gas_used for tx in harvests])
+    assert (gas["gasCost"] >= 0).all()
+
+    # share price after each report, and the APR it implies
+    prices = ledger.share_price_history(vault)
+    np.testing.assert_array_equal(
+        prices["pricePerShare"],
+        [vault.pricePerShare(block_identifier=int(block)) for block in prices["block"]],
+    )
+    apr = ledger.realized_apr(vault)
+    assert len(apr["apr"]) == 3
+    (times, pps) = (prices["timestamp"], prices["pricePerShare"])
+    assert apr["total"] == pytest.approx(
+        (pps[-1] / pps[0] - 1) * SECONDS_PER_YEAR / (times[-1] - times[0])
+    )
+    if use_yswaps:
+        assert apr["total"] > 0
+        assert (ledger.strategy_apr(strategy)["apr"] > 0).all()
+
+    # and our sweep, to the wei
+    sweeps = ledger.select("LqtySwept", voter)
+    assert sweeps["amount"].tolist() == [2 ** 256 - 1]
+
+    # no rows for contracts we haven't seen
+    assert len(ledger.profit_per_harvest(gov)["profit"]) == 0
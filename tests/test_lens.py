@@ -0,0 +1,244 @@
+import pytest
+from brownie import chain
+from utils import harvest_strategy, strategy_constants
+
+# our lens should give a keeper the same answers as asking each strategy and voter one at a time
+def test_lens(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    profit_whale,
+    profit_amount,
+    destination_strategy,
+    use_yswaps,
+    voter,
+    lens,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+
+    # turn on our voter, and harvest twice so both it and our strategy are staked
+    strategy.setVoter(voter, {"from": gov})
+    for i in range(2):
+        (profit, loss) = harvest_strategy(
+            use_yswaps,
+            strategy,
+            token,
+            gov,
+            profit_whale,
+            profit_amount,
+            destination_strategy,
+        )
+    assert voter.stakedBalance() > 0
+
+    # simulate liquity fees for our stakers
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    chain.sleep(sleep_time)
+    chain.mine(1)
+
+    # check both with and without a profit large enough to trigger
+    for max_profit in [2 ** 128 - 1, 0]:
+        strategy.setHarvestTriggerParams(max_profit, max_profit, {"from": gov})
+        (lusd_price, ether_price, strategy_info, voter_info) = lens.getInfo(
+            [strategy, strategy], [voter], 0
+        )
+        assert lusd_price > 0 and ether_price > 0
+        assert len(strategy_info) == 2 and len(voter_info) == 1
+        assert strategy_info[0] == strategy_info[1]
+
+        info = strategy_info[0]
+        assert info["strategy"] == strategy.address
+        assert info["harvestTrigger"] == strategy.harvestTrigger(0)
+        if max_profit == 0:
+            assert info["harvestTrigger"]
+        assert info["claimableProfitInUsdc"] == strategy.claimableProfitInUsdc()
+        assert info["claimableProfitInUsdc"] > 0
+        assert info["pendingETH"] == lqty_staking.getPendingETHGain(strategy)
+        assert info["pendingLUSD"] == lqty_staking.getPendingLUSDGain(strategy)
+        assert info["stakedBalance"] == strategy.stakedBalance()
+        assert info["lastReport"] == vault.strategies(strategy)["lastReport"]
+        assert info["creditAvailable"] == vault.creditAvailable(strategy)
+
+        info = voter_info[0]
+        assert info["voter"] == voter.address
+        assert info["claimableProfitInUsdc"] == voter.claimableProfitInUsdc()
+        assert info["pendingETH"] == lqty_staking.getPendingETHGain(voter)
+        assert info["pendingLUSD"] == lqty_staking.getPendingLUSDGain(voter)
+        assert info["stakedBalance"] == voter.stakedBalance()
+
+    # an inactive strategy never triggers, no matter our profit
+    vault.updateStrategyDebtRatio(strategy, 0, {"from": gov})
+    harvest_strategy(
+        use_yswaps,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        destination_strategy,
+    )
+    (_, _, strategy_info, _) = lens.getInfo([strategy], [], 0)
+    assert strategy_info[0]["harvestTrigger"] == strategy.harvestTrigger(0) == False
+
+    # empty arrays are fine too
+    (_, _, strategy_info, voter_info) = lens.getInfo([], [], 0)
+    assert len(strategy_info) == 0 and len(voter_info) == 0
+
+
+# a strategy with its price cache on should be priced with its cached prices, so our lens never disagrees with its own
+# harvestTrigger. the prices our lens returns are always the oracle's.
+def test_lens_price_cache(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    lens,
+    lens_oracle,
+    stand_ins,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": gov})
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    strategy.setPriceCacheMaxAge(3600, {"from": gov})
+    (lusd_price, ether_price) = strategy.prices()
+
+    # on a local chain we can move our oracle, our strategy keeps using its cache until it goes stale
+    if stand_ins:
+        lens_oracle.setPrice(strategy.lusd(), lusd_price * 2, {"from": gov})
+        lens_oracle.setPrice(strategy.weth(), ether_price * 2, {"from": gov})
+
+    # with our min profit at our cached profit, only oracle prices could trigger
+    profit = strategy.claimableProfitInUsdc()
+    assert profit > 0
+    strategy.setHarvestTriggerParams(profit, 2 ** 128 - 1, {"from": gov})
+    (oracle_lusd, oracle_ether, strategy_info, _) = lens.getInfo([strategy], [], 0)
+    info = strategy_info[0]
+    assert info["claimableProfitInUsdc"] == profit
+    assert info["harvestTrigger"] == strategy.harvestTrigger(0) == False
+    if stand_ins:
+        assert (oracle_lusd, oracle_ether) == (lusd_price * 2, ether_price * 2)
+
+    # once our cache is stale, our strategy and our lens are both back on the oracle
+    chain.sleep(3601)
+    chain.mine(1)
+    (_, _, strategy_info, _) = lens.getInfo([strategy], [], 0)
+    info = strategy_info[0]
+    assert info["claimableProfitInUsdc"] == strategy.claimableProfitInUsdc()
+    assert info["harvestTrigger"] == strategy.harvestTrigger(0)
+    if stand_ins:
+        assert info["claimableProfitInUsdc"] > profit
+        assert info["harvestTrigger"]
+
+
+# each snapshot should match asking for every field one at a time
+def test_snapshot(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    profit_whale,
+    profit_amount,
+    destination_strategy,
+    use_yswaps,
+    voter,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+
+    # turn on our voter, and harvest twice so both it and our strategy are staked
+    strategy.setVoter(voter, {"from": gov})
+    for i in range(2):
+        harvest_strategy(
+            use_yswaps,
+            strategy,
+            token,
+            gov,
+            profit_whale,
+            profit_amount,
+            destination_strategy,
+        )
+    assert voter.stakedBalance() > 0
+
+    # simulate liquity fees for our stakers
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    chain.sleep(sleep_time)
+    chain.mine(1)
+
+    snap = strategy.snapshot()
+    assert snap["balanceOfWant"] == strategy.balanceOfWant()
+    assert snap["stakedBalance"] == strategy.stakedBalance() > 0
+    assert snap["estimatedTotalAssets"] == strategy.estimatedTotalAssets()
+    assert snap["pendingETH"] == lqty_staking.getPendingETHGain(strategy) > 0
+    assert snap["pendingLUSD"] == lqty_staking.getPendingLUSDGain(strategy) > 0
+    assert snap["claimableProfitInUsdc"] == strategy.claimableProfitInUsdc()
+    assert snap["voterLqtyOwed"] == strategy.voterLqtyOwed()
+    assert snap["creditAvailable"] == vault.creditAvailable(strategy)
+    assert snap["debtOutstanding"] == vault.debtOutstanding(strategy)
+    assert snap["params"] == vault.strategies(strategy)
+    assert snap["liquityVoter"] == strategy.liquityVoter() == voter.address
+    assert snap["tradeFactory"] == strategy.tradeFactory()
+    assert snap["emergencyExit"] == strategy.emergencyExit()
+    for field in [
+        "keepLQTY",
+        "liquidBufferBps",
+        "harvestProfitMinInUsdc",
+        "harvestProfitMaxInUsdc",
+        "profitToCostMultiple",
+        "maxReportDelay",
+        "creditThreshold",
+        "tendWantThreshold",
+        "tendProfitThresholdInUsdc",
+        "voterForwardThreshold",
+        "voterForwardInterval",
+        "lastVoterForward",
+        "priceCacheMaxAge",
+        "pricesUpdatedAt",
+        "ethDust",
+        "lusdDust",
+        "lqtyDust",
+    ]:
+        assert snap[field] == getattr(strategy, field)()
+
+    snap = voter.snapshot()
+    (lusd, weth) = strategy_constants(strategy)
+    assert snap["owner"] == voter.owner()
+    assert snap["stakedBalance"] == voter.stakedBalance() > 0
+    assert snap["pendingETH"] == lqty_staking.getPendingETHGain(voter) > 0
+    assert snap["pendingLUSD"] == lqty_staking.getPendingLUSDGain(voter) > 0
+    assert snap["lqtyBalance"] == token.balanceOf(voter)
+    assert snap["lusdBalance"] == lusd.balanceOf(voter)
+    assert snap["wethBalance"] == weth.balanceOf(voter)
+    for field in [
+        "unstakeQueued",
+        "totalShares",
+        "lusdPerShare",
+        "wethPerShare",
+        "lusdReserved",
+        "wethReserved",
+    ]:
+        assert snap[field] == getattr(voter, field)()
@@ -1,5 +1,5 @@
 import brownie
-from brownie import Contract, accounts, chain, interface
+from brownie import ZERO_ADDRESS, Contract, accounts, chain, interface
 import pytest
 from utils import harvest_strategy
 
@@ -21,6 +21,9 @@ def test_simple_harvest_keep(
     destination_strategy,
     use_yswaps,
     voter,
+    lqty_staking,
+    lusd_borrower,
+    borrower_operations,
 ):
     ## deposit to the vault after approving
     starting_whale = token.balanceOf(whale)
@@ -53,8 +56,12 @@ def test_simple_harvest_keep(
     name = voter.name()
     print("Name:", name)
 
-    # re-set strategy
-    voter.setStrategy(strategy, {"from": gov})
+    # our strategy is already registered, and only gov can register strategies
+    assert voter.isStrategy(strategy)
+    with brownie.reverts("already added"):
+        voter.addStrategy(strategy, {"from": gov})
+    with brownie.reverts():
+        voter.addStrategy(whale, {"from": whale})
 
     # harvest, store new asset amount
     (profit, loss) = harvest_strategy(
@@ -83,22 +90,15 @@ def test_simple_harvest_keep(
 
     ################# GENERATE CLAIMABLE PROFIT HERE AS NEEDED #################
     # we simulate minting LUSD fees from liquity's borrower operations to the staking contract
-    lusd_borrower = accounts.at(
-        "0xaC5406AEBe35A27691D62bFb80eeFcD7c0093164", force=True
-    )
-    borrower_operations = accounts.at(
-        "0x24179CD81c9e782A4096035f7eC97fB8B783e007", force=True
-    )
-    staking = Contract("0x4f9Fbb3f1E99B56e0Fe2892e623Ed36A76Fc605d")
-    before = staking.getPendingLUSDGain(lusd_borrower)
-    staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
-    after = staking.getPendingLUSDGain(lusd_borrower)
+    before = lqty_staking.getPendingLUSDGain(lusd_borrower)
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    after = lqty_staking.getPendingLUSDGain(lusd_borrower)
     assert after > before
 
     # check that we have claimable profit on our voter
     claimable_profit = voter.claimableProfitInUsdc()
     assert claimable_profit > 0
-    claimable_lusd = staking.getPendingLUSDGain(voter)
+    claimable_lusd = lqty_staking.getPendingLUSDGain(voter)
     print("Claimable LUSD:", claimable_lusd / 1e18)
     print("Claimable Profit in USDC:", claimable_profit / 1e6)
 
@@ -297,3 +297,273 @@ def test_sweeps_and_harvest(
     chain.sleep(14 * 86400)
     with brownie.reverts():
         voter.unstakeAndSweep(2 ** 256 - 1, {"from": gov})
+
+
+# test splitting our voter's rewards between several strategies
+def test_multiple_strategies(
+    gov,
+    whale,
+    voter,
+    strategy,
+    profit_whale,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+):
+    lqty = interface.IERC20(strategy.lqty())
+    lusd = interface.IERC20(strategy.lusd())
+    weth = interface.IERC20(strategy.weth())
+
+    # we use plain accounts as our strategies, the voter doesn't care
+    strategy_a = accounts[8]
+    strategy_b = accounts[9]
+    voter.addStrategy(strategy_a, {"from": gov})
+    voter.addStrategy(strategy_b, {"from": gov})
+
+    # strategy is deprecated, but still points at the strategy we were set up with
+    assert voter.strategy() == strategy
+
+    # only registered strategies can harvest
+    with brownie.reverts():
+        voter.strategyHarvest({"from": whale})
+
+    # b contributes three times as much as a
+    lqty.transfer(voter, 100e18, {"from": profit_whale})
+    voter.strategyHarvest({"from": strategy_a})
+    lqty.transfer(voter, 300e18, {"from": profit_whale})
+    voter.strategyHarvest({"from": strategy_b})
+    assert voter.positions(strategy_a)["shares"] == 100e18
+    assert voter.positions(strategy_b)["shares"] == 300e18
+    assert voter.totalShares() == voter.stakedBalance() == 400e18
+
+    # generate some rewards
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    (pending_lusd_a, pending_weth_a) = voter.pendingRewards(strategy_a)
+    (pending_lusd_b, pending_weth_b) = voter.pendingRewards(strategy_b)
+    assert pending_lusd_a > 0 and pending_weth_a > 0
+    assert pytest.approx(pending_lusd_b, rel=1e-6) == pending_lusd_a * 3
+
+    # each strategy only pulls its own share
+    voter.strategyHarvest({"from": strategy_a})
+    assert pytest.approx(lusd.balanceOf(strategy_a), rel=1e-6) == pending_lusd_a
+    assert pytest.approx(weth.balanceOf(strategy_a), rel=1e-6) == pending_weth_a
+    voter.strategyHarvest({"from": strategy_b})
+    assert pytest.approx(lusd.balanceOf(strategy_b), rel=1e-6) == pending_lusd_b
+    assert pytest.approx(weth.balanceOf(strategy_b), rel=1e-6) == pending_weth_b
+    assert voter.lusdReserved() < 10 and voter.wethReserved() < 10
+
+    # our strategy from our fixtures has nothing staked, so it gets nothing
+    voter.strategyHarvest({"from": strategy})
+    assert lusd.balanceOf(strategy) == 0
+
+    # harvest gas shouldn't grow with how many strategies we have
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    few = voter.strategyHarvest({"from": strategy_a}).gas_used
+    for i in range(20):
+        extra = accounts.add()
+        whale.transfer(extra, 1e17)
+        voter.addStrategy(extra, {"from": gov})
+        lqty.transfer(voter, 1e18, {"from": profit_whale})
+        voter.strategyHarvest({"from": extra})
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    many = voter.strategyHarvest({"from": strategy_a}).gas_used
+    print("\nHarvest gas with 3 strategies:", few, "with 23:", many)
+    assert many < few * 1.1
+
+    # removing a strategy pays it out, sends back its stake, and leaves everyone else's share alone
+    lusd_before = lusd.balanceOf(strategy_b)
+    lqty_before = lqty.balanceOf(strategy_b)
+    voter.removeStrategy(strategy_b, {"from": gov})
+    assert lusd.balanceOf(strategy_b) > lusd_before
+    assert lqty.balanceOf(strategy_b) == lqty_before + 300e18
+    assert not voter.isStrategy(strategy_b)
+    assert voter.totalShares() == voter.stakedBalance() == 120e18
+    with brownie.reverts():
+        voter.strategyHarvest({"from": strategy_b})
+    with brownie.reverts("!strategy"):
+        voter.removeStrategy(strategy_b, {"from": gov})
+
+    # removing our first strategy clears strategy, and one with nothing staked gets nothing back
+    lqty_before = lqty.balanceOf(strategy)
+    voter.removeStrategy(strategy, {"from": gov})
+    assert voter.strategy() == ZERO_ADDRESS
+    assert lqty.balanceOf(strategy) == lqty_before
+
+
+# our harvest events should tell us what moved, without tracing or reading historical state
+def test_harvest_events(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    voter,
+    profit_whale,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.setVoter(voter, {"from": gov})
+
+    # nothing staked or loose yet, so nothing to claim or keep
+    tx = strategy.harvest({"from": gov})
+    claimed = tx.events["RewardsClaimed"]
+    assert claimed["ethClaimed"] == claimed["lusdClaimed"] == claimed["ethWrapped"] == 0
+    assert claimed["lqtyToVoter"] == 0
+
+    # donate some LQTY, the voter's cut of it is our keep
+    token.transfer(strategy, 100e18, {"from": profit_whale})
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    pending_eth = lqty_staking.getPendingETHGain(strategy)
+    pending_lusd = lqty_staking.getPendingLUSDGain(strategy)
+    assert pending_eth > 0 and pending_lusd > 0
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    claimed = tx.events["RewardsClaimed"]
+    assert claimed["ethClaimed"] == claimed["ethWrapped"] == pending_eth
+    assert claimed["lusdClaimed"] == pending_lusd
+    assert claimed["lqtyToVoter"] == 100e18 * strategy.keepLQTY() // 10_000
+    assert claimed["lqtyToVoter"] == voter.positions(strategy)["shares"]
+
+    # the voter staked what it was sent, and had nothing to distribute yet
+    harvested = tx.events["StrategyHarvested"]
+    assert harvested["strategy"] == strategy.address
+    assert harvested["lqtyStaked"] == claimed["lqtyToVoter"]
+    assert harvested["lusdDistributed"] == harvested["wethDistributed"] == 0
+    assert harvested["lusdPaid"] == harvested["wethPaid"] == 0
+
+    # now our voter has rewards of its own to pass along
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    (pending_lusd, pending_weth) = voter.pendingRewards(strategy)
+    assert pending_lusd > 0 and pending_weth > 0
+    tx = voter.strategyHarvest({"from": strategy})
+    harvested = tx.events["StrategyHarvested"]
+    assert harvested["lqtyStaked"] == 0
+    assert pytest.approx(harvested["lusdDistributed"], rel=1e-6) == pending_lusd
+    assert pytest.approx(harvested["wethDistributed"], rel=1e-6) == pending_weth
+    assert pytest.approx(harvested["lusdPaid"], rel=1e-6) == pending_lusd
+    assert pytest.approx(harvested["wethPaid"], rel=1e-6) == pending_weth
+
+    # tends log their claims too
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    pending_lusd = lqty_staking.getPendingLUSDGain(strategy)
+    tx = strategy.tend({"from": gov})
+    claimed = tx.events["RewardsClaimed"]
+    assert claimed["lusdClaimed"] == pending_lusd > 0
+    assert claimed["lqtyToVoter"] == 0
+
+
+# our keep only comes out of profit, never out of the LQTY we hold back for our liquid buffer
+def test_keep_with_liquid_buffer(
+    gov, token, vault, whale, strategy, amount, voter, profit_whale,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.setVoter(voter, {"from": gov})
+    strategy.setKeepLqty(1_000, {"from": gov})
+    strategy.setLiquidBuffer(500, {"from": gov})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    buffer = strategy.balanceOfWant()
+    assert buffer > 0
+
+    # no profit, so nothing kept and nothing lost, however often we harvest
+    for i in range(2):
+        chain.sleep(1)
+        tx = strategy.harvest({"from": gov})
+        assert tx.events["RewardsClaimed"]["lqtyToVoter"] == 0
+        assert tx.events["Harvested"]["loss"] == 0
+        assert strategy.balanceOfWant() == buffer
+    assert voter.positions(strategy)["shares"] == 0
+
+    # with some profit, only the profit is kept
+    chain.sleep(1)
+    token.transfer(strategy, 100e18, {"from": profit_whale})
+    tx = strategy.harvest({"from": gov})
+    keep = 100e18 * 1_000 // 10_000
+    assert tx.events["RewardsClaimed"]["lqtyToVoter"] == keep
+    assert tx.events["Harvested"]["profit"] == 100e18 - keep
+    assert tx.events["Harvested"]["loss"] == 0
+    assert vault.strategies(strategy)["totalLoss"] == 0
+
+
+# tends set our keep aside before staking new profit, and our next harvest sends it without keeping twice
+def test_tend_keep(
+    gov, token, vault, whale, strategy, amount, voter, profit_whale,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.setVoter(voter, {"from": gov})
+    strategy.setKeepLqty(1_000, {"from": gov})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    # our tend keeps from our donation, and stakes the rest
+    staked = strategy.stakedBalance()
+    token.transfer(strategy, 100e18, {"from": profit_whale})
+    tx = strategy.tend({"from": gov})
+    keep = 100e18 * 1_000 // 10_000
+    assert tx.events["RewardsClaimed"]["lqtyToVoter"] == 0
+    assert strategy.voterLqtyOwed() == keep
+    assert strategy.keptProfit() == 100e18 - keep
+    assert strategy.balanceOfWant() == 0
+    assert strategy.stakedBalance() == staked + 100e18 - keep
+
+    # a second tend with no new profit keeps nothing more
+    strategy.tend({"from": gov})
+    assert strategy.voterLqtyOwed() == keep
+
+    # our harvest sends what our tend kept, plus its cut of any newer profit
+    chain.sleep(1)
+    token.transfer(strategy, 50e18, {"from": profit_whale})
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["RewardsClaimed"]["lqtyToVoter"] == keep + 50e18 * 1_000 // 10_000
+    assert tx.events["Harvested"]["profit"] == 150e18 - 150e18 * 1_000 // 10_000
+    assert tx.events["Harvested"]["loss"] == 0
+    assert strategy.voterLqtyOwed() == strategy.keptProfit() == 0
+    assert voter.positions(strategy)["shares"] == 15e18
+
+
+# changing our voter sends our current voter whatever we still owe it first
+def test_set_voter_settles_owed(
+    gov, token, vault, whale, strategy, amount, voter, profit_whale,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.setVoter(voter, {"from": gov})
+    strategy.setKeepLqty(1_000, {"from": gov})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    # a tend leaves us owing our voter its keep
+    token.transfer(strategy, 100e18, {"from": profit_whale})
+    strategy.tend({"from": gov})
+    keep = 100e18 * 1_000 // 10_000
+    assert strategy.voterLqtyOwed() == keep
+    assets = strategy.estimatedTotalAssets()
+
+    # only governance can change our voter
+    with brownie.reverts():
+        strategy.setVoter(ZERO_ADDRESS, {"from": whale})
+
+    # our old voter gets and stakes its keep, and none of our own LQTY moves
+    strategy.setVoter(ZERO_ADDRESS, {"from": gov})
+    assert strategy.liquityVoter() == ZERO_ADDRESS
+    assert strategy.voterLqtyOwed() == 0
+    assert voter.positions(strategy)["shares"] == keep
+    assert voter.stakedBalance() == keep
+    assert strategy.estimatedTotalAssets() == assets
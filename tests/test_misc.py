@@ -1,7 +1,14 @@
 import pytest
-from utils import harvest_strategy
+from utils import (
+    balance_slot,
+    deal,
+    harvest_strategy,
+    mapping_slot,
+    set_balance,
+    strategy_constants,
+)
 import brownie
-from brownie import ZERO_ADDRESS, chain, interface
+from brownie import ZERO_ADDRESS, accounts, chain, interface, web3
 
 # test removing a strategy from the withdrawal queue
 def test_remove_from_withdrawal_queue(
@@ -237,3 +244,28 @@ def test_sweep(
     # Vault share token doesn't work
     with brownie.reverts("!shares"):
         strategy.sweep(vault.address, {"from": gov})
+
+
+# our deal helper should find each of our tokens' balances, and only ever touch the one we ask for
+def test_deal(token, strategy, gov):
+    (lusd, weth) = strategy_constants(strategy)
+    account = accounts.add()
+    set_balance(account, 1e18)
+    for erc20 in [token, lusd, weth]:
+        supply = erc20.totalSupply()
+        gov_balance = erc20.balanceOf(gov)
+        deal(erc20, account, 123_456e18)
+        assert erc20.balanceOf(account) == 123_456e18
+        deal(erc20, account, 1)
+        assert erc20.balanceOf(account) == 1
+
+        # finding the slot shouldn't leave anything behind
+        (slot, vyper) = balance_slot(erc20)
+        probe = mapping_slot("0x" + "de" * 20, slot, vyper)
+        assert int(web3.eth.get_storage_at(erc20.address, probe).hex(), 16) == 0
+        assert erc20.totalSupply() == supply
+        assert erc20.balanceOf(gov) == gov_balance
+
+        # and what we deal can be spent like any other balance
+        erc20.transfer(gov, 1, {"from": account})
+        assert erc20.balanceOf(gov) == gov_balance + 1
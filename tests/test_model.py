@@ -0,0 +1,295 @@
+import random
+import pytest
+from brownie import chain, interface
+from model import MAX_BPS, LiquityStaking, Model, random_operations, run_scenario
+from utils import ETH_BALANCE, batch_call
+
+
+# the model on its own should never lose track of any LQTY, and should cover all of prepareReturn's branches.
+# no chain involved, so we can afford thousands of scenarios.
+def test_model_invariants():
+    rng = random.Random(0)
+    seen = set()
+    for i in range(2_000):
+        ops = random_operations(rng, 40)
+        model, events = run_scenario(ops)
+        strategy, vault, voter = model.strategy, model.vault, model.voter
+
+        # every wei of LQTY that came in is either still with us or was sent back out
+        held = (
+            vault.total_idle
+            + strategy.lqty
+            + strategy.staked_balance()
+            + voter.lqty
+            + voter.staked_balance()
+        )
+        assert held == model.net_inflow
+        assert vault.total_debt == vault.strategies[strategy]["totalDebt"]
+        assert vault.total_supply == model.shares
+
+        # our voter only ever holds staked LQTY, and it's all from our one strategy
+        assert voter.lqty == 0
+        assert voter.total_shares == voter.staked_balance()
+        assert voter.lusd >= voter.lusd_reserved and voter.weth >= voter.weth_reserved
+
+        for op_events in events:
+            if "Harvested" in op_events:
+                harvested = op_events["Harvested"]
+                assert harvested["profit"] == 0 or harvested["loss"] == 0
+                seen.add("profit" if harvested["profit"] > 0 else "no profit")
+                seen.add("loss" if harvested["loss"] > 0 else "no loss")
+                if harvested["debtPayment"] > 0:
+                    seen.add("debt payment")
+            if "HarvestStepsSkipped" in op_events:
+                seen.add("skipped")
+            if op_events.get("RewardsClaimed", {}).get("lqtyToVoter", 0) > 0:
+                seen.add("forwarded")
+
+    # our random operations should be good enough to reach every interesting case
+    assert seen == {
+        "profit",
+        "no profit",
+        "loss",
+        "no loss",
+        "debt payment",
+        "skipped",
+        "forwarded",
+    }
+
+
+# only our buffer and keep change around our harvests and tends, and nothing is ever lost, so neither should our
+# vault record a loss
+KEEP_AND_BUFFER = [
+    ("deposit", 1_000 * 10 ** 18),
+    ("buffer", 2_000),
+    ("harvest",),
+    ("sleep", 86_400),
+    ("harvest",),
+    ("keep", 1_000),
+    ("harvest",),
+    ("donate", 10 ** 18),
+    ("tend",),
+    ("buffer", 100),
+    ("harvest",),
+    ("keep", 0),
+    ("donate", 10 ** 18),
+    ("tend",),
+    ("keep", 500),
+    ("buffer", 2_000),
+    ("harvest",),
+    ("fees", 1_000 * 10 ** 18, 10 ** 17),
+    ("tend",),
+    ("buffer", 0),
+    ("harvest",),
+    ("withdraw", 5_000),
+    ("harvest",),
+]
+
+
+def test_keep_and_buffer_never_lose():
+    model, events = run_scenario(KEEP_AND_BUFFER)
+    assert model.vault.strategies[model.strategy]["totalLoss"] == 0
+    assert model.strategy.voter_lqty_owed == model.strategy.kept_profit == 0
+
+    # and neither should any random scenario that doesn't lose LQTY itself
+    rng = random.Random(1)
+    for i in range(500):
+        ops = [op for op in random_operations(rng, 40) if op[0] != "lose"]
+        model, events = run_scenario(ops)
+        assert model.vault.strategies[model.strategy]["totalLoss"] == 0, ops
+
+
+# apply one of our random operations to our contracts, returns the transaction that matters (if any)
+def apply_on_chain(
+    op,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    profit_whale,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+):
+    name, *args = op
+    if name == "deposit":
+        return vault.deposit(args[0], {"from": whale})
+    elif name == "withdraw":
+        shares = vault.balanceOf(whale) * args[0] // MAX_BPS
+        if shares > 0:
+            return vault.withdraw(shares, whale, MAX_BPS, {"from": whale})
+    elif name == "donate":
+        return token.transfer(strategy, args[0], {"from": profit_whale})
+    elif name == "lose":
+        amount = strategy.balanceOfWant() * args[0] // MAX_BPS
+        if amount > 0:
+            return token.transfer(gov, amount, {"from": strategy})
+    elif name == "fees":
+        lqty_staking.increaseF_LUSD(args[0], {"from": borrower_operations})
+        return lqty_staking.increaseF_ETH(args[1], {"from": trove_manager})
+    elif name == "harvest":
+        strategy.setDoHealthCheck(False, {"from": gov})
+        return strategy.harvest({"from": gov})
+    elif name == "tend":
+        return strategy.tend({"from": gov})
+    elif name == "debt_ratio":
+        return vault.updateStrategyDebtRatio(strategy, args[0], {"from": gov})
+    elif name == "keep":
+        return strategy.setKeepLqty(args[0], {"from": gov})
+    elif name == "buffer":
+        return strategy.setLiquidBuffer(args[0], {"from": gov})
+    elif name == "forwarding":
+        return strategy.setVoterForwarding(*args, {"from": gov})
+    elif name == "dust":
+        return strategy.setDustThresholds(*args, {"from": gov})
+    elif name == "sleep":
+        chain.sleep(args[0])
+        chain.mine(1)
+
+
+# read the same fields as Model.snapshot from our contracts
+def chain_snapshot(vault, strategy, voter):
+    (lusd, weth) = batch_call((strategy, "lusd"), (strategy, "weth"))
+    (strategy_snap, voter_snap, position, *balances) = batch_call(
+        (strategy, "snapshot"),
+        (voter, "snapshot"),
+        (voter, "positions", strategy),
+        (interface.IERC20(lusd), "balanceOf", strategy),
+        (interface.IERC20(weth), "balanceOf", strategy),
+        (strategy, ETH_BALANCE),
+    )
+    (total_idle, total_debt, total_supply, debt_ratio, locked_profit) = batch_call(
+        (vault, "totalIdle"),
+        (vault, "totalDebt"),
+        (vault, "totalSupply"),
+        (vault, "debtRatio"),
+        (vault, "lockedProfit"),
+    )
+    return {
+        "strategy": {
+            **{
+                key: strategy_snap[key]
+                for key in (
+                    "balanceOfWant",
+                    "stakedBalance",
+                    "estimatedTotalAssets",
+                    "pendingETH",
+                    "pendingLUSD",
+                    "voterLqtyOwed",
+                    "creditAvailable",
+                    "debtOutstanding",
+                )
+            },
+            "lastVoterForward": strategy.lastVoterForward(),
+            "keptProfit": strategy.keptProfit(),
+            "lusdBalance": balances[0],
+            "wethBalance": balances[1],
+            "ethBalance": balances[2],
+        },
+        "params": {
+            key: strategy_snap["params"][key]
+            for key in (
+                "debtRatio",
+                "lastReport",
+                "totalDebt",
+                "totalGain",
+                "totalLoss",
+            )
+        },
+        "vault": {
+            "totalIdle": total_idle,
+            "totalDebt": total_debt,
+            "totalSupply": total_supply,
+            "debtRatio": debt_ratio,
+            "lockedProfit": locked_profit,
+        },
+        "voter": {
+            **{
+                key: voter_snap[key]
+                for key in (
+                    "stakedBalance",
+                    "pendingETH",
+                    "pendingLUSD",
+                    "lusdBalance",
+                    "wethBalance",
+                    "totalShares",
+                    "lusdPerShare",
+                    "wethPerShare",
+                    "lusdReserved",
+                    "wethReserved",
+                )
+            },
+            "shares": position["shares"],
+            "lusdDebt": position["lusdDebt"],
+            "wethDebt": position["wethDebt"],
+        },
+    }
+
+
+# replay the same operations on our contracts and on our model, and flag the first place they disagree
+@pytest.mark.parametrize(
+    "ops",
+    [random_operations(random.Random(seed), 30) for seed in range(3)]
+    + [KEEP_AND_BUFFER],
+    ids=["seed 0", "seed 1", "seed 2", "keep and buffer"],
+)
+def test_differential(
+    ops,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    voter,
+    profit_whale,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+):
+    strategy.setVoter(voter, {"from": gov})
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+
+    # start our model from the same place as our chain
+    staking = LiquityStaking(
+        lqty_staking.totalLQTYStaked(), lqty_staking.F_ETH(), lqty_staking.F_LUSD()
+    )
+    params = vault.strategies(strategy)
+    model = Model(staking, vault.lockedProfitDegradation(), params["activation"])
+    model.vault.last_report = vault.lastReport()
+    model.vault.strategies[model.strategy]["lastReport"] = params["lastReport"]
+
+    for i, op in enumerate(ops):
+        if model.skips(op):
+            continue
+        tx = apply_on_chain(
+            op,
+            gov,
+            token,
+            vault,
+            whale,
+            strategy,
+            profit_whale,
+            lqty_staking,
+            borrower_operations,
+            trove_manager,
+        )
+        now = tx.timestamp if tx else chain[-1].timestamp
+        expected_events = model.step(op, now)
+
+        # any event our model expects, our contracts should have emitted with the same values
+        for name, expected in expected_events.items():
+            if name == "StrategyHarvested":
+                expected = {**expected, "strategy": strategy.address}
+            assert name in tx.events, f"op {i} {op}: missing {name}"
+            assert dict(tx.events[name]) == expected, f"op {i} {op}: {name}"
+
+        expected = model.snapshot()
+        actual = chain_snapshot(vault, strategy, voter)
+        for group in expected:
+            diff = {
+                key: (value, actual[group][key])
+                for key, value in expected[group].items()
+                if actual[group][key] != value
+            }
+            assert not diff, f"op {i} {op}: {group} (model, chain) {diff}"
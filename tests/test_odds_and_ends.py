@@ -1,5 +1,5 @@
 import brownie
-from brownie import Contract, chain
+from brownie import chain
 import pytest
 from utils import harvest_strategy
 
@@ -17,6 +17,7 @@ def test_odds_and_ends_liquidatePosition(
     profit_amount,
     destination_strategy,
     use_yswaps,
+    lqty_staking,
 ):
     ## deposit to the vault after approving
     starting_whale = token.balanceOf(whale)
@@ -33,8 +34,7 @@ def test_odds_and_ends_liquidatePosition(
     )
 
     ################# SEND ALL FUNDS AWAY. ADJUST AS NEEDED PER STRATEGY. #################
-    staking = Contract(strategy.lqtyStaking())
-    staking.unstake(staking.stakes(strategy), {"from": strategy})
+    lqty_staking.unstake(lqty_staking.stakes(strategy), {"from": strategy})
     token.transfer(gov, token.balanceOf(strategy), {"from": strategy})
     assert strategy.estimatedTotalAssets() == 0
 
@@ -77,6 +77,7 @@ def test_odds_and_ends_rekt(
     destination_strategy,
     use_yswaps,
     old_vault,
+    lqty_staking,
 ):
     ## deposit to the vault after approving
     starting_whale = token.balanceOf(whale)
@@ -93,8 +94,7 @@ def test_odds_and_ends_rekt(
     )
 
     ################# SEND ALL FUNDS AWAY. ADJUST AS NEEDED PER STRATEGY. #################
-    staking = Contract(strategy.lqtyStaking())
-    staking.unstake(staking.stakes(strategy), {"from": strategy})
+    lqty_staking.unstake(lqty_staking.stakes(strategy), {"from": strategy})
     token.transfer(gov, token.balanceOf(strategy), {"from": strategy})
     assert strategy.estimatedTotalAssets() == 0
 
@@ -172,6 +172,7 @@ def test_odds_and_ends_empty_strat(
     profit_amount,
     destination_strategy,
     use_yswaps,
+    lqty_staking,
 ):
     ## deposit to the vault after approving
     starting_whale = token.balanceOf(whale)
@@ -188,8 +189,7 @@ def test_odds_and_ends_empty_strat(
     )
 
     ################# SEND ALL FUNDS AWAY. ADJUST AS NEEDED PER STRATEGY. #################
-    staking = Contract(strategy.lqtyStaking())
-    staking.unstake(staking.stakes(strategy), {"from": strategy})
+    lqty_staking.unstake(lqty_staking.stakes(strategy), {"from": strategy})
     token.transfer(gov, token.balanceOf(strategy), {"from": strategy})
     assert strategy.estimatedTotalAssets() == 0
 
@@ -264,3 +264,122 @@ def test_odds_and_ends_no_profit(
     assert profit == 0
     share_price = vault.pricePerShare()
     assert share_price == 10 ** token.decimals()
+
+
+# our liquid buffer should be held back from staking and serve small withdrawals on its own
+def test_liquid_buffer(
+    gov, token, vault, whale, strategy, amount, RELATIVE_APPROX,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+
+    # only vault managers can set this, and it can't be more than 100%
+    with brownie.reverts():
+        strategy.setLiquidBuffer(500, {"from": whale})
+    with brownie.reverts("!bps"):
+        strategy.setLiquidBuffer(10_001, {"from": gov})
+    strategy.setLiquidBuffer(500, {"from": gov})
+
+    # we use strategy.harvest directly, since harvest_strategy expects no loose want
+    strategy.harvest({"from": gov})
+    total = strategy.estimatedTotalAssets()
+    assert pytest.approx(strategy.balanceOfWant(), rel=RELATIVE_APPROX) == total * 0.05
+    chain.sleep(1)
+    chain.mine(1)
+
+    # a small withdrawal doesn't touch our stake
+    staked = strategy.stakedBalance()
+    vault.withdraw(vault.balanceOf(whale) // 100, {"from": whale})
+    assert strategy.stakedBalance() == staked
+
+    # a larger buffer is topped up from our stake
+    strategy.setLiquidBuffer(1_000, {"from": gov})
+    strategy.harvest({"from": gov})
+    total = strategy.estimatedTotalAssets()
+    assert strategy.stakedBalance() < staked
+    assert pytest.approx(strategy.balanceOfWant(), rel=RELATIVE_APPROX) == total * 0.1
+    chain.sleep(1)
+    chain.mine(1)
+
+    # a smaller buffer is trimmed back into our stake
+    strategy.setLiquidBuffer(200, {"from": gov})
+    strategy.harvest({"from": gov})
+    total = strategy.estimatedTotalAssets()
+    assert pytest.approx(strategy.balanceOfWant(), rel=RELATIVE_APPROX) == total * 0.02
+    chain.sleep(1)
+    chain.mine(1)
+
+    # no buffer stakes everything
+    strategy.setLiquidBuffer(0, {"from": gov})
+    strategy.harvest({"from": gov})
+    assert strategy.balanceOfWant() == 0
+
+    # withdraw everything, our buffer shouldn't have cost us anything
+    vault.withdraw({"from": whale})
+    assert vault.totalAssets() == 0
+
+
+# harvests should skip claiming, wrapping, and feeding our voter when there's only dust to move
+def test_harvest_dust_thresholds(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    voter,
+    lqty_staking,
+    borrower_operations,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+    chain.mine(1)
+
+    # only vault managers can set these
+    with brownie.reverts():
+        strategy.setDustThresholds(1, 1, 1, {"from": whale})
+
+    # with nothing pending, even our default thresholds skip the claim
+    assert lqty_staking.getPendingLUSDGain(strategy) == 0
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["HarvestStepsSkipped"]["claim"] == True
+    assert tx.events["HarvestStepsSkipped"]["wrap"] == False
+    chain.sleep(1)
+    chain.mine(1)
+
+    # pending rewards under our dust thresholds stay in liquity
+    lqty_staking.increaseF_LUSD(1_000e18, {"from": borrower_operations})
+    pending = lqty_staking.getPendingLUSDGain(strategy)
+    assert pending > 0
+    strategy.setDustThresholds(1e17, pending, 1e18, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["HarvestStepsSkipped"]["claim"] == True
+    assert lqty_staking.getPendingLUSDGain(strategy) == pending
+    chain.sleep(1)
+    chain.mine(1)
+
+    # same for dust ether and a dust keep for our voter
+    strategy.setVoter(voter, {"from": gov})
+    strategy.setKeepLqty(1000, {"from": gov})
+    whale.transfer(strategy, 1e16)
+    token.transfer(strategy, 1e18, {"from": whale})
+    tx = strategy.harvest({"from": gov})
+    skipped = tx.events["HarvestStepsSkipped"]
+    assert skipped["claim"] and skipped["wrap"] and skipped["voter"]
+    assert strategy.balance() == 1e16
+    assert token.balanceOf(voter) == 0 and voter.stakedBalance() == 0
+    chain.sleep(1)
+    chain.mine(1)
+
+    # without our thresholds everything goes through again
+    strategy.setDustThresholds(0, 0, 0, {"from": gov})
+    token.transfer(strategy, 1e18, {"from": whale})
+    tx = strategy.harvest({"from": gov})
+    assert "HarvestStepsSkipped" not in tx.events
+    assert lqty_staking.getPendingLUSDGain(strategy) == 0
+    assert strategy.balance() == 0
+    assert voter.stakedBalance() > 0
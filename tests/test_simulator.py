@@ -0,0 +1,69 @@
+import numpy as np
+from brownie import chain
+from scripts.simulate_harvests import (
+    SECONDS_PER_DAY,
+    harvest_trigger,
+    parameter_grid,
+    simulate,
+)
+
+# our simulator's trigger should make the same call as our strategy, given the same profit and call cost
+def test_simulated_trigger(gov, vault, strategy):
+    delay = 7 * SECONDS_PER_DAY
+    strategy.setMaxReportDelay(delay, {"from": gov})
+    strategy.setHarvestTriggerParams(1_000e6, 10_000e6, {"from": gov})
+
+    (_, ether_price) = strategy.prices()
+
+    # check well before and well after our max delay
+    for sleep in [0, 2 * delay]:
+        chain.sleep(sleep)
+        chain.mine(1)
+        since_report = chain[-1].timestamp - vault.strategies(strategy)["lastReport"]
+        for multiple in [0, 10_000, 50_000]:
+            strategy.setProfitToCostMultiple(multiple, {"from": gov})
+            for profit in [0, 999e6, 1_001e6, 5_000e6, 10_001e6]:
+                for call_cost in [0, 1e16, 1e18]:
+                    simulated = harvest_trigger(
+                        np.array(profit),
+                        np.array(since_report),
+                        np.array(True),
+                        np.array(strategy.ethToUsdc(call_cost)),
+                        1_000e6,
+                        10_000e6,
+                        delay,
+                        multiple,
+                    )
+                    assert bool(simulated) == strategy.harvestTriggerWithProfit(
+                        call_cost, profit, ether_price
+                    ), (sleep, multiple, profit, call_cost)
+
+
+# a short run over a small grid, checking that our policy knobs push results the way they should
+def test_simulator():
+    grid = parameter_grid(
+        keep_lqty=[0, 1_000],
+        harvest_profit_min=[100.0, 10_000.0],
+        harvest_profit_max=[1e12],
+        max_report_delay=[365 * SECONDS_PER_DAY],
+        profit_to_cost_multiple=[0],
+    )
+    results = simulate(grid, {"years": 0.1}, paths=4)
+    for values in results.values():
+        assert values.shape == (4,)
+    np.testing.assert_allclose(
+        results["net_apr"], results["gross_apr"] - results["gas_apr"]
+    )
+
+    # configs are in product order: keep, then min profit
+    (keep_low_min, keep_high_min, kept_low_min, kept_high_min) = range(4)
+    assert results["voter_lqty"][keep_low_min] == 0
+    assert results["voter_lqty"][kept_low_min] > 0
+
+    # sending LQTY to our voter comes out of our vault's returns
+    assert results["gross_apr"][kept_low_min] < results["gross_apr"][keep_low_min]
+
+    # a lower profit floor means more harvests, and more gas
+    harvests = results["harvests_per_year"]
+    assert harvests[keep_low_min] > harvests[keep_high_min] > 0
+    assert results["gas_apr"][keep_low_min] > results["gas_apr"][keep_high_min]
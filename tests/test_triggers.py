@@ -1,5 +1,5 @@
 import brownie
-from brownie import chain, Contract, ZERO_ADDRESS, accounts
+from brownie import chain, Contract, ZERO_ADDRESS, accounts, interface
 import pytest
 from utils import harvest_strategy
 
@@ -21,6 +21,9 @@ def test_triggers(
     destination_strategy,
     base_fee_oracle,
     use_yswaps,
+    lqty_staking,
+    lusd_borrower,
+    borrower_operations,
 ):
     # inactive strategy (0 DR and 0 assets) shouldn't be touched by keepers
     currentDebtRatio = vault.strategies(strategy)["debtRatio"]
@@ -80,22 +83,15 @@ def test_triggers(
 
     ################# GENERATE CLAIMABLE PROFIT HERE AS NEEDED #################
     # we simulate minting LUSD fees from liquity's borrower operations to the staking contract so we have claimable yield
-    lusd_borrower = accounts.at(
-        "0xaC5406AEBe35A27691D62bFb80eeFcD7c0093164", force=True
-    )
-    borrower_operations = accounts.at(
-        "0x24179CD81c9e782A4096035f7eC97fB8B783e007", force=True
-    )
-    staking = Contract("0x4f9Fbb3f1E99B56e0Fe2892e623Ed36A76Fc605d")
-    before = staking.getPendingLUSDGain(lusd_borrower)
-    staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
-    after = staking.getPendingLUSDGain(lusd_borrower)
+    before = lqty_staking.getPendingLUSDGain(lusd_borrower)
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    after = lqty_staking.getPendingLUSDGain(lusd_borrower)
     assert after > before
 
     # check that we have claimable profit, need this for min and max profit checks below
     claimable_profit = strategy.claimableProfitInUsdc()
     assert claimable_profit > 0
-    claimable_lusd = staking.getPendingLUSDGain(strategy)
+    claimable_lusd = lqty_staking.getPendingLUSDGain(strategy)
     assert claimable_lusd > 0
 
     if not (is_slippery and no_profit):
@@ -151,3 +147,207 @@ def test_triggers(
         )
     else:
         assert token.balanceOf(whale) >= starting_whale
+
+
+# test weighing our keeper's call cost against claimable profit
+def test_cost_aware_trigger(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    profit_whale,
+    profit_amount,
+    destination_strategy,
+    use_yswaps,
+    lqty_staking,
+    borrower_operations,
+    stand_ins,
+    lens_oracle,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    (profit, loss) = harvest_strategy(
+        use_yswaps,
+        strategy,
+        token,
+        gov,
+        profit_whale,
+        profit_amount,
+        destination_strategy,
+    )
+    chain.sleep(sleep_time)
+
+    # generate claimable profit
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    claimable_profit = strategy.claimableProfitInUsdc()
+    assert claimable_profit > 0
+
+    # our call cost is now exactly as much as our profit, in ether
+    ether_price = strategy.ethToUsdc(1e18)
+    assert ether_price > 0
+    call_cost = claimable_profit * 1e18 // ether_price
+
+    # nothing but our min profit should be able to trigger
+    strategy.setHarvestTriggerParams(1, 2 ** 128 - 1, {"from": gov})
+    strategy.setCreditThreshold(2 ** 256 - 1, {"from": gov})
+    strategy.setMaxReportDelay(2 ** 64, {"from": gov})
+
+    # call cost is ignored by default
+    assert strategy.profitToCostMultiple() == 0
+    assert strategy.harvestTrigger(call_cost * 10) == True
+
+    # profit needs to be twice our cost
+    strategy.setProfitToCostMultiple(20_000, {"from": gov})
+    assert strategy.harvestTrigger(call_cost) == False
+    assert strategy.harvestTrigger(call_cost // 4) == True
+    assert strategy.harvestTrigger(0) == True
+
+    # our upper limit still ignores call cost
+    strategy.setHarvestTriggerParams(1, 1, {"from": gov})
+    assert strategy.harvestTrigger(call_cost * 10) == True
+
+    # only vault managers can set this
+    with brownie.reverts():
+        strategy.setProfitToCostMultiple(0, {"from": whale})
+    strategy.setProfitToCostMultiple(0, {"from": gov})
+    strategy.setHarvestTriggerParams(1, 2 ** 128 - 1, {"from": gov})
+    assert strategy.harvestTrigger(call_cost * 10) == True
+
+    # ethToWant should price our call cost in LQTY
+    assert strategy.ethToWant(0) == 0
+    assert strategy.ethToWant(1e18) > 0
+
+    # and shouldn't revert if our oracle has no LQTY price
+    if stand_ins:
+        lqty_price = lens_oracle.getPriceUsdcRecommended(strategy.lqty())
+        lens_oracle.setPrice(strategy.lqty(), 0, {"from": gov})
+        assert strategy.ethToWant(1e18) == 0
+        lens_oracle.setPrice(strategy.lqty(), lqty_price, {"from": gov})
+
+
+# test caching our oracle prices for our trigger
+def test_price_cache(
+    gov, token, vault, whale, strategy, amount, keeper, stand_ins, lens_oracle,
+):
+    # with no cache we always go to the oracle
+    assert strategy.priceCacheMaxAge() == 0
+    (lusd_price, ether_price) = strategy.prices()
+    assert lusd_price > 0 and ether_price > 0
+    assert strategy.cachedEtherPrice() == 0
+
+    # turning on our cache fills it
+    strategy.setPriceCacheMaxAge(3600, {"from": gov})
+    assert strategy.cachedLusdPrice() == lusd_price
+    assert strategy.cachedEtherPrice() == ether_price
+    assert strategy.prices() == (lusd_price, ether_price)
+    updated_at = strategy.pricesUpdatedAt()
+    assert updated_at > 0
+
+    # harvests keep our cache fresh
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(60)
+    strategy.harvest({"from": gov})
+    chain.sleep(60)
+    strategy.harvest({"from": gov})
+    assert strategy.pricesUpdatedAt() > updated_at
+
+    # only keepers can refresh our prices
+    with brownie.reverts():
+        strategy.updatePrices({"from": whale})
+    strategy.updatePrices({"from": keeper})
+
+    # on a local chain we can move our oracle to check that we use cached prices until they go stale
+    if stand_ins:
+        weth = strategy.weth()
+        lens_oracle.setPrice(weth, ether_price * 2, {"from": gov})
+        assert strategy.prices() == (lusd_price, ether_price)
+        assert strategy.ethToUsdc(1e18) == ether_price
+
+        chain.sleep(3601)
+        chain.mine(1)
+        assert strategy.prices() == (lusd_price, ether_price * 2)
+
+        strategy.updatePrices({"from": keeper})
+        assert strategy.cachedEtherPrice() == ether_price * 2
+
+    # and we can turn our cache back off
+    with brownie.reverts():
+        strategy.setPriceCacheMaxAge(0, {"from": whale})
+    strategy.setPriceCacheMaxAge(0, {"from": gov})
+    assert strategy.priceCacheMaxAge() == 0
+
+
+# test tending, which should claim and stake without reporting to our vault
+def test_tend(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    sleep_time,
+    base_fee_oracle,
+    lqty_staking,
+    borrower_operations,
+    trove_manager,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    strategy.harvest({"from": gov})
+    chain.sleep(sleep_time)
+    chain.mine(1)
+
+    # with no thresholds set, we never tend
+    token.transfer(strategy, 10e18, {"from": whale})
+    assert strategy.tendTrigger(0) == False
+
+    # only vault managers can set our thresholds
+    with brownie.reverts():
+        strategy.setTendTriggerParams(1e18, 0, {"from": whale})
+
+    # trigger on idle want
+    strategy.setTendTriggerParams(1e18, 0, {"from": gov})
+    assert strategy.tendTrigger(0) == True
+
+    # but not if our gas price is too high
+    base_fee_oracle.setManualBaseFeeBool(False, {"from": gov})
+    assert strategy.tendTrigger(0) == False
+    base_fee_oracle.setManualBaseFeeBool(True, {"from": gov})
+
+    # trigger on claimable profit
+    strategy.setTendTriggerParams(0, 1, {"from": gov})
+    assert strategy.tendTrigger(0) == False
+    lqty_staking.increaseF_LUSD(100_000e18, {"from": borrower_operations})
+    lqty_staking.increaseF_ETH(50e18, {"from": trove_manager})
+    assert strategy.tendTrigger(0) == True
+
+    # tend, we should have claimed, wrapped, and staked, but not reported
+    weth = interface.IERC20(strategy.weth())
+    lusd = interface.IERC20(strategy.lusd())
+    staked = strategy.stakedBalance()
+    last_report = vault.strategies(strategy)["lastReport"]
+    strategy.tend({"from": gov})
+    assert strategy.balanceOfWant() == 0
+    assert strategy.stakedBalance() == staked + 10e18
+    assert lqty_staking.getPendingLUSDGain(strategy) == 0
+    assert lqty_staking.getPendingETHGain(strategy) == 0
+    assert strategy.balance() == 0
+    assert weth.balanceOf(strategy) > 0
+    assert lusd.balanceOf(strategy) > 0
+    assert vault.strategies(strategy)["lastReport"] == last_report
+
+    # nothing left to tend
+    strategy.setTendTriggerParams(1e18, 1, {"from": gov})
+    assert strategy.tendTrigger(0) == False
+
+    # and never in emergency exit
+    token.transfer(strategy, 10e18, {"from": whale})
+    assert strategy.tendTrigger(0) == True
+    strategy.setEmergencyExit({"from": gov})
+    assert strategy.tendTrigger(0) == False
@@ -106,6 +106,12 @@ def test_keepers_and_trade_handler(
     # update our rewards to just LUSD
     strategy.updateRewards([strategy.lusd()], {"from": gov})
     assert strategy.rewardsTokens(0) == strategy.lusd()
+    assert strategy.rewardsTokensLength() == 1
+
+    # our trade factory can still move LUSD, but not WETH
+    weth = interface.IERC20(strategy.weth())
+    assert lusd.allowance(strategy, trade_factory) > 0
+    assert weth.allowance(strategy, trade_factory) == 0
 
     # don't have another token here anymore
     with brownie.reverts():
@@ -1,6 +1,11 @@
 import pytest
 import brownie
-from brownie import interface, chain, accounts
+import requests
+from brownie import Wei, interface, chain, web3
+from hexbytes import HexBytes
+
+# use this in batch_call in place of a function name to read a contract's ether balance
+ETH_BALANCE = "eth_getBalance"
 
 # returns (profit, loss) of a harvest
 def harvest_strategy(
@@ -22,37 +27,49 @@ def harvest_strategy(
 
     ####### ADD LOGIC AS NEEDED FOR CLAIMING/SENDING REWARDS TO STRATEGY #######
     # usually this is automatic, but it may need to be externally triggered
+    lusd, weth = strategy_constants(strategy)
+    (staked_balance, emergency_exit) = batch_call(
+        (strategy, "stakedBalance"), (strategy, "emergencyExit")
+    )
 
-    # send WETH and LUSD to the strategy
-    # op bridge, also has ether
-    lusd_whale = accounts.at("0x99C9fc46f92E8a1c0deC1b1747d010903E884bE1", force=True)
+    # send LUSD and ether to the strategy, written straight to storage rather than sent from whales
     # this check makes sure only send rewards when they actually would have been earned
-    if use_yswaps and strategy.stakedBalance() > 0:
+    sent_rewards = use_yswaps and staked_balance > 0
+    if sent_rewards or emergency_exit:
+        (lusd_balance, eth_balance) = batch_call(
+            (lusd, "balanceOf", strategy), (strategy, ETH_BALANCE)
+        )
+    if sent_rewards:
         # liquity doesn't do a good job of claiming
-        lusd = interface.IERC20(strategy.lusd())
-        lusd.transfer(strategy, 200e18, {"from": lusd_whale})
-        lusd_whale.transfer(strategy, 5e17)
-        assert strategy.balance() > 0
+        deal(lusd, strategy, lusd_balance + 200 * 10 ** 18)
+        eth_balance += 5 * 10 ** 17
+        set_balance(strategy, eth_balance)
         print("Reward tokens sent to strategy")
 
     # if we have no staked assets, and we are taking profit (when closing out a strategy) then we will need to ignore health check
-    if strategy.stakedBalance() == 0:
+    if staked_balance == 0:
         strategy.setDoHealthCheck(False, {"from": gov})
 
     # when in emergency exit we don't enter prepare return, so we need to manually swap our ether for WETH
-    if strategy.emergencyExit():
-        weth = interface.IWETH(strategy.weth())
-        to_deposit = strategy.balance()
-        weth.deposit({"from": strategy, "value": to_deposit})
+    if emergency_exit:
+        weth.deposit({"from": strategy, "value": eth_balance})
 
     # we can use the tx for debugging if needed
     tx = strategy.harvest({"from": gov})
-    profit = tx.events["Harvested"]["profit"] / (10 ** token.decimals())
-    loss = tx.events["Harvested"]["loss"] / (10 ** token.decimals())
+    decimals = token_decimals(token)
+    profit = tx.events["Harvested"]["profit"] / (10 ** decimals)
+    loss = tx.events["Harvested"]["loss"] / (10 ** decimals)
 
-    # assert there are no loose funds in strategy after a harvest, and that we don't have ether left
-    assert strategy.balanceOfWant() == 0
-    assert strategy.balance() == 0
+    # assert there are no loose funds in strategy after a harvest beyond our liquid buffer, and that we don't have
+    # ether left
+    (want_balance, total_assets, buffer_bps, eth_balance) = batch_call(
+        (strategy, "balanceOfWant"),
+        (strategy, "estimatedTotalAssets"),
+        (strategy, "liquidBufferBps"),
+        (strategy, ETH_BALANCE),
+    )
+    assert want_balance == total_assets * buffer_bps // 10_000
+    assert eth_balance == 0
 
     # our trade handler takes action, sending out rewards tokens and sending back in profit
     if use_yswaps:
@@ -76,22 +93,218 @@ def trade_handler_action(
 ):
     ####### ADD LOGIC AS NEEDED FOR SENDING REWARDS OUT AND PROFITS IN #######
     # get our tokens from our strategy
-    lusd = interface.IERC20(strategy.lusd())
-    weth = interface.IERC20(strategy.weth())
+    lusd, weth = strategy_constants(strategy)
+    (lusdBalance, wethBalance) = batch_call(
+        (lusd, "balanceOf", strategy), (weth, "balanceOf", strategy)
+    )
 
-    lusdBalance = lusd.balanceOf(strategy)
     if lusdBalance > 0:
         lusd.transfer(gov, lusdBalance, {"from": strategy})
         print("LUSD rewards present")
-        assert lusd.balanceOf(strategy) == 0
 
-    wethBalance = weth.balanceOf(strategy)
     if wethBalance > 0:
         weth.transfer(gov, wethBalance, {"from": strategy})
         print("WETH rewards present")
-        assert weth.balanceOf(strategy) == 0
 
     # send our profits back in
     if lusdBalance > 0 or wethBalance > 0:
+        assert batch_call(
+            (lusd, "balanceOf", strategy), (weth, "balanceOf", strategy)
+        ) == [0, 0]
         token.transfer(strategy, profit_amount, {"from": profit_whale})
         print("Rewards converted into profit and returned")
+
+
+# these never change for a given address, so only look them up once. our reward tokens are constants, so even if a
+# reverted test leaves us with a new strategy at the same address, the cached values are still correct.
+_strategy_constants = {}
+_token_decimals = {}
+
+
+# returns (lusd, weth) for a strategy
+def strategy_constants(strategy):
+    if strategy.address not in _strategy_constants:
+        (lusd, weth) = batch_call((strategy, "lusd"), (strategy, "weth"))
+        _strategy_constants[strategy.address] = (
+            interface.IERC20(lusd),
+            interface.IWETH(weth),
+        )
+    return _strategy_constants[strategy.address]
+
+
+def token_decimals(token):
+    if token.address not in _token_decimals:
+        _token_decimals[token.address] = token.decimals()
+    return _token_decimals[token.address]
+
+
+# read any number of view functions in one JSON-RPC batch, so they all cost a single round trip.
+# each call is (contract, function name, *args), or (contract, ETH_BALANCE) for its ether balance.
+def batch_call(*calls, block="latest"):
+    payload = []
+    for i, (contract, fn_name, *args) in enumerate(calls):
+        if fn_name == ETH_BALANCE:
+            params = [contract.address, block]
+        else:
+            data = getattr(contract, fn_name).encode_input(*args)
+            params = [{"to": contract.address, "data": data}, block]
+            fn_name = "eth_call"
+        payload.append({"jsonrpc": "2.0", "id": i, "method": fn_name, "params": params})
+
+    # not every provider speaks HTTP, if ours doesn't then fall back to one request per call
+    endpoint = getattr(web3.provider, "endpoint_uri", None)
+    if endpoint and endpoint.startswith("http"):
+        responses = requests.post(endpoint, json=payload).json()
+    else:
+        responses = [
+            {
+                "id": call["id"],
+                **web3.provider.make_request(call["method"], call["params"]),
+            }
+            for call in payload
+        ]
+
+    results = []
+    for response in sorted(responses, key=lambda x: x["id"]):
+        if "error" in response:
+            raise ValueError(f"batch_call failed: {response['error']}")
+        contract, fn_name, *_ = calls[response["id"]]
+        if fn_name == ETH_BALANCE:
+            results.append(int(response["result"], 16))
+        else:
+            results.append(getattr(contract, fn_name).decode_output(response["result"]))
+    return results
+
+
+# gas used by every call to a contract function within a transaction, including anything it calls. works for
+# internal functions too, like "StrategyLQTYStaker.prepareReturn". returns None if the function was never hit.
+# this follows the same frame logic as brownie's tx.call_trace(), which needs debug_traceTransaction.
+def function_gas(tx, fn_name):
+    trace = tx.trace
+    gas_used = None
+    for i in range(1, len(trace)):
+        step, last = trace[i], trace[i - 1]
+        entered = step["depth"] > last["depth"] or (
+            step["depth"] == last["depth"] and step["jumpDepth"] > last["jumpDepth"]
+        )
+        if step["fn"] != fn_name or not entered:
+            continue
+        end = next(
+            (
+                j
+                for j in range(i + 1, len(trace))
+                if trace[j]["depth"] < step["depth"]
+                or (
+                    trace[j]["depth"] == step["depth"]
+                    and trace[j]["jumpDepth"] < step["jumpDepth"]
+                )
+            ),
+            len(trace),
+        )
+        # brownie returns (gas used in this frame, gas used in this frame + subcalls)
+        gas_used = (gas_used or 0) + tx._get_trace_gas(i, end)[1]
+    return gas_used
+
+
+# the distinct storage slots a contract read during a transaction. after the first, each read of a slot is warm (100
+# gas instead of 2100), so this is roughly the number of cold SLOADs we paid for. also needs debug_traceTransaction.
+def storage_reads(tx, contract):
+    return {
+        step["stack"][-1]
+        for step in tx.trace
+        if step["op"] == "SLOAD" and step["address"] == contract.address
+    }
+
+
+# each dev chain names its cheat codes differently, keyed off of web3_clientVersion
+DEV_CHAIN_CHEATS = {
+    "ganache": {
+        "code": "evm_setAccountCode",
+        "balance": "evm_setAccountBalance",
+        "storage": "evm_setAccountStorageAt",
+    },
+    "anvil": {
+        "code": "anvil_setCode",
+        "balance": "anvil_setBalance",
+        "storage": "anvil_setStorageAt",
+    },
+    "hardhat": {
+        "code": "hardhat_setCode",
+        "balance": "hardhat_setBalance",
+        "storage": "hardhat_setStorageAt",
+    },
+}
+
+
+def dev_chain():
+    client = web3.provider.make_request("web3_clientVersion", [])["result"].lower()
+    for name in DEV_CHAIN_CHEATS:
+        if name in client:
+            return name
+    raise ValueError(f"Don't know any cheats for {client}")
+
+
+def dev_chain_cheat(cheat, *params):
+    method = DEV_CHAIN_CHEATS[dev_chain()][cheat]
+    response = web3.provider.make_request(method, list(params))
+    if "error" in response:
+        raise ValueError(f"{method} failed: {response['error']}")
+    return response["result"]
+
+
+# overwrite the runtime code at an address, this is how we install our local stand-ins
+def set_code(address, code):
+    dev_chain_cheat("code", str(address), "0x" + bytes(HexBytes(code)).hex())
+
+
+# set the ether balance of an address without sending a transaction
+def set_balance(address, amount):
+    dev_chain_cheat("balance", str(address), hex(int(amount)))
+
+
+# overwrite one storage slot of a contract. hardhat wants slots without leading zeros, everyone else takes 32 bytes.
+def set_storage(address, slot, value):
+    if dev_chain() == "hardhat":
+        slot = hex(slot)
+    else:
+        slot = "0x" + slot.to_bytes(32, "big").hex()
+    value = "0x" + int(Wei(value)).to_bytes(32, "big").hex()
+    dev_chain_cheat("storage", str(address), slot, value)
+
+
+# storage slot of a mapping's value for an address key. vyper hashes the key and slot the other way around.
+def mapping_slot(key, slot, vyper=False):
+    (key, slot) = (bytes(12) + bytes(HexBytes(str(key))), slot.to_bytes(32, "big"))
+    preimage = slot + key if vyper else key + slot
+    return int.from_bytes(web3.keccak(preimage), "big")
+
+
+# where each token keeps its balances, as (mapping slot, vyper). storage layouts are fixed, so we only look once.
+_balance_slots = {}
+
+
+# find a token's balance mapping by writing to each candidate slot for an address nobody holds, and seeing if
+# balanceOf picks it up. whatever we write is put back.
+def balance_slot(token):
+    if token.address not in _balance_slots:
+        probe = "0x" + "de" * 20
+        sentinel = 0xDEA1
+        for slot in range(100):
+            for vyper in (False, True):
+                storage = mapping_slot(probe, slot, vyper)
+                original = web3.eth.get_storage_at(token.address, storage)
+                set_storage(token, storage, sentinel)
+                found = token.balanceOf(probe) == sentinel
+                set_storage(token, storage, int.from_bytes(bytes(original), "big"))
+                if found:
+                    _balance_slots[token.address] = (slot, vyper)
+                    return (slot, vyper)
+        raise ValueError(f"Couldn't find where {token.address} keeps its balances")
+    return _balance_slots[token.address]
+
+
+# set an account's token balance directly in storage, with no transaction and no whale. like foundry's deal, this
+# doesn't touch total supply.
+def deal(token, account, amount):
+    (slot, vyper) = balance_slot(token)
+    set_storage(token, mapping_slot(account, slot, vyper), amount)